@@ -0,0 +1,87 @@
+""" Pick the password hash cost that fits a target latency on this machine
+
+Run from the root directory:
+
+    python -m CTFe.commands.calibrate_pwd_cost [--target-ms 250] [--scheme bcrypt]
+
+The suggested values go into the environment as PWD_SCHEME and PWD_ROUNDS.
+Lower costs mean more logins per second per core, and cheaper offline attacks.
+"""
+import argparse
+import statistics
+import time
+
+from passlib.registry import get_crypt_handler
+
+from CTFe.config import constants
+
+
+SAMPLES = 3
+PASSWORD = "calibration-password"
+
+
+def time_hash(handler, rounds: int) -> float:
+    """ Median time in milliseconds to hash one password at <rounds> """
+
+    hasher = handler.using(rounds=rounds)
+    durations = []
+
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        hasher.hash(PASSWORD)
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(durations)
+
+
+def next_rounds(handler, rounds: int) -> int:
+    # log2 costs (bcrypt) double the work per step, linear costs are doubled directly
+    if handler.rounds_cost == "log2":
+        return rounds + 1
+    return rounds * 2
+
+
+def calibrate(scheme: str, target_ms: float):
+    handler = get_crypt_handler(scheme)
+
+    if "rounds" not in handler.setting_kwds:
+        raise ValueError(f"Scheme { scheme } has no tunable cost")
+
+    rounds = handler.min_rounds
+    if handler.rounds_cost != "log2":
+        rounds = max(rounds, 1000)
+
+    best = (rounds, time_hash(handler, rounds))
+
+    while True:
+        candidate = next_rounds(handler, rounds)
+        if handler.max_rounds is not None and candidate > handler.max_rounds:
+            break
+
+        duration = time_hash(handler, candidate)
+        print(f"{ scheme } rounds={ candidate }: {duration:.1f} ms")
+
+        if duration > target_ms:
+            break
+
+        rounds = candidate
+        best = (rounds, duration)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scheme", default=constants.PWD_SCHEME)
+    parser.add_argument("--target-ms", type=float, default=constants.PWD_TARGET_LATENCY_MS)
+    args = parser.parse_args()
+
+    rounds, duration = calibrate(args.scheme, args.target_ms)
+
+    print()
+    print(f"Current setting: PWD_SCHEME={ constants.PWD_SCHEME } PWD_ROUNDS={ constants.PWD_ROUNDS }")
+    print(f"Suggested for {args.target_ms:g} ms: PWD_SCHEME={ args.scheme } PWD_ROUNDS={ rounds }  (~{duration:.1f} ms per hash)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+""" Create upcoming day partitions of the attempts table, or archive old ones
+
+Run from the root directory:
+
+    python -m CTFe.commands.manage_attempt_partitions create [--days 7]
+    python -m CTFe.commands.manage_attempt_partitions archive --before 2021-01-01 [--output-dir archive] [--drop] [--days 7]
+
+Attempts of days without a partition land in attempts_default, so schedule
+create daily (e.g. from cron). It also moves rows already in attempts_default
+to partitions of their days. Archiving creates the upcoming partitions too, and
+refuses to run while attempts_default holds rows, which create has to move first.
+
+Archiving streams each partition older than --before to a gzipped CSV file,
+then detaches it so regular reads no longer scan it. Detached partitions are
+kept in attempts_archive (read with include_archived, and by the scoreboard and
+challenge stats rebuilds) unless --drop is given. Partitions holding attempts of
+existing challenges are never dropped, the rebuilds would lose them.
+"""
+import argparse
+import os
+from datetime import (
+    date,
+    datetime,
+)
+
+from CTFe.config.database import dal
+from CTFe.operations import partition_ops
+
+
+def create(args):
+    with dal.get_session_ctx() as session:
+        created = partition_ops.ensure_partitions(session, date.today(), args.days)
+        created += partition_ops.partition_default_rows(session)
+
+    print(f"Created { len(created) } partitions")
+    for name in created:
+        print(f"  { name }")
+
+
+def archive(args):
+    before = datetime.strptime(args.before, "%Y-%m-%d").date()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    with dal.get_session_ctx() as session:
+        partition_ops.ensure_partitions(session, date.today(), args.days)
+
+        default_days = partition_ops.query_default_days(session)
+        if default_days:
+            days = ", ".join(f"{ day:%Y-%m-%d}" for day in default_days)
+            raise SystemExit(f"attempts_default holds attempts of { days }, run create first")
+
+        for name, day in partition_ops.query_partitions(session):
+            if day >= before:
+                break
+
+            try:
+                path, rows = partition_ops.archive_partition(
+                    session, name, day, args.output_dir, args.drop)
+            except ValueError as error:
+                raise SystemExit(str(error))
+
+            print(f"Archived { rows } rows of { name } to { path }")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create_parser = commands.add_parser("create")
+    create_parser.add_argument("--days", type=int, default=7)
+    create_parser.set_defaults(run=create)
+
+    archive_parser = commands.add_parser("archive")
+    archive_parser.add_argument("--before", required=True, help="YYYY-MM-DD, exclusive")
+    archive_parser.add_argument("--output-dir", default="archive")
+    archive_parser.add_argument("--drop", action="store_true")
+    archive_parser.add_argument("--days", type=int, default=7, help="Upcoming days to create partitions for")
+    archive_parser.set_defaults(run=archive)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
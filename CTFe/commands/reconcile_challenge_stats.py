@@ -0,0 +1,21 @@
+""" Rebuild the challenge_stats table from scratch out of the attempts table
+
+Run from the root directory:
+
+    python -m CTFe.commands.reconcile_challenge_stats
+
+Fixes drift left behind by deleted attempts or teams, or by manual edits.
+"""
+from CTFe.config.database import dal
+from CTFe.operations import challenge_ops
+
+
+def main():
+    with dal.get_session_ctx() as session:
+        count = challenge_ops.rebuild_challenge_stats(session)
+
+    print(f"Rebuilt stats for { count } challenges")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+""" Fill the database with a generated contest for benchmarks and capacity planning
+
+Run from the root directory, after the migrations:
+
+    python -m CTFe.commands.seed_database [--teams 1000] [--attempts 1000000] [--seed 0]
+
+Rows are appended after the ids already in use and are the same for the
+same arguments. Every user gets the password given with --password. Rows
+go through COPY on postgres, so a million attempts take seconds.
+"""
+import argparse
+import time
+from datetime import datetime
+
+from CTFe.config.database import dal
+from CTFe.operations import seed_ops
+
+
+def main():
+    defaults = seed_ops.SeedConfig()
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=defaults.teams)
+    parser.add_argument("--min-team-size", type=int, default=defaults.min_team_size)
+    parser.add_argument("--max-team-size", type=int, default=defaults.max_team_size)
+    parser.add_argument("--free-players", type=int, default=defaults.free_players)
+    parser.add_argument("--invites-per-team", type=int, default=defaults.invites_per_team)
+    parser.add_argument("--challenges", type=int, default=defaults.challenges)
+    parser.add_argument("--attempts", type=int, default=defaults.attempts)
+    parser.add_argument("--solve-rate", type=float, default=defaults.solve_rate)
+    parser.add_argument(
+        "--team-skew", type=float, default=defaults.team_skew,
+        help="Zipf exponent of attempts per team, 0 spreads them evenly")
+    parser.add_argument(
+        "--challenge-skew", type=float, default=defaults.challenge_skew,
+        help="Zipf exponent of attempts per challenge, 0 spreads them evenly")
+    parser.add_argument(
+        "--start", default=f"{defaults.start:%Y-%m-%d}", help="YYYY-MM-DD of the first attempt")
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--password", default=defaults.password)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    config = seed_ops.SeedConfig(**{
+        **vars(args),
+        "start": datetime.strptime(args.start, "%Y-%m-%d"),
+    })
+
+    start = time.perf_counter()
+
+    with dal.get_session_ctx() as session:
+        written = seed_ops.seed_database(session, config)
+
+    elapsed = time.perf_counter() - start
+
+    print(f"Seeded in {elapsed:.1f}s")
+    for table, count in written.items():
+        print(f"  { table }: { count }")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,16 @@ none_value_error = (
 
 # Application specific configs
 # -----------------------------
+DEBUG = os.getenv("DEBUG", "false").lower() == "true"    # Adds Server-Timing headers
 MAX_TEAM_MEMBERS = 5
 MAX_TEAM_INVITES = 10
+CHALLENGE_INITIAL_VALUE = 500   # Dynamic scoring: value of the first solve
+CHALLENGE_MINIMUM_VALUE = 100   # Dynamic scoring: value never decays below this
+CHALLENGE_DECAY = 50            # Dynamic scoring: solves until the minimum is reached
+SCOREBOARD_RESYNC_OVERLAP = 100 # Attempt ids re-read on sync, catches late commits
+SCORE_HISTORY_BUCKET = 60       # Seconds covered by one score history sample
+SCORE_HISTORY_MAX_POINTS = 500  # Samples returned per team by a history query
+PROFILE_MAX_SECONDS = 60        # Longest run of the /admin/profile sampling profiler
 UPLOAD_FILE_SIZE = 10_000
 UPLOAD_FILE_LOCATION = os.path.join(os.getcwd(), "uploaded_files")
 
@@ -39,6 +47,9 @@ TEST_DB_ADDRESS = os.getenv("TEST_DB_ADDRESS")
 TEST_DB_PORT = os.getenv("TEST_DB_PORT")
 TEST_DB_NAME = os.getenv("TEST_DB_NAME")
 
+# "sqlite" runs the tests on in-memory SQLite and redis, "postgres" on the TEST_* servers
+TEST_BACKEND = os.getenv("TEST_BACKEND", "postgres")
+
 if DB_TYPE is None:
     raise none_value_error("DB_TYPE")
 
@@ -54,6 +65,12 @@ if DB_NAME is None:
     raise none_value_error("DB_NAME")
 
 
+DB_TRANSACTION_RETRIES = 3         # Retries on serialization failures and deadlocks
+DB_RETRY_BACKOFF = 0.05             # In seconds, multiplied by the attempt number
+SLOW_QUERY_THRESHOLD_MS = int(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100))
+SLOW_QUERY_LOG_SIZE = 200           # Slow queries kept for /admin/slow-queries
+
+
 # Redis related configs
 # ----------------------
 REDIS_EXPIRE = 1 * 60   # Calculated in seconds (e.g. 2 * 60 => 2 minutes)
@@ -83,11 +100,32 @@ if REDIS_DB_NAME is None:
 JWT_ALGORITHM = "HS256"
 JWT_SECRET = os.getenv("JWT_SECRET")
 JWT_EXPIRE_TIME = 1    # It's in minutes (e.g. 15 => 15 minutes)
+JWT_CACHE_SIZE = 1024   # Max number of decoded tokens kept in memory
 
 if JWT_SECRET is None:
     raise none_value_error("JWT_SECRET")
 
 
+# Password hashing configs
+# -------------------------
+# Hashes made with another scheme or cost are upgraded on the next login.
+# Use `make calibrate-pwd-cost` to pick PWD_ROUNDS for this hardware.
+PWD_SCHEME = os.getenv("PWD_SCHEME", "bcrypt")
+PWD_ROUNDS = int(os.getenv("PWD_ROUNDS", 12))    # bcrypt: log2 of the work factor
+PWD_LEGACY_SCHEMES = ["bcrypt"]     # Still verified, but rehashed on login
+PWD_TARGET_LATENCY_MS = 250         # Default target for the calibration command
+
+
+# Login throttling configs
+# -------------------------
+LOGIN_FREE_ATTEMPTS_PER_USERNAME = 5
+LOGIN_FREE_ATTEMPTS_PER_IP = 20     # Players often share one IP at events
+LOGIN_BACKOFF_BASE = 1              # In seconds, doubled on every further failure
+LOGIN_BACKOFF_MAX = 15 * 60         # In seconds
+LOGIN_FAILURE_WINDOW = 15 * 60      # In seconds, failures older than this are forgotten
+LOGIN_THROTTLE_MEMORY_SIZE = 10_000 # Max keys kept in-process when redis is down
+
+
 # Auth Token configs
 # -------------------
 # X_TOKEN = "X-Token"
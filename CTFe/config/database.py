@@ -1,10 +1,17 @@
 from contextlib import contextmanager
+from typing import Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import (
+    create_engine,
+    event,
+)
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.ext.declarative import declarative_base
 
 from CTFe.config import constants
+from CTFe.utils import query_stats_utils
+from CTFe.utils.slow_query_utils import slow_query_log
 
 
 # The model's base class configuration
@@ -12,17 +19,56 @@ from CTFe.config import constants
 Base = declarative_base()
 
 
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+    # pysqlite opens transactions on its own and breaks SAVEPOINTs, so
+    # leave that to SQLAlchemy, see _begin_sqlite_transaction
+    dbapi_connection.isolation_level = None
+
+
+def _begin_sqlite_transaction(connection):
+    connection.execute("BEGIN")
+
+
 # DataAccessLayer class configuration
 # ------------------------------------
 class DataAccessLayer:
     def __init__(self):
         self.db_url: str = None
 
+        # Postgres schema to work in instead of public, e.g. one per test worker
+        self.schema: Optional[str] = None
+
         self.engine = None
         self._SessionLocal = None
 
+    def engine_options(self) -> dict:
+        """ create_engine arguments for the backend of <db_url> """
+
+        if self.db_url.startswith("sqlite"):
+            options = {"connect_args": {"check_same_thread": False}}
+
+            # Every connection to :memory: is a new database, so share a single one
+            if self.db_url in ("sqlite://", "sqlite:///:memory:"):
+                options["poolclass"] = StaticPool
+
+            return options
+
+        if self.schema is not None:
+            return {"connect_args": {"options": f"-csearch_path={ self.schema }"}}
+
+        return {}
+
     def init(self):
-        self.engine = create_engine(self.db_url)
+        self.engine = create_engine(self.db_url, **self.engine_options())
+
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine, "connect", _configure_sqlite_connection)
+            event.listen(self.engine, "begin", _begin_sqlite_transaction)
+
+        query_stats_utils.install(self.engine)
+        query_stats_utils.add_statement_listener(slow_query_log.observe)
         self._SessionLocal = sessionmaker(
             bind=self.engine, autocommit=False, autoflush=False
         )
@@ -58,4 +104,4 @@ class DataAccessLayer:
 
 
 dal = DataAccessLayer()
-dal.db_url = f"{constants.DB_TYPE}://{constants.DB_USERNAME}:{constants.DB_PASSWORD}@{constants.DB_ADDRESS}:{constants.DB_PORT}/{constants.DB_NAME}"
\ No newline at end of file
+dal.db_url = f"{constants.DB_TYPE}://{constants.DB_USERNAME}:{constants.DB_PASSWORD}@{constants.DB_ADDRESS}:{constants.DB_PORT}/{constants.DB_NAME}"
@@ -3,11 +3,16 @@ from fastapi import (
     Depends,
 )
 
+from CTFe.config import constants
 from CTFe.config.database import dal
 from CTFe.utils import (
     validators,
     enums,
 )
+from CTFe.utils.middleware_utils import (
+    MetricsMiddleware,
+    route_prefixes,
+)
 from CTFe.views import (
     auth_router,
     user_router,
@@ -16,6 +21,9 @@ from CTFe.views import (
     attempt_router,
     player_router,
     contributor_router,
+    scoreboard_router,
+    admin_router,
+    metrics_router,
 )
 
 
@@ -66,6 +74,26 @@ app.include_router(
         Depends(validators.validate_user_type(enums.UserType.CONTRIBUTOR)),
     ],
 )
+app.include_router(
+    scoreboard_router,
+    prefix="/scoreboard",
+)
+app.include_router(
+    admin_router,
+    prefix="/admin",
+    dependencies=[
+        Depends(validators.validate_user_type(enums.UserType.ADMIN)),
+    ],
+)
+app.include_router(
+    metrics_router,
+)
+
+app.add_middleware(
+    MetricsMiddleware,
+    prefixes=route_prefixes(app.routes),
+    server_timing=constants.DEBUG,
+)
 
 
 if __name__ == "__main__":
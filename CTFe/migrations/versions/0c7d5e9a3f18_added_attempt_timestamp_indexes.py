@@ -0,0 +1,38 @@
+"""made attempts.created_at required and indexed it
+
+Revision ID: 0c7d5e9a3f18
+Revises: e61f2c8b4d07
+Create Date: 2026-10-19 17:05:12.774093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c7d5e9a3f18'
+down_revision = 'e61f2c8b4d07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Attempts made before 5a8e0f3d91c6 have no timestamp. They all get the
+    # migration time, ties between them fall back to the attempt id
+    op.execute("""
+        UPDATE attempts
+        SET created_at = timezone('utc', now())
+        WHERE created_at IS NULL
+    """)
+
+    op.alter_column('attempts', 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+    op.create_index('ix_attempts_team_id_created_at', 'attempts', ['team_id', 'created_at'], unique=False)
+    op.create_index('ix_attempts_challenge_id_created_at', 'attempts', ['challenge_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_attempts_challenge_id_created_at', table_name='attempts')
+    op.drop_index('ix_attempts_team_id_created_at', table_name='attempts')
+
+    op.alter_column('attempts', 'created_at', existing_type=sa.DateTime(), nullable=True)
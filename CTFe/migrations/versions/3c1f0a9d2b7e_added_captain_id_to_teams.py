@@ -0,0 +1,39 @@
+"""added captain_id to teams
+
+Revision ID: 3c1f0a9d2b7e
+Revises: fb7cd6330ff5
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f0a9d2b7e'
+down_revision = 'fb7cd6330ff5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('teams', sa.Column('captain_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_teams_captain_id_users', 'teams', 'users',
+        ['captain_id'], ['id'], ondelete='SET NULL',
+    )
+
+    # Backfill: the earliest registered member becomes the captain
+    op.execute("""
+        UPDATE teams
+        SET captain_id = (
+            SELECT MIN(users.id)
+            FROM users
+            WHERE users.team_id = teams.id
+        )
+    """)
+
+
+def downgrade():
+    op.drop_constraint('fk_teams_captain_id_users', 'teams', type_='foreignkey')
+    op.drop_column('teams', 'captain_id')
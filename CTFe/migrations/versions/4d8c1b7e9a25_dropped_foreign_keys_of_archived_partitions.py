@@ -0,0 +1,38 @@
+"""dropped foreign keys of archived partitions
+
+Revision ID: 4d8c1b7e9a25
+Revises: c2e7a94f1d35
+Create Date: 2026-10-19 21:07:52.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d8c1b7e9a25'
+down_revision = 'c2e7a94f1d35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Partitions archived so far kept the foreign keys of attempts, which
+    # made deleting their teams or challenges fail
+    bind = op.get_bind()
+    constraints = bind.execute("""
+        SELECT child.relname, pg_constraint.conname
+        FROM pg_inherits
+        JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_constraint ON pg_constraint.conrelid = child.oid
+        WHERE parent.relname = 'attempts_archive' AND pg_constraint.contype = 'f'
+    """).fetchall()
+
+    for table, constraint in constraints:
+        op.drop_constraint(constraint, table, type_='foreignkey')
+
+
+def downgrade():
+    # Archived rows may reference deleted teams or challenges, keep them without
+    pass
@@ -0,0 +1,64 @@
+"""added challenge_stats table and attempt outcome columns
+
+Revision ID: 5a8e0f3d91c6
+Revises: d7a3b6f0c254
+Create Date: 2026-10-19 13:48:05.660731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8e0f3d91c6'
+down_revision = 'd7a3b6f0c254'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('attempts', sa.Column('is_correct', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('attempts', sa.Column('created_at', sa.DateTime(), nullable=True))
+
+    op.execute("""
+        UPDATE attempts
+        SET is_correct = (attempts.flag = challenges.flag)
+        FROM challenges
+        WHERE challenges.id = attempts.challenge_id
+    """)
+
+    op.create_table('challenge_stats',
+    sa.Column('challenge_id', sa.Integer(), nullable=False),
+    sa.Column('attempt_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('solve_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('first_solver_id', sa.Integer(), nullable=True),
+    sa.Column('first_solve_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['challenge_id'], ['challenges.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['first_solver_id'], ['teams.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('challenge_id')
+    )
+
+    # Existing attempts have no timestamp, so first_solve_at starts empty
+    op.execute("""
+        INSERT INTO challenge_stats (challenge_id, attempt_count, solve_count, first_solver_id)
+        SELECT
+            attempts.challenge_id,
+            COUNT(*),
+            COUNT(DISTINCT CASE WHEN attempts.is_correct THEN attempts.team_id END),
+            (
+                SELECT first.team_id
+                FROM attempts AS first
+                WHERE first.challenge_id = attempts.challenge_id AND first.is_correct
+                ORDER BY first.id
+                LIMIT 1
+            )
+        FROM attempts
+        WHERE attempts.challenge_id IS NOT NULL
+        GROUP BY attempts.challenge_id
+    """)
+
+
+def downgrade():
+    op.drop_table('challenge_stats')
+    op.drop_column('attempts', 'created_at')
+    op.drop_column('attempts', 'is_correct')
@@ -0,0 +1,109 @@
+"""partitioned attempts by day
+
+Revision ID: 7f3b8a1c6e52
+Revises: 0c7d5e9a3f18
+Create Date: 2026-10-19 17:48:36.190527
+
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3b8a1c6e52'
+down_revision = '0c7d5e9a3f18'
+branch_labels = None
+depends_on = None
+
+
+ATTEMPT_COLUMNS = "id, flag, is_correct, created_at, team_id, challenge_id"
+
+
+def create_day_partition(day):
+    op.execute(f"""
+        CREATE TABLE attempts_p{day:%Y%m%d} PARTITION OF attempts
+        FOR VALUES FROM ('{day:%Y-%m-%d}') TO ('{day + timedelta(days=1):%Y-%m-%d}')
+    """)
+
+
+def upgrade():
+    op.drop_index('ix_attempts_challenge_id_created_at', table_name='attempts')
+    op.drop_index('ix_attempts_team_id_created_at', table_name='attempts')
+
+    op.execute("ALTER TABLE attempts RENAME TO attempts_unpartitioned")
+    op.execute("ALTER TABLE attempts_unpartitioned RENAME CONSTRAINT attempts_pkey TO attempts_unpartitioned_pkey")
+
+    # The partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE attempts (
+            id INTEGER NOT NULL DEFAULT nextval('attempts_id_seq'),
+            flag VARCHAR NOT NULL,
+            is_correct BOOLEAN DEFAULT false NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            team_id INTEGER REFERENCES teams (id),
+            challenge_id INTEGER REFERENCES challenges (id),
+            CONSTRAINT attempts_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE attempts_id_seq OWNED BY attempts.id")
+
+    # Catches rows of days that have no partition yet
+    op.execute("CREATE TABLE attempts_default PARTITION OF attempts DEFAULT")
+
+    # Detached partitions are attached here, see partition_ops.archive_partition
+    op.execute("""
+        CREATE TABLE attempts_archive (LIKE attempts INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_at)
+    """)
+
+    bind = op.get_bind()
+    first_day, last_day = bind.execute(
+        "SELECT MIN(created_at)::date, MAX(created_at)::date FROM attempts_unpartitioned"
+    ).first()
+
+    if first_day is not None:
+        for offset in range((last_day - first_day).days + 1):
+            create_day_partition(first_day + timedelta(days=offset))
+
+    op.execute(f"""
+        INSERT INTO attempts ({ ATTEMPT_COLUMNS })
+        SELECT { ATTEMPT_COLUMNS } FROM attempts_unpartitioned
+    """)
+    op.drop_table('attempts_unpartitioned')
+
+    op.create_index('ix_attempts_team_id_created_at', 'attempts', ['team_id', 'created_at'], unique=False)
+    op.create_index('ix_attempts_challenge_id_created_at', 'attempts', ['challenge_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    # Rows of archived partitions are dropped with attempts_archive
+    op.execute("ALTER TABLE attempts RENAME TO attempts_partitioned")
+    op.execute("ALTER TABLE attempts_partitioned RENAME CONSTRAINT attempts_pkey TO attempts_partitioned_pkey")
+    op.drop_index('ix_attempts_challenge_id_created_at', table_name='attempts_partitioned')
+    op.drop_index('ix_attempts_team_id_created_at', table_name='attempts_partitioned')
+
+    op.create_table('attempts',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('attempts_id_seq')"), nullable=False),
+    sa.Column('flag', sa.String(), nullable=False),
+    sa.Column('is_correct', sa.Boolean(), server_default=sa.false(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('challenge_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['challenge_id'], ['challenges.id'], ),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("ALTER SEQUENCE attempts_id_seq OWNED BY attempts.id")
+
+    op.execute(f"""
+        INSERT INTO attempts ({ ATTEMPT_COLUMNS })
+        SELECT { ATTEMPT_COLUMNS } FROM attempts_partitioned
+    """)
+
+    op.execute("DROP TABLE attempts_partitioned CASCADE")
+    op.execute("DROP TABLE attempts_archive CASCADE")
+
+    op.create_index('ix_attempts_team_id_created_at', 'attempts', ['team_id', 'created_at'], unique=False)
+    op.create_index('ix_attempts_challenge_id_created_at', 'attempts', ['challenge_id', 'created_at'], unique=False)
@@ -0,0 +1,41 @@
+"""added member_count and invite_count to teams
+
+Revision ID: 9e2d41c7a8f3
+Revises: 3c1f0a9d2b7e
+Create Date: 2026-10-19 11:03:17.902514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e2d41c7a8f3'
+down_revision = '3c1f0a9d2b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('teams', sa.Column('member_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('teams', sa.Column('invite_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE teams
+        SET
+            member_count = (
+                SELECT COUNT(*)
+                FROM users
+                WHERE users.team_id = teams.id
+            ),
+            invite_count = (
+                SELECT COUNT(*)
+                FROM team_player_invite_table
+                WHERE team_player_invite_table.team_id = teams.id
+            )
+    """)
+
+
+def downgrade():
+    op.drop_column('teams', 'invite_count')
+    op.drop_column('teams', 'member_count')
@@ -0,0 +1,28 @@
+"""added dynamic scoring to challenges
+
+Revision ID: b4c19e7d2a60
+Revises: 5a8e0f3d91c6
+Create Date: 2026-10-19 15:42:08.311954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4c19e7d2a60'
+down_revision = '5a8e0f3d91c6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('challenges', sa.Column('initial_value', sa.Integer(), server_default='500', nullable=False))
+    op.add_column('challenges', sa.Column('minimum_value', sa.Integer(), server_default='100', nullable=False))
+    op.add_column('challenges', sa.Column('decay', sa.Integer(), server_default='50', nullable=False))
+
+
+def downgrade():
+    op.drop_column('challenges', 'decay')
+    op.drop_column('challenges', 'minimum_value')
+    op.drop_column('challenges', 'initial_value')
@@ -0,0 +1,28 @@
+"""added scoreboard_invalidations table
+
+Revision ID: c2e7a94f1d35
+Revises: 7f3b8a1c6e52
+Create Date: 2026-10-19 18:42:13.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e7a94f1d35'
+down_revision = '7f3b8a1c6e52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scoreboard_invalidations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('scoreboard_invalidations')
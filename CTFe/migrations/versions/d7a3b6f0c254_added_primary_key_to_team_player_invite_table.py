@@ -0,0 +1,57 @@
+"""added primary key to team_player_invite_table
+
+Revision ID: d7a3b6f0c254
+Revises: 9e2d41c7a8f3
+Create Date: 2026-10-19 12:26:50.114093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3b6f0c254'
+down_revision = '9e2d41c7a8f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Drop incomplete and duplicated invites before adding the primary key
+    op.execute("""
+        DELETE FROM team_player_invite_table
+        WHERE team_id IS NULL OR user_id IS NULL
+    """)
+    op.execute("""
+        DELETE FROM team_player_invite_table a
+        USING team_player_invite_table b
+        WHERE a.ctid < b.ctid
+            AND a.team_id = b.team_id
+            AND a.user_id = b.user_id
+    """)
+    op.execute("""
+        UPDATE teams
+        SET invite_count = (
+            SELECT COUNT(*)
+            FROM team_player_invite_table
+            WHERE team_player_invite_table.team_id = teams.id
+        )
+    """)
+
+    op.alter_column('team_player_invite_table', 'team_id', existing_type=sa.Integer(), nullable=False)
+    op.alter_column('team_player_invite_table', 'user_id', existing_type=sa.Integer(), nullable=False)
+    op.create_primary_key(
+        'team_player_invite_table_pkey', 'team_player_invite_table',
+        ['team_id', 'user_id'],
+    )
+    op.create_index(
+        'ix_team_player_invite_table_user_id', 'team_player_invite_table',
+        ['user_id'], unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_team_player_invite_table_user_id', table_name='team_player_invite_table')
+    op.drop_constraint('team_player_invite_table_pkey', 'team_player_invite_table', type_='primary')
+    op.alter_column('team_player_invite_table', 'user_id', existing_type=sa.Integer(), nullable=True)
+    op.alter_column('team_player_invite_table', 'team_id', existing_type=sa.Integer(), nullable=True)
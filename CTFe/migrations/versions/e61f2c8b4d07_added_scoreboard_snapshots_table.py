@@ -0,0 +1,32 @@
+"""added scoreboard_snapshots table
+
+Revision ID: e61f2c8b4d07
+Revises: b4c19e7d2a60
+Create Date: 2026-10-19 16:20:41.528306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e61f2c8b4d07'
+down_revision = 'b4c19e7d2a60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scoreboard_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('frozen_at', sa.DateTime(), nullable=False),
+    sa.Column('unfrozen_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_scoreboard_snapshots_active', 'scoreboard_snapshots', [sa.text('(unfrozen_at IS NULL)')], unique=True, postgresql_where=sa.text('unfrozen_at IS NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_scoreboard_snapshots_active', table_name='scoreboard_snapshots')
+    op.drop_table('scoreboard_snapshots')
@@ -2,3 +2,6 @@ from CTFe.models.user_model import User
 from CTFe.models.team_model import Team
 from CTFe.models.challenge_model import Challenge
 from CTFe.models.attempt_model import Attempt
+from CTFe.models.challenge_stats_model import ChallengeStats
+from CTFe.models.scoreboard_snapshot_model import ScoreboardSnapshot
+from CTFe.models.scoreboard_invalidation_model import ScoreboardInvalidation
@@ -3,8 +3,11 @@ import sqlalchemy as sa
 from CTFe.config.database import Base
 
 
+# The primary key makes (team_id, user_id) unique, so invites can be inserted
+# with ON CONFLICT DO NOTHING and checked with a single index lookup
 team_player_invite_table = sa.Table(
     "team_player_invite_table", Base.metadata,
-    sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id")),
-    sa.Column('user_id', sa.Integer(), sa.ForeignKey("users.id")),
+    sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id"), primary_key=True),
+    sa.Column('user_id', sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+    sa.Index("ix_team_player_invite_table_user_id", "user_id"),
 )
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 import sqlalchemy as sa
 from sqlalchemy.orm import relationship
 
@@ -5,6 +7,8 @@ from CTFe.config.database import Base
 
 
 class Attempt(Base):
+    # Partitioned by day on <created_at> by the migrations, which makes the
+    # primary key (id, created_at) there. <id> alone is still unique
     __tablename__ = "attempts"
 
     id = sa.Column(
@@ -15,6 +19,18 @@ class Attempt(Base):
         sa.String(),
         nullable=False,
     )
+    is_correct = sa.Column(
+        sa.Boolean(),
+        nullable=False,
+        default=False,
+        server_default=sa.false(),
+    )
+    # Set by attempt_ops.create_attempt, used to break scoreboard ties
+    created_at = sa.Column(
+        sa.DateTime(),
+        nullable=False,
+        default=datetime.utcnow,
+    )
     team_id = sa.Column(
         sa.Integer(),
         sa.ForeignKey("teams.id"),
@@ -32,10 +48,24 @@ class Attempt(Base):
         back_populates="attempts",
     )
 
+    __table_args__ = (
+        sa.Index("ix_attempts_team_id_created_at", "team_id", "created_at"),
+        sa.Index("ix_attempts_challenge_id_created_at", "challenge_id", "created_at"),
+    )
+
     def __repr__(self):
         return f"<Attempt { self.id }>"
 
-    def __init__(self, flag, team_id, challenge_id):
+    def __init__(self, flag, team_id, challenge_id, is_correct=False):
         self.flag = flag
         self.team_id = team_id
         self.challenge_id = challenge_id
+        self.is_correct = is_correct
+
+
+# Parent of the partitions detached from <attempts> by partition_ops, only
+# created by the migrations, so it is kept out of Base.metadata
+archived_attempts = sa.table(
+    "attempts_archive",
+    *(sa.column(column.name) for column in Attempt.__table__.columns),
+)
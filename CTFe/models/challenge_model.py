@@ -3,7 +3,9 @@ from datetime import datetime
 import sqlalchemy as sa
 from sqlalchemy.orm import relationship
 
+from CTFe.config import constants
 from CTFe.config.database import Base
+from CTFe.utils import scoring_utils
 
 
 class Challenge(Base):
@@ -30,6 +32,25 @@ class Challenge(Base):
         sa.String(),
         nullable=True,
     )
+    # Dynamic scoring parameters, see scoring_utils.decayed_value
+    initial_value = sa.Column(
+        sa.Integer(),
+        nullable=False,
+        default=constants.CHALLENGE_INITIAL_VALUE,
+        server_default=str(constants.CHALLENGE_INITIAL_VALUE),
+    )
+    minimum_value = sa.Column(
+        sa.Integer(),
+        nullable=False,
+        default=constants.CHALLENGE_MINIMUM_VALUE,
+        server_default=str(constants.CHALLENGE_MINIMUM_VALUE),
+    )
+    decay = sa.Column(
+        sa.Integer(),
+        nullable=False,
+        default=constants.CHALLENGE_DECAY,
+        server_default=str(constants.CHALLENGE_DECAY),
+    )
     created_at = sa.Column(
         sa.DateTime(),
         nullable=False,
@@ -48,6 +69,25 @@ class Challenge(Base):
         "User",
         back_populates="challenges",
     )
+    stats = relationship(
+        "ChallengeStats",
+        back_populates="challenge",
+        uselist=False,
+        lazy="joined",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
     def __repr__(self):
         return f"<Challenge { self.id }>"
+
+    @property
+    def value(self) -> int:
+        solve_count = self.stats.solve_count if self.stats is not None else 0
+
+        return scoring_utils.decayed_value(
+            self.initial_value,
+            self.minimum_value,
+            self.decay,
+            solve_count,
+        )
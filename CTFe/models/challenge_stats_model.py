@@ -0,0 +1,45 @@
+import sqlalchemy as sa
+from sqlalchemy.orm import relationship
+
+from CTFe.config.database import Base
+
+
+class ChallengeStats(Base):
+    """ Solve aggregates of a challenge, maintained by challenge_ops.record_attempt """
+
+    __tablename__ = "challenge_stats"
+
+    challenge_id = sa.Column(
+        sa.Integer(),
+        sa.ForeignKey("challenges.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    challenge = relationship(
+        "Challenge",
+        back_populates="stats",
+    )
+    attempt_count = sa.Column(
+        sa.Integer(),
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+    # Number of distinct teams that solved the challenge
+    solve_count = sa.Column(
+        sa.Integer(),
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+    first_solver_id = sa.Column(
+        sa.Integer(),
+        sa.ForeignKey("teams.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    first_solve_at = sa.Column(
+        sa.DateTime(),
+        nullable=True,
+    )
+
+    def __repr__(self):
+        return f"<ChallengeStats { self.challenge_id }>"
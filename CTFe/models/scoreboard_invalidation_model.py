@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from CTFe.config.database import Base
+
+
+class ScoreboardInvalidation(Base):
+    """ Change the live scoreboards can't apply incrementally
+
+    The highest id is the scoreboard generation; every worker rebuilds its
+    live scoreboard when the generation moved since it was built.
+    """
+
+    __tablename__ = "scoreboard_invalidations"
+
+    id = sa.Column(
+        sa.Integer(),
+        primary_key=True,
+    )
+    created_at = sa.Column(
+        sa.DateTime(),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+    def __repr__(self):
+        return f"<ScoreboardInvalidation { self.id }>"
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from CTFe.config.database import Base
+
+
+class ScoreboardSnapshot(Base):
+    """ Serialized public scoreboard, frozen while <unfrozen_at> is not set """
+
+    __tablename__ = "scoreboard_snapshots"
+
+    id = sa.Column(
+        sa.Integer(),
+        primary_key=True,
+    )
+    # The rendered /scoreboard/ response body, served as is
+    data = sa.Column(
+        sa.LargeBinary(),
+        nullable=False,
+    )
+    frozen_at = sa.Column(
+        sa.DateTime(),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    unfrozen_at = sa.Column(
+        sa.DateTime(),
+        nullable=True,
+    )
+
+    __table_args__ = (
+        # At most one freeze can be active
+        sa.Index(
+            "ix_scoreboard_snapshots_active",
+            sa.literal_column("(unfrozen_at IS NULL)"),
+            unique=True,
+            postgresql_where=sa.text("unfrozen_at IS NULL"),
+            sqlite_where=sa.text("unfrozen_at IS NULL"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<ScoreboardSnapshot { self.id }>"
@@ -1,6 +1,5 @@
 import sqlalchemy as sa
 from sqlalchemy.orm import relationship
-from sqlalchemy.ext.hybrid import hybrid_property
 
 from CTFe.config.database import Base
 from CTFe.models.association_tables import team_player_invite_table
@@ -21,6 +20,36 @@ class Team(Base):
     players = relationship(
         "User",
         back_populates="team",
+        foreign_keys="User.team_id",
+    )
+    # Kept up to date by player_ops, so reading it never loads <players>
+    captain_id = sa.Column(
+        sa.Integer(),
+        sa.ForeignKey(
+            "users.id",
+            use_alter=True,
+            name="fk_teams_captain_id_users",
+            ondelete="SET NULL",
+        ),
+    )
+    captain = relationship(
+        "User",
+        foreign_keys=[captain_id],
+        post_update=True,
+        lazy="joined",
+    )
+    # Counter caches of len(players) and len(player_invites), kept by player_ops
+    member_count = sa.Column(
+        sa.Integer(),
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+    invite_count = sa.Column(
+        sa.Integer(),
+        nullable=False,
+        default=0,
+        server_default="0",
     )
 
     attempts = relationship(
@@ -39,9 +68,3 @@ class Team(Base):
 
     def __init__(self, name):
         self.name = name
-
-    @hybrid_property
-    def captain(self):
-        if len(self.players) > 0:
-            return self.players[0]
-        return None
@@ -1,13 +1,9 @@
 import sqlalchemy as sa
-from sqlalchemy import event
 from sqlalchemy.orm import relationship
 
 from CTFe.config.database import Base
 from CTFe.models.association_tables import team_player_invite_table
-from CTFe.utils import (
-    enums,
-    pwd_utils,
-)
+from CTFe.utils import enums
 
 
 class User(Base):
@@ -22,6 +18,7 @@ class User(Base):
         unique=True,
         nullable=False,
     )
+    # Always a hash, see credential_ops.hash_password
     password = sa.Column(
         sa.String(),
         nullable=False,
@@ -39,6 +36,7 @@ class User(Base):
     team = relationship(
         "Team",
         back_populates="players",
+        foreign_keys=[team_id],
     )
     team_invites = relationship(
         "Team",
@@ -53,10 +51,3 @@ class User(Base):
 
     def __repr__(self):
         return f"<User { self.id }>"
-
-
-@event.listens_for(User.password, "set", retval=True)
-def hash_password(target, value, oldvalue, initiator):
-    hashed_password = pwd_utils.hash_password(value)
-
-    return hashed_password
@@ -1,15 +1,28 @@
+import time
+import functools
 from typing import Optional
 
 from pydantic import BaseModel as SchemaBase
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import (
     Session,
     Query,
 )
-from sqlalchemy.sql.expression import BooleanClauseList
+from sqlalchemy.sql.expression import (
+    BooleanClauseList,
+    Insert,
+)
 
+from CTFe.config import constants
 from CTFe.config.database import Base as ModelBase
 
 
+# Postgres SQLSTATEs worth retrying: serialization_failure, deadlock_detected
+RETRYABLE_PGCODES = {"40001", "40P01"}
+
+
 def create_record(
     session: Session,
     Model: ModelBase,
@@ -37,6 +50,7 @@ def query_records(
         session
         .query(Model)
         .filter(conditions)
+        .execution_options(origin=f"query_records:{ Model.__name__ }")
     )
 
     return query
@@ -66,3 +80,60 @@ def delete_record(
 
     session.delete(db_model)
     session.commit()
+
+
+def insert_ignore(
+    session: Session,
+    table: Table,
+) -> Insert:
+    """ INSERT skipping rows that conflict with a unique constraint, for the session's DB
+
+    Check the result's rowcount to tell inserted rows from skipped ones.
+    """
+
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+
+    return table.insert().prefix_with("OR IGNORE")
+
+
+def lock_record(
+    session: Session,
+    Model: ModelBase,
+    id: int,
+) -> Optional[ModelBase]:
+    """ Load DB record with SELECT ... FOR UPDATE until the transaction ends """
+
+    db_model = (
+        session
+        .query(Model)
+        .filter(Model.id == id)
+        .with_for_update(of=Model)
+        .populate_existing()
+        .first()
+    )
+
+    return db_model
+
+
+def retry_on_conflict(operation):
+    """ Re-run a transaction (whose first argument is the session) on serialization failures """
+
+    @functools.wraps(operation)
+    def wrapper(session: Session, *args, **kwargs):
+        for attempt in range(constants.DB_TRANSACTION_RETRIES + 1):
+            try:
+                return operation(session, *args, **kwargs)
+            except DBAPIError as error:
+                session.rollback()
+
+                pgcode = getattr(error.orig, "pgcode", None)
+                if (
+                    pgcode not in RETRYABLE_PGCODES
+                    or attempt == constants.DB_TRANSACTION_RETRIES
+                ):
+                    raise
+
+                time.sleep(constants.DB_RETRY_BACKOFF * (attempt + 1))
+
+    return wrapper
@@ -1,3 +1,5 @@
+import hmac
+from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import and_
@@ -8,11 +10,18 @@ from sqlalchemy.orm import (
 from sqlalchemy.sql.expression import BooleanClauseList
 
 from CTFe.operations.CRUD_ops import (
-    create_record,
     query_records,
     delete_record,
 )
-from CTFe.models import Attempt
+from CTFe.operations import (
+    challenge_ops,
+    partition_ops,
+    scoreboard_ops,
+)
+from CTFe.models import (
+    Attempt,
+    Challenge,
+)
 from CTFe.schemas import attempt_schemas
 
 
@@ -20,9 +29,37 @@ def create_attempt(
     session: Session,
     attempt_create: attempt_schemas.Create,
 ) -> Attempt:
-    """ Create attempt record """
+    """ Create attempt record, checking the flag and updating the challenge stats """
+
+    challenge_flag = (
+        session
+        .query(Challenge.flag)
+        .filter(Challenge.id == attempt_create.challenge_id)
+        .scalar()
+    )
+
+    is_correct = challenge_flag is not None and hmac.compare_digest(
+        attempt_create.flag.encode(), challenge_flag.encode())
+
+    attempted_at = datetime.utcnow()
 
-    db_attempt = create_record(session, Attempt, attempt_create)
+    is_first_solve = challenge_ops.record_attempt(
+        session,
+        attempt_create.challenge_id,
+        attempt_create.team_id,
+        is_correct,
+        attempted_at,
+    )
+
+    db_attempt = Attempt(**attempt_create.dict(), is_correct=is_correct)
+    db_attempt.created_at = attempted_at
+
+    session.add(db_attempt)
+    session.commit()
+    session.refresh(db_attempt)
+
+    if is_first_solve:
+        scoreboard_ops.record_solve(session, db_attempt)
 
     return db_attempt
 
@@ -30,10 +67,20 @@ def create_attempt(
 def query_attempts_by_(
     session: Session,
     conditions: Optional[BooleanClauseList] = and_(),
+    include_archived: bool = False,
 ) -> Query:
-    """ Query attempt records """
+    """ Query attempt records, from archived partitions too if <include_archived> """
 
-    query_attempts = query_records(session, Attempt, conditions)
+    if not include_archived:
+        return query_records(session, Attempt, conditions)
+
+    # <conditions> are written against Attempt, select_entity_from adapts them
+    query_attempts = (
+        session
+        .query(Attempt)
+        .select_entity_from(partition_ops.all_attempts())
+        .filter(conditions)
+    )
 
     return query_attempts
 
@@ -45,3 +92,6 @@ def delete_attempt(
     """ Delete attempt record """
 
     delete_record(session, db_attempt)
+
+    if db_attempt.is_correct:
+        scoreboard_ops.invalidate_scoreboard(session)
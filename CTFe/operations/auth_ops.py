@@ -66,7 +66,7 @@ def get_current_user(
     )
 
     try:
-        payload = jwt_utils.decode(token)
+        payload = jwt_utils.token_cache.decode(token)
     except ExpiredSignatureError:
         raise credentials_exception
     except JWTError:
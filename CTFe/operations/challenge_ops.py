@@ -1,7 +1,15 @@
 import os
+from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import and_
+from sqlalchemy import (
+    and_,
+    case,
+    distinct,
+    exists,
+    func,
+)
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import (
     Session,
     Query,
@@ -11,11 +19,19 @@ from fastapi import UploadFile
 
 from CTFe.operations.CRUD_ops import (
     create_record,
+    insert_ignore,
     query_records,
     update_record,
     delete_record,
 )
-from CTFe.models import Challenge
+from CTFe.operations import (
+    partition_ops,
+    scoreboard_ops,
+)
+from CTFe.models import (
+    Challenge,
+    ChallengeStats,
+)
 from CTFe.schemas import challenge_schemas
 from CTFe.config import constants
 
@@ -51,6 +67,10 @@ def update_challenge(
 
     db_challenge = update_record(session, db_challenge, challenge_update)
 
+    scoring_fields = {"initial_value", "minimum_value", "decay"}
+    if scoring_fields & challenge_update.dict(exclude_unset=True).keys():
+        scoreboard_ops.invalidate_scoreboard(session)
+
     return db_challenge
 
 
@@ -88,3 +108,136 @@ def delete_challenge(
     """ Delete challenge record """
 
     delete_record(session, db_challenge)
+
+    scoreboard_ops.invalidate_scoreboard(session)
+
+
+def record_attempt(
+    session: Session,
+    challenge_id: int,
+    team_id: int,
+    is_correct: bool,
+    attempted_at: datetime,
+) -> bool:
+    """ Count an attempt in the challenge stats, True if it is the team's first solve
+
+    Must run before the attempt itself is inserted, in the same transaction.
+    The upsert locks the stats row, which serializes solves of one challenge.
+    """
+
+    if session.get_bind().dialect.name == "postgresql":
+        statement = (
+            postgresql.insert(ChallengeStats.__table__)
+            .values(challenge_id=challenge_id, attempt_count=1, solve_count=0)
+            .on_conflict_do_update(
+                index_elements=[ChallengeStats.challenge_id],
+                set_={"attempt_count": ChallengeStats.attempt_count + 1},
+            )
+        )
+
+        session.execute(statement)
+    else:
+        # SQLAlchemy has no upsert for other DBs, create the row then count
+        session.execute(
+            insert_ignore(session, ChallengeStats.__table__)
+            .values(challenge_id=challenge_id, attempt_count=0, solve_count=0)
+        )
+        (
+            session
+            .query(ChallengeStats)
+            .filter(ChallengeStats.challenge_id == challenge_id)
+            .update(
+                {ChallengeStats.attempt_count: ChallengeStats.attempt_count + 1},
+                synchronize_session=False,
+            )
+        )
+
+    if not is_correct:
+        return False
+
+    # An earlier solve may have been archived since
+    attempts = partition_ops.attempt_entity(session, include_archived=True)
+
+    conditions = and_(
+        attempts.team_id == team_id,
+        attempts.challenge_id == challenge_id,
+        attempts.is_correct.is_(True),
+    )
+
+    if session.query(exists().where(conditions)).scalar():
+        return False
+
+    (
+        session
+        .query(ChallengeStats)
+        .filter(ChallengeStats.challenge_id == challenge_id)
+        .update(
+            {
+                ChallengeStats.solve_count: ChallengeStats.solve_count + 1,
+                ChallengeStats.first_solver_id: func.coalesce(
+                    ChallengeStats.first_solver_id, team_id),
+                ChallengeStats.first_solve_at: func.coalesce(
+                    ChallengeStats.first_solve_at, attempted_at),
+            },
+            synchronize_session=False,
+        )
+    )
+
+    return True
+
+
+def rebuild_challenge_stats(
+    session: Session,
+) -> int:
+    """ Recompute the stats of every challenge from the attempts, archived ones included """
+
+    # Keep record_attempt from writing while the table is rebuilt
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute("LOCK TABLE challenge_stats IN SHARE ROW EXCLUSIVE MODE")
+
+    session.query(ChallengeStats).delete(synchronize_session=False)
+
+    attempts = partition_ops.attempt_entity(session, include_archived=True)
+
+    totals = (
+        session
+        .query(
+            attempts.challenge_id,
+            func.count(attempts.id),
+            func.count(distinct(case([(attempts.is_correct, attempts.team_id)]))),
+        )
+        .group_by(attempts.challenge_id)
+        .all()
+    )
+
+    # Attempt ids grow with time, so the lowest correct id is the first blood
+    first_solve_ids = (
+        session
+        .query(func.min(attempts.id))
+        .filter(attempts.is_correct.is_(True))
+        .group_by(attempts.challenge_id)
+    )
+
+    first_solves = {
+        challenge_id: (team_id, created_at)
+        for challenge_id, team_id, created_at in (
+            session
+            .query(attempts.challenge_id, attempts.team_id, attempts.created_at)
+            .filter(attempts.id.in_(first_solve_ids.subquery()))
+        )
+    }
+
+    session.bulk_insert_mappings(ChallengeStats, [
+        {
+            "challenge_id": challenge_id,
+            "attempt_count": attempt_count,
+            "solve_count": solve_count,
+            "first_solver_id": first_solves.get(challenge_id, (None, None))[0],
+            "first_solve_at": first_solves.get(challenge_id, (None, None))[1],
+        }
+        for challenge_id, attempt_count, solve_count in totals
+    ])
+
+    session.commit()
+
+    return len(totals)
@@ -12,7 +12,10 @@ from CTFe.operations.CRUD_ops import (
     update_record,
     delete_record,
 )
-from CTFe.operations import challenge_ops
+from CTFe.operations import (
+    challenge_ops,
+    credential_ops,
+)
 from CTFe.models import (
     User,
     Challenge,
@@ -40,13 +43,17 @@ def query_contributors_by_(
     return query_contributors
 
 
-def update_contributor(
+async def update_contributor(
     session: Session,
     db_contributor: User,
     contributor_update: contributor_schemas.Update,
 ) -> User:
     """ Update contributor record """
 
+    if contributor_update.password is not None:
+        hashed_password = await credential_ops.hash_password(contributor_update.password)
+        contributor_update = contributor_update.copy(update={"password": hashed_password})
+
     db_contributor = update_record(session, db_contributor, contributor_update)
 
     return db_contributor
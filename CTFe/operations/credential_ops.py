@@ -0,0 +1,30 @@
+from typing import (
+    Optional,
+    Tuple,
+)
+
+from fastapi.concurrency import run_in_threadpool
+
+from CTFe.utils import pwd_utils
+
+
+async def hash_password(
+    plain_password: str,
+) -> str:
+    """ Hash a password in the threadpool so the event loop keeps serving requests """
+
+    hashed_password = await run_in_threadpool(pwd_utils.hash_password, plain_password)
+
+    return hashed_password
+
+
+async def verify_password(
+    plain_password: str,
+    hashed_password: str,
+) -> Tuple[bool, Optional[str]]:
+    """ Verify a password in the threadpool, see pwd_utils.verify_password """
+
+    result = await run_in_threadpool(
+        pwd_utils.verify_password, plain_password, hashed_password)
+
+    return result
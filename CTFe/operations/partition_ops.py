@@ -0,0 +1,273 @@
+import gzip
+import os
+import re
+from datetime import (
+    date,
+    datetime,
+    timedelta,
+)
+from typing import (
+    List,
+    Tuple,
+)
+
+from sqlalchemy import (
+    and_,
+    or_,
+    select,
+    union_all,
+)
+from sqlalchemy.orm import (
+    Session,
+    aliased,
+)
+
+from CTFe.models import (
+    Attempt,
+    Challenge,
+    Team,
+)
+from CTFe.models.attempt_model import archived_attempts
+
+
+PARTITION_NAME_RE = re.compile(r"^attempts_p(\d{8})$")
+
+
+def partition_name(day: date) -> str:
+    return f"attempts_p{day:%Y%m%d}"
+
+
+def partition_bounds(day: date) -> str:
+    return f"FOR VALUES FROM ('{day:%Y-%m-%d}') TO ('{day + timedelta(days=1):%Y-%m-%d}')"
+
+
+def is_partitioned(
+    session: Session,
+    table: str,
+) -> bool:
+    """ Whether <table> is a partitioned postgres table """
+
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+
+    return session.execute(
+        """
+        SELECT 1
+        FROM pg_partitioned_table
+        JOIN pg_class ON pg_class.oid = pg_partitioned_table.partrelid
+        WHERE pg_class.relname = :table
+        """,
+        {"table": table},
+    ).first() is not None
+
+
+def all_attempts():
+    """ Rows of <attempts> and <attempts_archive>, with the columns of Attempt
+
+    Archived partitions have no foreign keys, so their rows can outlive
+    their team or challenge. Those are left out, as deleting the team or
+    challenge deletes the matching live attempts.
+    """
+
+    columns = Attempt.__table__.columns
+    archived = archived_attempts.c
+
+    return union_all(
+        select(list(columns)),
+        select([archived[column.name] for column in columns]).where(
+            and_(
+                or_(archived.team_id.is_(None), archived.team_id.in_(select([Team.id]))),
+                or_(
+                    archived.challenge_id.is_(None),
+                    archived.challenge_id.in_(select([Challenge.id])),
+                ),
+            )
+        ),
+    ).alias("all_attempts")
+
+
+def attempt_entity(
+    session: Session,
+    include_archived: bool = False,
+):
+    """ Attempt, read from the archived partitions too if <include_archived>
+
+    Rebuilds of derived data (scoreboard, challenge stats) use this, so
+    archiving a day doesn't take its attempts out of them.
+    """
+
+    if include_archived and is_partitioned(session, "attempts_archive"):
+        return aliased(Attempt, all_attempts())
+
+    return Attempt
+
+
+def query_partitions(
+    session: Session,
+    parent: str = "attempts",
+) -> List[Tuple[str, date]]:
+    """ (name, day) of the day partitions attached to <parent>, oldest first """
+
+    names = session.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent
+        """,
+        {"parent": parent},
+    )
+
+    partitions = []
+    for name, in names:
+        match = PARTITION_NAME_RE.match(name)
+
+        if match is not None:
+            partitions.append((name, datetime.strptime(match[1], "%Y%m%d").date()))
+
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partition(
+    session: Session,
+    day: date,
+):
+    """ Create the partition of <day>, moving its rows out of the default partition
+
+    Postgres refuses to attach a partition while the default partition holds
+    rows for its range, so those rows are moved over first.
+    """
+
+    name = partition_name(day)
+    bounds = f"created_at >= '{day:%Y-%m-%d}' AND created_at < '{day + timedelta(days=1):%Y-%m-%d}'"
+
+    session.execute("LOCK TABLE attempts_default IN SHARE ROW EXCLUSIVE MODE")
+    session.execute(f"CREATE TABLE { name } (LIKE attempts INCLUDING DEFAULTS)")
+    session.execute(f"INSERT INTO { name } SELECT * FROM attempts_default WHERE { bounds }")
+    session.execute(f"DELETE FROM attempts_default WHERE { bounds }")
+    session.execute(f"ALTER TABLE attempts ATTACH PARTITION { name } { partition_bounds(day) }")
+
+    session.commit()
+
+
+def query_default_days(
+    session: Session,
+) -> List[date]:
+    """ Days of the attempts that fell into the default partition, oldest first """
+
+    days = session.execute(
+        "SELECT DISTINCT CAST(created_at AS date) FROM attempts_default ORDER BY 1"
+    )
+
+    return [day for day, in days]
+
+
+def ensure_partitions(
+    session: Session,
+    first_day: date,
+    days: int,
+) -> List[str]:
+    """ Create the missing partitions of <days> days from <first_day>, returning their names """
+
+    existing = {day for _, day in query_partitions(session)}
+    existing |= {day for _, day in query_partitions(session, "attempts_archive")}
+
+    created = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+
+        if day not in existing:
+            create_partition(session, day)
+            created.append(partition_name(day))
+
+    return created
+
+
+def partition_default_rows(
+    session: Session,
+) -> List[str]:
+    """ Move the rows of the default partition to new partitions of their days
+
+    Rows of archived days are left where they are, returns the new partitions.
+    """
+
+    archived = {day for _, day in query_partitions(session, "attempts_archive")}
+
+    created = []
+    for day in query_default_days(session):
+        if day not in archived:
+            create_partition(session, day)
+            created.append(partition_name(day))
+
+    return created
+
+
+def drop_foreign_keys(
+    session: Session,
+    table: str,
+):
+    """ Drop the foreign key constraints of <table> """
+
+    constraints = session.execute(
+        """
+        SELECT conname
+        FROM pg_constraint
+        WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'
+        """,
+        {"table": table},
+    ).fetchall()
+
+    for constraint, in constraints:
+        session.execute(f'ALTER TABLE { table } DROP CONSTRAINT "{ constraint }"')
+
+
+def archive_partition(
+    session: Session,
+    name: str,
+    day: date,
+    output_dir: str,
+    drop: bool = False,
+) -> Tuple[str, int]:
+    """ Stream a partition to a gzipped CSV file and detach it from <attempts>
+
+    The detached partition is attached to <attempts_archive>, where the
+    scoreboard and challenge stats rebuilds still read it, or dropped if
+    <drop> is set. Its foreign keys, kept from <attempts> on detaching, are
+    dropped first so archived rows don't block deleting teams or challenges.
+    Dropping is refused while the partition holds attempts of existing
+    challenges, as the next rebuild would lose them. Returns the file path
+    and the number of rows written.
+    """
+
+    if drop and session.execute(
+        f"""
+        SELECT 1
+        FROM { name }
+        JOIN challenges ON challenges.id = { name }.challenge_id
+        LIMIT 1
+        """
+    ).first() is not None:
+        raise ValueError(f"{ name } holds attempts of existing challenges, archive it without dropping")
+
+    path = os.path.join(output_dir, f"{ name }.csv.gz")
+
+    # Block writes to the partition so the file matches what is detached
+    session.execute(f"LOCK TABLE { name } IN SHARE MODE")
+
+    cursor = session.connection().connection.cursor()
+    with gzip.open(path, "wt", encoding="utf-8") as output:
+        cursor.copy_expert(f"COPY { name } TO STDOUT WITH (FORMAT csv, HEADER)", output)
+    rows = cursor.rowcount
+
+    session.execute(f"ALTER TABLE attempts DETACH PARTITION { name }")
+
+    if drop:
+        session.execute(f"DROP TABLE { name }")
+    else:
+        drop_foreign_keys(session, name)
+        session.execute(f"ALTER TABLE attempts_archive ATTACH PARTITION { name } { partition_bounds(day) }")
+
+    session.commit()
+
+    return path, rows
@@ -1,6 +1,14 @@
-from typing import Optional
+from typing import (
+    List,
+    Optional,
+)
 
-from sqlalchemy import and_
+from sqlalchemy import (
+    and_,
+    or_,
+    func,
+    select,
+)
 from sqlalchemy.orm import (
     Session,
     Query,
@@ -8,16 +16,28 @@ from sqlalchemy.orm import (
 from sqlalchemy.sql.expression import BooleanClauseList
 
 from CTFe.operations.CRUD_ops import (
+    insert_ignore,
     query_records,
     update_record,
     delete_record,
+    lock_record,
+    retry_on_conflict,
+)
+from CTFe.operations import (
+    credential_ops,
+    scoreboard_ops,
 )
 from CTFe.models import (
     User,
     Team,
 )
-from CTFe.schemas import player_schemas
+from CTFe.models.association_tables import team_player_invite_table
+from CTFe.schemas import (
+    player_schemas,
+    team_schemas,
+)
 from CTFe.utils import enums
+from CTFe.config import constants
 
 
 def query_players_by_(
@@ -36,13 +56,17 @@ def query_players_by_(
     return query_players
 
 
-def update_player(
+async def update_player(
     session: Session,
     db_player: User,
     player_update: player_schemas.Update,
 ) -> User:
     """ Update player record """
 
+    if player_update.password is not None:
+        hashed_password = await credential_ops.hash_password(player_update.password)
+        player_update = player_update.copy(update={"password": hashed_password})
+
     db_player = update_record(session, db_player, player_update)
 
     return db_player
@@ -54,17 +78,166 @@ def delete_player(
 ):
     """ Delete player record """
 
+    release_memberships(session, db_player)
+
     delete_record(session, db_player)
 
 
+def release_memberships(
+    session: Session,
+    db_player: User,
+):
+    """ Keep team counters and captaincy right for a player that is about to be deleted """
+
+    if db_player.team_id is not None:
+        reassign_captain(session, db_player)
+        change_member_count(session, db_player.team_id, -1)
+
+    invited_team_ids = (
+        select([team_player_invite_table.c.team_id])
+        .where(team_player_invite_table.c.user_id == db_player.id)
+    )
+
+    (
+        session
+        .query(Team)
+        .filter(
+            and_(
+                Team.id.in_(invited_team_ids),
+                Team.invite_count > 0,
+            )
+        )
+        .update(
+            {Team.invite_count: Team.invite_count - 1},
+            synchronize_session=False,
+        )
+    )
+
+
+def reassign_captain(
+    session: Session,
+    db_player: User,
+):
+    """ Pass the captaincy on to the earliest remaining member, if <db_player> holds it """
+
+    next_captain_id = (
+        select([func.min(User.id)])
+        .where(
+            and_(
+                User.team_id == Team.id,
+                User.id != db_player.id,
+            )
+        )
+        .as_scalar()
+    )
+
+    conditions = and_(
+        Team.id == db_player.team_id,
+        Team.captain_id == db_player.id,
+    )
+
+    (
+        session
+        .query(Team)
+        .filter(conditions)
+        .update({Team.captain_id: next_captain_id}, synchronize_session=False)
+    )
+
+
+def change_member_count(
+    session: Session,
+    team_id: int,
+    delta: int,
+) -> bool:
+    """ Atomically move Team.member_count by <delta>
+
+    False if that would overfill the team or take the count below 0.
+    """
+
+    conditions = and_(Team.id == team_id)
+
+    if delta > 0:
+        conditions = and_(
+            conditions,
+            Team.member_count + delta <= constants.MAX_TEAM_MEMBERS,
+        )
+    elif delta < 0:
+        conditions = and_(
+            conditions,
+            Team.member_count + delta >= 0,
+        )
+
+    updated = (
+        session
+        .query(Team)
+        .filter(conditions)
+        .update(
+            {Team.member_count: Team.member_count + delta},
+            synchronize_session=False,
+        )
+    )
+
+    return updated == 1
+
+
+def change_invite_count(
+    session: Session,
+    team_id: int,
+    delta: int,
+) -> bool:
+    """ Atomically move Team.invite_count by <delta>
+
+    False if that would exceed the invite limit or take the count below 0.
+    """
+
+    conditions = and_(Team.id == team_id)
+
+    if delta > 0:
+        conditions = and_(
+            conditions,
+            Team.invite_count + delta <= constants.MAX_TEAM_INVITES,
+        )
+    elif delta < 0:
+        conditions = and_(
+            conditions,
+            Team.invite_count + delta >= 0,
+        )
+
+    updated = (
+        session
+        .query(Team)
+        .filter(conditions)
+        .update(
+            {Team.invite_count: Team.invite_count + delta},
+            synchronize_session=False,
+        )
+    )
+
+    return updated == 1
+
+
+@retry_on_conflict
 def lead_team(
     session: Session,
     db_player: User,
-    db_team: Team,
-) -> User:
-    """ Create team and assign player as the captain """
+    team_create: team_schemas.Create,
+) -> Optional[User]:
+    """ Create team and assign player as the captain, None if the player is already in a team """
 
-    db_player.team = db_team
+    db_player = lock_record(session, User, db_player.id)
+
+    if db_player.team_id is not None:
+        session.rollback()
+        return None
+
+    db_team = Team(**team_create.dict())
+    db_team.member_count = 1
+
+    session.add(db_team)
+    session.flush()
+
+    db_team.captain_id = db_player.id
+    db_player.team_id = db_team.id
 
     session.commit()
     session.refresh(db_player)
@@ -72,50 +245,275 @@ def lead_team(
     return db_player
 
 
+@retry_on_conflict
 def quit_team(
     session: Session,
     db_player: User,
-) -> User:
-    """ Remove player from team """
-    db_player.team = None
+) -> bool:
+    """ Remove player from team, deleting the team if they were the last member
+
+    False if the player is not part of a team.
+    """
+
+    team_id = db_player.team_id
+    if team_id is None:
+        return False
+
+    # Always lock the team before its players, like accept_invite
+    db_team = lock_record(session, Team, team_id)
+    db_player = lock_record(session, User, db_player.id)
+
+    if db_team is None or db_player.team_id != db_team.id:
+        session.rollback()
+        return False
+
+    team_deleted = db_team.member_count <= 1
+
+    if team_deleted:
+        session.delete(db_team)
+    else:
+        reassign_captain(session, db_player)
+        change_member_count(session, db_team.id, -1)
+
+        db_player.team_id = None
 
     session.commit()
-    session.refresh(db_player)
 
-    return db_player
+    if team_deleted:
+        # The team's solves went with it
+        scoreboard_ops.invalidate_scoreboard(session)
+
+    return True
 
 
+@retry_on_conflict
 def accept_invite(
     session: Session,
     db_player: User,
-    db_team: Team,
-) -> User:
-    """ add player to team """
-    db_player.team = db_team
-    db_player.team_invites.remove(db_team)
+    team_id: int,
+) -> enums.MembershipOutcome:
+    """ Add player to the team that invited them """
+
+    db_team = lock_record(session, Team, team_id)
+    db_player = lock_record(session, User, db_player.id)
+
+    outcome = enums.MembershipOutcome.OK
+
+    if db_player.team_id is not None:
+        outcome = enums.MembershipOutcome.ALREADY_IN_TEAM
+    elif db_team is None or not delete_invite(session, db_team.id, db_player.id):
+        outcome = enums.MembershipOutcome.NOT_INVITED
+    elif not change_member_count(session, db_team.id, 1):
+        outcome = enums.MembershipOutcome.TEAM_FULL
+
+    if outcome != enums.MembershipOutcome.OK:
+        session.rollback()
+        return outcome
+
+    change_invite_count(session, db_team.id, -1)
+
+    db_player.team_id = db_team.id
+
+    # Teams created by an admin start without a captain
+    if db_team.captain_id is None:
+        db_team.captain_id = db_player.id
 
     session.commit()
 
+    return outcome
+
+
+def insert_invite(
+    session: Session,
+    team_id: int,
+    player_id: int,
+) -> bool:
+    """ Insert the invite row, False if it already exists """
+
+    statement = (
+        insert_ignore(session, team_player_invite_table)
+        .values(team_id=team_id, user_id=player_id)
+    )
+
+    return session.execute(statement).rowcount == 1
+
+
+def delete_invite(
+    session: Session,
+    team_id: int,
+    player_id: int,
+) -> bool:
+    """ Delete the invite row, False if there was none
+
+    <player_id> can also be a scalar subquery selecting the id.
+    """
+
+    statement = (
+        team_player_invite_table
+        .delete()
+        .where(
+            and_(
+                team_player_invite_table.c.team_id == team_id,
+                team_player_invite_table.c.user_id == player_id,
+            )
+        )
+    )
+
+    return session.execute(statement).rowcount == 1
+
 
 def invite_player(
     session: Session,
     db_player: User,
     db_team: Team,
-):
+) -> enums.MembershipOutcome:
     """ Invite another player to join the team """
 
-    db_team.player_invites.append(db_player)
+    outcome = enums.MembershipOutcome.OK
+
+    if not insert_invite(session, db_team.id, db_player.id):
+        outcome = enums.MembershipOutcome.ALREADY_INVITED
+    elif not change_invite_count(session, db_team.id, 1):
+        outcome = enums.MembershipOutcome.INVITE_LIMIT
+
+    if outcome != enums.MembershipOutcome.OK:
+        session.rollback()
+        return outcome
 
     session.commit()
 
+    return outcome
 
-def remove_invitation(
+
+@retry_on_conflict
+def invite_players(
     session: Session,
-    db_player: User,
     db_team: Team,
-):
-    """ Delete invitation for player to join the team """
+    batch_invite: player_schemas.BatchInvite,
+) -> List[player_schemas.InviteResult]:
+    """ Invite many players to join the team in one transaction """
+
+    # Serializes batches of the same team, so the invite budget below stays valid
+    db_team = lock_record(session, Team, db_team.id)
+
+    invited_to_team = and_(
+        team_player_invite_table.c.user_id == User.id,
+        team_player_invite_table.c.team_id == db_team.id,
+    )
+
+    conditions = and_(
+        User.user_type == enums.UserType.PLAYER,
+        or_(
+            User.id.in_(batch_invite.ids),
+            User.username.in_(batch_invite.usernames),
+        ),
+    )
+
+    rows = (
+        session
+        .query(
+            User.id,
+            User.username,
+            User.team_id,
+            team_player_invite_table.c.team_id.isnot(None).label("is_invited"),
+        )
+        .outerjoin(team_player_invite_table, invited_to_team)
+        .filter(conditions)
+        .all()
+    )
+
+    by_id = {row.id: row for row in rows}
+    by_username = {row.username: row for row in rows}
 
-    db_team.player_invites.remove(db_player)
+    requested = (
+        [(id, None, by_id.get(id)) for id in batch_invite.ids]
+        +
+        [(None, username, by_username.get(username)) for username in batch_invite.usernames]
+    )
+
+    budget = constants.MAX_TEAM_INVITES - db_team.invite_count
+
+    results = []
+    to_invite = {}   # player id -> index in results
+
+    for id, username, row in requested:
+        outcome = enums.MembershipOutcome.OK
+
+        if row is None:
+            outcome = enums.MembershipOutcome.PLAYER_NOT_FOUND
+        else:
+            id, username, team_id, is_invited = row
+
+            if team_id is not None:
+                outcome = enums.MembershipOutcome.ALREADY_IN_TEAM
+            elif is_invited or id in to_invite:
+                outcome = enums.MembershipOutcome.ALREADY_INVITED
+            elif len(to_invite) >= budget:
+                outcome = enums.MembershipOutcome.INVITE_LIMIT
+            else:
+                to_invite[id] = len(results)
+
+        results.append(player_schemas.InviteResult(id=id, username=username, outcome=outcome))
+
+    if to_invite:
+        if session.get_bind().dialect.name == "postgresql":
+            statement = (
+                insert_ignore(session, team_player_invite_table)
+                .values([
+                    {"team_id": db_team.id, "user_id": id}
+                    for id in to_invite
+                ])
+                .returning(team_player_invite_table.c.user_id)
+            )
+
+            inserted = {id for id, in session.execute(statement)}
+        else:
+            # No RETURNING on SQLite, insert one row at a time instead
+            inserted = {
+                id for id in to_invite
+                if insert_invite(session, db_team.id, id)
+            }
+
+        # Invited through the single invite endpoint in the meantime
+        for id in to_invite.keys() - inserted:
+            results[to_invite[id]].outcome = enums.MembershipOutcome.ALREADY_INVITED
+
+        # Single invites don't lock the team and may have used up the budget
+        if not change_invite_count(session, db_team.id, len(inserted)):
+            session.rollback()
+
+            for id in inserted:
+                results[to_invite[id]].outcome = enums.MembershipOutcome.INVITE_LIMIT
+
+            return results
 
     session.commit()
+
+    return results
+
+
+def remove_invitation(
+    session: Session,
+    team_id: int,
+    username: str,
+) -> bool:
+    """ Delete invitation for player to join the team, False if there was none
+
+    The player is looked up by username inside the DELETE, a single round trip.
+    """
+
+    player_id = (
+        select([User.id])
+        .where(User.username == username)
+        .as_scalar()
+    )
+
+    if not delete_invite(session, team_id, player_id):
+        session.rollback()
+        return False
+
+    change_invite_count(session, team_id, -1)
+
+    session.commit()
+
+    return True
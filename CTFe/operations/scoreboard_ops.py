@@ -0,0 +1,401 @@
+import json
+import threading
+from datetime import (
+    datetime,
+    timedelta,
+)
+from typing import (
+    List,
+    Optional,
+    Tuple,
+)
+
+from sqlalchemy import (
+    and_,
+    func,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from CTFe.operations import partition_ops
+from CTFe.models import (
+    Attempt,
+    Challenge,
+    ScoreboardInvalidation,
+    ScoreboardSnapshot,
+    Team,
+)
+from CTFe.schemas import scoreboard_schemas
+from CTFe.utils.history_utils import ScoreHistory
+from CTFe.utils.scoring_utils import Scoreboard
+from CTFe.config import constants
+
+
+# The live scoreboard of this worker, built on first use, and the
+# generation (see current_generation) it was built at
+_scoreboard: Optional[Scoreboard] = None
+_generation: Optional[int] = None
+_scoreboard_lock = threading.Lock()
+
+# (scoreboard, its version, body) of the last rendered live scoreboard
+_rendered: Optional[Tuple[Scoreboard, int, bytes]] = None
+
+# (snapshot id, body) of the last served snapshot, snapshots never change
+_snapshot: Optional[Tuple[int, bytes]] = None
+
+
+def load_challenge(
+    session: Session,
+    scoreboard: Scoreboard,
+    challenge_id: int,
+):
+    """ Copy a challenge's scoring parameters into the scoreboard """
+
+    params = (
+        session
+        .query(Challenge.initial_value, Challenge.minimum_value, Challenge.decay)
+        .filter(Challenge.id == challenge_id)
+        .first()
+    )
+
+    if params is not None:
+        scoreboard.set_challenge(challenge_id, *params)
+
+
+def sync_scoreboard(
+    session: Session,
+    scoreboard: Scoreboard,
+    include_archived: bool = False,
+):
+    """ Apply the solves committed since the scoreboard was last synced
+
+    Solves from every worker end up in the attempts table, so this catches
+    each worker's scoreboard up with new solves. Removed solves and re-valued
+    challenges go through invalidate_scoreboard instead. Attempt ids can
+    commit out of order, so the last few already applied ids are read again;
+    repeated solves are ignored. New solves never land in archived
+    partitions, so those are only read with <include_archived>.
+    """
+
+    attempts = partition_ops.attempt_entity(session, include_archived)
+
+    since = max(scoreboard.last_attempt_id - constants.SCOREBOARD_RESYNC_OVERLAP, 0)
+
+    conditions = and_(
+        attempts.id > since,
+        attempts.is_correct.is_(True),
+        attempts.team_id.isnot(None),
+        attempts.challenge_id.isnot(None),
+    )
+
+    solves = (
+        session
+        .query(attempts.id, attempts.team_id, attempts.challenge_id, attempts.created_at)
+        .filter(conditions)
+        .order_by(attempts.id)
+        .yield_per(1000)
+    )
+
+    for id, team_id, challenge_id, created_at in solves:
+        if challenge_id not in scoreboard.params:
+            load_challenge(session, scoreboard, challenge_id)
+
+        if challenge_id in scoreboard.params:
+            scoreboard.solve(team_id, challenge_id, created_at)
+
+        scoreboard.last_attempt_id = max(scoreboard.last_attempt_id, id)
+
+
+def build_scoreboard(
+    session: Session,
+) -> Scoreboard:
+    """ Replay every solve into a new scoreboard and its score history
+
+    Attempts, archived ones included, are streamed in id order, so this
+    doubles as the backfill of the score history from the attempts table.
+    """
+
+    scoreboard = Scoreboard(ScoreHistory(constants.SCORE_HISTORY_BUCKET))
+
+    challenges = session.query(
+        Challenge.id,
+        Challenge.initial_value,
+        Challenge.minimum_value,
+        Challenge.decay,
+    )
+
+    for challenge_id, *params in challenges:
+        scoreboard.set_challenge(challenge_id, *params)
+
+    sync_scoreboard(session, scoreboard, include_archived=True)
+
+    return scoreboard
+
+
+def current_generation(
+    session: Session,
+) -> int:
+    """ Number of the last invalidation, shared by every worker through the DB """
+
+    return session.query(func.max(ScoreboardInvalidation.id)).scalar() or 0
+
+
+def get_scoreboard(
+    session: Session,
+) -> Scoreboard:
+    """ Live scoreboard, caught up with the latest solves
+
+    Rebuilt when any worker invalidated the scoreboards since it was built.
+    """
+
+    global _scoreboard, _generation
+
+    generation = current_generation(session)
+
+    with _scoreboard_lock:
+        if _scoreboard is None or _generation != generation:
+            _scoreboard = build_scoreboard(session)
+            _generation = generation
+        else:
+            sync_scoreboard(session, _scoreboard)
+
+        return _scoreboard
+
+
+def record_solve(
+    session: Session,
+    db_attempt: Attempt,
+):
+    """ Feed a newly accepted solve into the live scoreboard, if it was built """
+
+    with _scoreboard_lock:
+        scoreboard = _scoreboard
+
+        if scoreboard is None:
+            return
+
+        if db_attempt.challenge_id not in scoreboard.params:
+            load_challenge(session, scoreboard, db_attempt.challenge_id)
+
+        if db_attempt.challenge_id in scoreboard.params:
+            scoreboard.solve(
+                db_attempt.team_id,
+                db_attempt.challenge_id,
+                db_attempt.created_at,
+            )
+
+
+def invalidate_scoreboard(
+    session: Session,
+):
+    """ Make every worker rebuild its live scoreboard on the next read
+
+    Needed when solves disappear (deleted attempts, teams or challenges) or
+    are re-valued (changed scoring parameters), which the incremental
+    updates can't express, and when team names change. Call it once the
+    change is committed, so rebuilds can't miss it.
+    """
+
+    session.add(ScoreboardInvalidation())
+    session.commit()
+
+
+def rank_teams(
+    session: Session,
+    scoreboard: Scoreboard,
+) -> List[scoreboard_schemas.Entry]:
+    """ Ranked scoreboard entries with team names """
+
+    ranking = scoreboard.ranking()
+
+    names = dict(
+        session
+        .query(Team.id, Team.name)
+        .filter(Team.id.in_([team_id for team_id, _ in ranking]))
+    )
+
+    entries = [
+        scoreboard_schemas.Entry(
+            rank=rank,
+            team_id=team_id,
+            name=names[team_id],
+            score=score,
+        )
+        for rank, (team_id, score) in enumerate(
+            (item for item in ranking if item[0] in names),
+            start=1,
+        )
+    ]
+
+    return entries
+
+
+def render_entries(
+    entries: List[scoreboard_schemas.Entry],
+) -> bytes:
+    """ JSON response body of a ranking """
+
+    return json.dumps(
+        [entry.dict() for entry in entries],
+        separators=(",", ":"),
+    ).encode()
+
+
+def render_scoreboard(
+    session: Session,
+) -> bytes:
+    """ Live scoreboard response body, rendered once per scoreboard version """
+
+    global _rendered
+
+    scoreboard = get_scoreboard(session)
+    version = scoreboard.version
+
+    rendered = _rendered
+    if rendered is not None and rendered[0] is scoreboard and rendered[1] == version:
+        return rendered[2]
+
+    body = render_entries(rank_teams(session, scoreboard))
+    _rendered = (scoreboard, version, body)
+
+    return body
+
+
+def query_active_snapshot(
+    session: Session,
+) -> Optional[Tuple[int, datetime]]:
+    """ (id, frozen_at) of the active freeze, None if the scoreboard is live """
+
+    return (
+        session
+        .query(ScoreboardSnapshot.id, ScoreboardSnapshot.frozen_at)
+        .filter(ScoreboardSnapshot.unfrozen_at.is_(None))
+        .first()
+    )
+
+
+def snapshot_body(
+    session: Session,
+    snapshot_id: int,
+) -> bytes:
+    """ Stored body of a snapshot, fetched from the DB once per worker """
+
+    global _snapshot
+
+    snapshot = _snapshot
+    if snapshot is not None and snapshot[0] == snapshot_id:
+        return snapshot[1]
+
+    body = (
+        session
+        .query(ScoreboardSnapshot.data)
+        .filter(ScoreboardSnapshot.id == snapshot_id)
+        .scalar()
+    )
+    _snapshot = (snapshot_id, body)
+
+    return body
+
+
+def public_scoreboard(
+    session: Session,
+) -> bytes:
+    """ Response body of the public scoreboard, the snapshot while frozen """
+
+    active_snapshot = query_active_snapshot(session)
+
+    if active_snapshot is None:
+        return render_scoreboard(session)
+
+    return snapshot_body(session, active_snapshot.id)
+
+
+def freeze_scoreboard(
+    session: Session,
+) -> Optional[ScoreboardSnapshot]:
+    """ Store the current scoreboard as the public one, None if already frozen """
+
+    db_snapshot = ScoreboardSnapshot(data=render_scoreboard(session))
+    session.add(db_snapshot)
+
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return None
+
+    session.refresh(db_snapshot)
+
+    return db_snapshot
+
+
+def unfreeze_scoreboard(
+    session: Session,
+) -> bool:
+    """ Make the live scoreboard public again, False if it was not frozen """
+
+    updated = (
+        session
+        .query(ScoreboardSnapshot)
+        .filter(ScoreboardSnapshot.unfrozen_at.is_(None))
+        .update(
+            {ScoreboardSnapshot.unfrozen_at: datetime.utcnow()},
+            synchronize_session=False,
+        )
+    )
+
+    session.commit()
+
+    return updated == 1
+
+
+def score_history(
+    session: Session,
+    top: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[scoreboard_schemas.HistorySeries]:
+    """ Score over time of the <top> publicly ranked teams
+
+    While frozen, the ranking comes from the snapshot and the history stops
+    at the freeze.
+    """
+
+    scoreboard = get_scoreboard(session)
+    history = scoreboard.history
+
+    active_snapshot = query_active_snapshot(session)
+
+    if active_snapshot is None:
+        entries = rank_teams(session, scoreboard)[:top]
+    else:
+        entries = [
+            scoreboard_schemas.Entry(**entry)
+            for entry in json.loads(snapshot_body(session, active_snapshot.id))[:top]
+        ]
+
+        # Stop at the last bucket that ended before the freeze
+        frozen_until = active_snapshot.frozen_at - timedelta(
+            seconds=constants.SCORE_HISTORY_BUCKET)
+        until = min(until or frozen_until, frozen_until)
+
+    first, stop, step = history.window(
+        since, until, constants.SCORE_HISTORY_MAX_POINTS)
+    bucket_starts = [history.bucket_start(bucket) for bucket in range(first, stop, step)]
+
+    series = [
+        scoreboard_schemas.HistorySeries(
+            team_id=entry.team_id,
+            name=entry.name,
+            points=[
+                scoreboard_schemas.HistoryPoint(at=at, score=score)
+                for at, score in zip(
+                    bucket_starts,
+                    history.query(entry.team_id, first, stop, step),
+                )
+            ],
+        )
+        for entry in entries
+    ]
+
+    return series
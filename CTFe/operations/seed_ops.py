@@ -0,0 +1,269 @@
+import csv
+import io
+import itertools
+import random
+from datetime import (
+    datetime,
+    timedelta,
+)
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Sequence,
+)
+
+from sqlalchemy import (
+    Table,
+    func,
+)
+from sqlalchemy.orm import Session
+
+from CTFe.models import (
+    Attempt,
+    Challenge,
+    Team,
+    User,
+)
+from CTFe.models.association_tables import team_player_invite_table
+from CTFe.operations import (
+    challenge_ops,
+    partition_ops,
+)
+from CTFe.utils import (
+    enums,
+    pwd_utils,
+)
+from CTFe.config import constants
+
+
+# Rows per INSERT statement when COPY is not available
+CHUNK_SIZE = 10_000
+
+
+class SeedConfig(NamedTuple):
+    teams: int = 1_000
+    min_team_size: int = 1
+    max_team_size: int = constants.MAX_TEAM_MEMBERS
+    free_players: int = 1_000           # Players without a team
+    invites_per_team: int = 3           # Pending invites, sent to free players
+    challenges: int = 50
+    attempts: int = 100_000
+    solve_rate: float = 0.1             # Share of correct attempts
+    team_skew: float = 1.0              # Zipf exponent of attempts per team, 0 is uniform
+    challenge_skew: float = 1.0         # Zipf exponent of attempts per challenge
+    start: datetime = datetime(2021, 1, 1)
+    days: int = 2                       # Attempts are spread evenly over these days
+    password: str = "password"
+    seed: int = 0
+
+
+def zipf_cum_weights(count: int, skew: float) -> List[float]:
+    """ Cumulative weights making the i-th of <count> items 1 / (i + 1) ** skew likely """
+
+    return list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+def next_id(session: Session, Model) -> int:
+    return (session.query(func.max(Model.id)).scalar() or 0) + 1
+
+
+def write_rows(
+    session: Session,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[tuple],
+) -> int:
+    """ Bulk write <rows> into <table>, with COPY on postgres, returning their number """
+
+    if session.get_bind().dialect.name == "postgresql":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        buffer.seek(0)
+
+        cursor = session.connection().connection.cursor()
+        cursor.copy_expert(
+            f"COPY { table.name } ({ ', '.join(columns) }) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+        return count
+
+    rows = [dict(zip(columns, row)) for row in rows]
+
+    for start in range(0, len(rows), CHUNK_SIZE):
+        session.execute(table.insert(), rows[start:start + CHUNK_SIZE])
+
+    return len(rows)
+
+
+def reset_sequences(session: Session):
+    """ Move the id sequences past the explicitly written ids """
+
+    if session.get_bind().dialect.name != "postgresql":
+        return
+
+    for Model in (User, Team, Challenge, Attempt):
+        table = Model.__tablename__
+
+        session.execute(
+            f"SELECT setval(pg_get_serial_sequence('{ table }', 'id'), "
+            f"(SELECT max(id) FROM { table }))"
+        )
+
+
+def seed_database(
+    session: Session,
+    config: SeedConfig,
+) -> Dict[str, int]:
+    """ Append a generated contest to the database, returning the rows written per table
+
+    The same config always generates the same rows, offset by the ids
+    already in use. Every user shares one password hash, computed once, and
+    the team counters and challenge stats are kept consistent.
+    """
+
+    rng = random.Random(config.seed)
+    password = pwd_utils.hash_password(config.password)
+
+    first_user_id = next_id(session, User)
+    first_team_id = next_id(session, Team)
+    first_challenge_id = next_id(session, Challenge)
+    first_attempt_id = next_id(session, Attempt)
+
+    # Partitions are created up front, creating one commits
+    if partition_ops.is_partitioned(session, "attempts"):
+        partition_ops.ensure_partitions(session, config.start.date(), config.days + 1)
+
+    written = {}
+
+    # Teams and their members, the first member is the captain
+    team_ids = range(first_team_id, first_team_id + config.teams)
+    team_sizes = [
+        rng.randint(config.min_team_size, config.max_team_size)
+        for _ in team_ids
+    ]
+
+    members = []
+    user_id = first_user_id
+    for team_id, size in zip(team_ids, team_sizes):
+        members.extend((id, team_id) for id in range(user_id, user_id + size))
+        user_id += size
+
+    free_player_ids = range(user_id, user_id + config.free_players)
+
+    invites = sorted({
+        (team_id, player_id)
+        for team_id in team_ids
+        for player_id in rng.sample(
+            free_player_ids, min(config.invites_per_team, len(free_player_ids)))
+    })
+    invite_counts = dict.fromkeys(team_ids, 0)
+    for team_id, _ in invites:
+        invite_counts[team_id] += 1
+
+    # Teams first, captains are set once the users exist
+    written["teams"] = write_rows(
+        session, Team.__table__,
+        ("id", "name", "member_count", "invite_count"),
+        (
+            (team_id, f"team{ team_id }", size, invite_counts[team_id])
+            for team_id, size in zip(team_ids, team_sizes)
+        ),
+    )
+
+    written["users"] = write_rows(
+        session, User.__table__,
+        ("id", "username", "password", "user_type", "team_id"),
+        itertools.chain(
+            (
+                (id, f"player{ id }", password, enums.UserType.PLAYER.value, team_id)
+                for id, team_id in members
+            ),
+            (
+                (id, f"player{ id }", password, enums.UserType.PLAYER.value, None)
+                for id in free_player_ids
+            ),
+        ),
+    )
+
+    # The captain of every team is its lowest member id
+    captain_ids = (
+        session
+        .query(func.min(User.id))
+        .filter(User.team_id == Team.id)
+        .as_scalar()
+    )
+    session.execute(
+        Team.__table__.update()
+        .where(Team.id.between(team_ids.start, team_ids.stop - 1))
+        .values(captain_id=captain_ids)
+    )
+
+    written["team_player_invite_table"] = write_rows(
+        session, team_player_invite_table,
+        ("team_id", "user_id"),
+        invites,
+    )
+
+    challenge_ids = range(first_challenge_id, first_challenge_id + config.challenges)
+
+    written["challenges"] = write_rows(
+        session, Challenge.__table__,
+        ("id", "name", "description", "flag", "initial_value", "minimum_value", "decay", "created_at"),
+        (
+            (
+                id,
+                f"challenge{ id }",
+                f"Generated challenge { id }",
+                f"CTF{{{ id }}}",
+                constants.CHALLENGE_INITIAL_VALUE,
+                constants.CHALLENGE_MINIMUM_VALUE,
+                constants.CHALLENGE_DECAY,
+                config.start,
+            )
+            for id in challenge_ids
+        ),
+    )
+
+    # Attempts are written in time order, so lower ids are older as in production
+    attempt_teams = rng.choices(
+        team_ids, cum_weights=zipf_cum_weights(config.teams, config.team_skew),
+        k=config.attempts)
+    attempt_challenges = rng.choices(
+        challenge_ids, cum_weights=zipf_cum_weights(config.challenges, config.challenge_skew),
+        k=config.attempts)
+    step = timedelta(days=config.days) / max(config.attempts, 1)
+
+    def attempts():
+        for offset, (team_id, challenge_id) in enumerate(zip(attempt_teams, attempt_challenges)):
+            is_correct = rng.random() < config.solve_rate
+
+            yield (
+                first_attempt_id + offset,
+                f"CTF{{{ challenge_id }}}" if is_correct else f"CTF{{guess-{rng.getrandbits(32):x}}}",
+                is_correct,
+                config.start + step * offset,
+                team_id,
+                challenge_id,
+            )
+
+    written["attempts"] = write_rows(
+        session, Attempt.__table__,
+        ("id", "flag", "is_correct", "created_at", "team_id", "challenge_id"),
+        attempts(),
+    )
+
+    reset_sequences(session)
+    session.commit()
+
+    challenge_ops.rebuild_challenge_stats(session)
+    session.commit()
+
+    return written
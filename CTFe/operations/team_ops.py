@@ -4,6 +4,7 @@ from sqlalchemy import and_
 from sqlalchemy.orm import (
     Session,
     Query,
+    selectinload,
 )
 from sqlalchemy.sql.expression import BooleanClauseList
 
@@ -13,6 +14,7 @@ from CTFe.operations.CRUD_ops import (
     update_record,
     delete_record,
 )
+from CTFe.operations import scoreboard_ops
 from CTFe.models import (
     Team,
     User,
@@ -42,6 +44,24 @@ def query_teams_by_(
     return query_teams
 
 
+def query_team_details_by_(
+    session: Session,
+    conditions: Optional[BooleanClauseList] = and_(),
+) -> Query:
+    """ Query team records along with what team_schemas.Details reads
+
+    Members and invites are loaded with one query each for all the teams,
+    instead of one per team when the schema reads them.
+    """
+
+    query_teams = query_teams_by_(session, conditions).options(
+        selectinload(Team.players),
+        selectinload(Team.player_invites),
+    )
+
+    return query_teams
+
+
 def update_team(
     session: Session,
     db_team: Team,
@@ -51,6 +71,10 @@ def update_team(
 
     db_team = update_record(session, db_team, team_update)
 
+    # Every worker has the old name in its rendered scoreboard
+    if "name" in team_update.dict(exclude_unset=True):
+        scoreboard_ops.invalidate_scoreboard(session)
+
     return db_team
 
 
@@ -61,3 +85,5 @@ def delete_team(
     """ Delete team record """
 
     delete_record(session, db_team)
+
+    scoreboard_ops.invalidate_scoreboard(session)
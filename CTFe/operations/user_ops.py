@@ -13,16 +13,23 @@ from CTFe.operations.CRUD_ops import (
     update_record,
     delete_record,
 )
+from CTFe.operations import (
+    credential_ops,
+    player_ops,
+)
 from CTFe.models import User
 from CTFe.schemas import user_schemas
 
 
-def create_user(
+async def create_user(
     session: Session,
     user_create: user_schemas.Create,
 ) -> User:
     """ Create user record """
 
+    hashed_password = await credential_ops.hash_password(user_create.password)
+    user_create = user_create.copy(update={"password": hashed_password})
+
     db_user = create_record(session, User, user_create)
 
     return db_user
@@ -39,22 +46,43 @@ def query_users_by_(
     return query_users
 
 
-def update_user(
+async def update_user(
     session: Session,
     db_user: User,
     user_update: user_schemas.Update,
 ) -> User:
     """ Update user record """
 
+    if user_update.password is not None:
+        hashed_password = await credential_ops.hash_password(user_update.password)
+        user_update = user_update.copy(update={"password": hashed_password})
+
     db_user = update_record(session, db_user, user_update)
 
     return db_user
 
 
+def update_password_hash(
+    session: Session,
+    db_user: User,
+    hashed_password: str,
+) -> User:
+    """ Store an already hashed password for the user """
+
+    db_user.password = hashed_password
+
+    session.commit()
+    session.refresh(db_user)
+
+    return db_user
+
+
 def delete_user(
     session: Session,
     db_user: User,
 ):
     """ Delete user record """
 
+    player_ops.release_memberships(session, db_user)
+
     delete_record(session, db_user)
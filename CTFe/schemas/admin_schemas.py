@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class SlowQuery(BaseModel):
+    at: datetime
+    duration_ms: float
+    route: Optional[str] = None
+    origin: Optional[str] = None
+    statement: str
+    params_fingerprint: str
+    plan: Optional[str] = None
+
+    class Config:
+        orm_mode = True
@@ -12,6 +12,7 @@ class Create(BaseModel):
 class Details(BaseModel):
     id: int
     flag: str
+    is_correct: bool
     team_id: int
     challenge_id: int
 
@@ -1,9 +1,21 @@
+from datetime import datetime
 from typing import (
     List,
     Optional,
 )
 
-from pydantic import BaseModel
+from pydantic import (
+    BaseModel,
+    validator,
+)
+
+from CTFe.config import constants
+
+
+def validate_decay(v):
+    if v is not None and v <= 0:
+        raise ValueError("decay must be greater than 0")
+    return v
 
 
 class Create(BaseModel):
@@ -11,6 +23,17 @@ class Create(BaseModel):
     description: Optional[str] = None
     flag: str
     owner_id: Optional[int] = None
+    initial_value: int = constants.CHALLENGE_INITIAL_VALUE
+    minimum_value: int = constants.CHALLENGE_MINIMUM_VALUE
+    decay: int = constants.CHALLENGE_DECAY
+
+    _validate_decay = validator("decay", allow_reuse=True)(validate_decay)
+
+    @validator("minimum_value")
+    def validate_minimum_value(cls, v, values):
+        if v > values.get("initial_value", v):
+            raise ValueError("minimum_value can not be greater than initial_value")
+        return v
 
 
 class Update(BaseModel):
@@ -18,6 +41,21 @@ class Update(BaseModel):
     description: Optional[str] = None
     flag: Optional[str] = None
     file_name: Optional[str] = None
+    initial_value: Optional[int] = None
+    minimum_value: Optional[int] = None
+    decay: Optional[int] = None
+
+    _validate_decay = validator("decay", allow_reuse=True)(validate_decay)
+
+    class Config:
+        orm_mode = True
+
+
+class Stats(BaseModel):
+    attempt_count: int
+    solve_count: int
+    first_solver_id: Optional[int] = None
+    first_solve_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
@@ -30,6 +68,11 @@ class Details(BaseModel):
     flag: str
     file_name: Optional[str] = None
     owner_id: Optional[int]
+    initial_value: int
+    minimum_value: int
+    decay: int
+    value: int
+    stats: Optional[Stats] = None
 
     class Config:
         orm_mode = True
@@ -6,8 +6,12 @@ from typing import (
 from pydantic import (
     BaseModel,
     validator,
+    root_validator,
 )
 
+from CTFe.utils import enums
+from CTFe.config import constants
+
 
 class TeamInvite(BaseModel):
     id: int
@@ -39,3 +43,22 @@ class Invites(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class BatchInvite(BaseModel):
+    ids: List[int] = []
+    usernames: List[str] = []
+
+    @root_validator
+    def validate_size(cls, values):
+        size = len(values.get("ids", [])) + len(values.get("usernames", []))
+
+        if size > constants.MAX_TEAM_INVITES:
+            raise ValueError(f"Can not invite more than { constants.MAX_TEAM_INVITES } players at once")
+        return values
+
+
+class InviteResult(BaseModel):
+    id: Optional[int] = None
+    username: Optional[str] = None
+    outcome: enums.MembershipOutcome
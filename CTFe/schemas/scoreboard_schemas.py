@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import (
+    List,
+    Optional,
+)
+
+from pydantic import BaseModel
+
+
+class Entry(BaseModel):
+    rank: int
+    team_id: int
+    name: str
+    score: int
+
+
+class HistoryPoint(BaseModel):
+    at: datetime
+    score: int
+
+
+class HistorySeries(BaseModel):
+    team_id: int
+    name: str
+    points: List[HistoryPoint]
+
+
+class Snapshot(BaseModel):
+    id: int
+    frozen_at: datetime
+    unfrozen_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
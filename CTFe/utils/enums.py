@@ -13,3 +13,13 @@ class UserType(str, Enum):
             or
             value in cls.__members__.values()
         )
+
+
+class MembershipOutcome(str, Enum):
+    OK = 'ok'
+    PLAYER_NOT_FOUND = 'player_not_found'
+    ALREADY_IN_TEAM = 'already_in_team'
+    NOT_INVITED = 'not_invited'
+    ALREADY_INVITED = 'already_invited'
+    INVITE_LIMIT = 'invite_limit'
+    TEAM_FULL = 'team_full'
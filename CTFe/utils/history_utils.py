@@ -0,0 +1,108 @@
+import threading
+from array import array
+from datetime import (
+    datetime,
+    timedelta,
+)
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+
+class ScoreHistory:
+    """ Cumulative team scores sampled at fixed time buckets
+
+    Every team has an array holding its score at the end of each bucket, up
+    to the last bucket its score changed in. Later buckets repeat the last
+    value, so a range query is a slice plus padding.
+    """
+
+    typecode = "i"
+
+    def __init__(self, bucket_seconds: int):
+        self.bucket_seconds = bucket_seconds
+
+        self.origin: Optional[datetime] = None
+        self.last_bucket = -1
+        self.series: Dict[int, array] = {}
+
+        self._lock = threading.RLock()
+
+    def _bucket(self, at: datetime) -> int:
+        size = timedelta(seconds=self.bucket_seconds)
+
+        if self.origin is None:
+            self.origin = datetime.min + (at - datetime.min) // size * size
+
+        return max((at - self.origin) // size, 0)
+
+    def bucket_start(self, bucket: int) -> datetime:
+        return self.origin + timedelta(seconds=bucket * self.bucket_seconds)
+
+    def record(self, totals: Dict[int, int], at: datetime):
+        """ Store the new totals of the given teams at time <at> """
+
+        if not totals:
+            return
+
+        with self._lock:
+            bucket = self._bucket(at)
+
+            for team_id, score in totals.items():
+                series = self.series.setdefault(team_id, array(self.typecode))
+
+                if bucket < len(series):
+                    # Same bucket (or a late arrival), the latest value wins
+                    series[bucket] = score
+                    continue
+
+                last_score = series[-1] if series else 0
+                series.extend([last_score] * (bucket - len(series)))
+                series.append(score)
+
+            self.last_bucket = max(self.last_bucket, bucket)
+
+    def window(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        max_points: Optional[int] = None,
+    ) -> Tuple[int, int, int]:
+        """ (first, stop, step) bucket range covering [since, until] """
+
+        with self._lock:
+            if self.origin is None:
+                return 0, 0, 1
+
+            first = self._bucket(since) if since is not None else 0
+            stop = self.last_bucket + 1
+            if until is not None:
+                stop = min(self._bucket(until) + 1, stop) if until >= self.origin else 0
+
+        step = 1
+        if max_points and stop - first > max_points:
+            step = -(-(stop - first) // max_points)
+
+        return first, max(stop, first), step
+
+    def query(
+        self,
+        team_id: int,
+        first: int,
+        stop: int,
+        step: int = 1,
+    ) -> List[int]:
+        """ Scores of a team at buckets range(first, stop, step) """
+
+        with self._lock:
+            series = self.series.get(team_id, array(self.typecode))
+
+            scores = series[first:min(stop, len(series)):step].tolist()
+            last_score = series[-1] if series else 0
+
+        padding = len(range(first, stop, step)) - len(scores)
+
+        return scores + [last_score] * padding
@@ -1,13 +1,20 @@
-from jose import (
-    jwt,
-    ExpiredSignatureError,
-)
-from fastapi import (
-    status,
-    HTTPException,
-)
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from jose import jwt
 
 from CTFe.config import constants
+from CTFe.utils.metrics_utils import registry
+
+
+cache_hits_total = registry.counter(
+    "jwt_cache_hits_total", "Tokens served from the decoded JWT cache")
+cache_misses_total = registry.counter(
+    "jwt_cache_misses_total", "Tokens that had to be decoded and verified")
+cache_evictions_total = registry.counter(
+    "jwt_cache_evictions_total", "Cached tokens dropped because of size or expiry")
 
 
 def encode(payload):
@@ -24,15 +31,94 @@ def decode(token: str):
         constants.JWT_SECRET,
         algorithms=[constants.JWT_ALGORITHM],
     )
-    try:
-        payload = jwt.decode(
-            token,
-
-        )
-    except ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Could not validate credentials",
-        )
-    else:
+
+
+class TokenCache:
+    """ Bounded LRU cache of verified token claims, keyed by the token digest
+
+    stats() reports the counts of this cache only; with <export_metrics> set
+    they are also added to the process wide jwt_cache_* metrics.
+    """
+
+    def __init__(self, max_size: int, export_metrics: bool = False):
+        self.max_size = max_size
+        self.export_metrics = export_metrics
+
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _hit(self):
+        self._hits += 1
+        if self.export_metrics:
+            cache_hits_total.inc()
+
+    def _miss(self):
+        self._misses += 1
+        if self.export_metrics:
+            cache_misses_total.inc()
+
+    def _evict(self, reason: str):
+        self._evictions += 1
+        if self.export_metrics:
+            cache_evictions_total.inc(reason=reason)
+
+    def decode(self, token: str) -> dict:
+        """ Return the claims of a valid token, verifying it only on a cache miss """
+
+        digest = hashlib.sha256(token.encode()).digest()
+
+        with self._lock:
+            payload = self._entries.get(digest)
+
+            if payload is not None:
+                if payload["exp"] > time.time():
+                    self._entries.move_to_end(digest)
+                    self._hit()
+
+                    return dict(payload)
+
+                # Expired: drop it and let jwt.decode raise ExpiredSignatureError
+                del self._entries[digest]
+                self._evict("expired")
+
+            self._miss()
+
+        payload = decode(token)
+
+        # Tokens without "exp" would never be invalidated, so they are not cached
+        if payload.get("exp") is None:
+            return payload
+
+        with self._lock:
+            self._entries[digest] = dict(payload)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evict("size")
+
         return payload
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        hits = self._hits
+        misses = self._misses
+        total = hits + misses
+
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "evictions": self._evictions,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+
+token_cache = TokenCache(constants.JWT_CACHE_SIZE, export_metrics=True)
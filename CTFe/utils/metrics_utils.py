@@ -0,0 +1,243 @@
+import math
+import threading
+from bisect import bisect_left
+from typing import (
+    Dict,
+    List,
+    Sequence,
+    Tuple,
+)
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Upper bounds in seconds, suited to request latencies
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Counter:
+    """ Monotonically increasing value, optionally split by labels """
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels) -> "BoundMetric":
+        return BoundMetric(self, _label_key(labels))
+
+    def _inc(self, key: LabelKey, amount: float):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def inc(self, amount: float = 1, **labels):
+        self._inc(_label_key(labels), amount)
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    """ Value that can go up and down, optionally split by labels """
+
+    metric_type = "gauge"
+
+    def _set(self, key: LabelKey, value: float):
+        with self._lock:
+            self._values[key] = value
+
+    def set(self, value: float, **labels):
+        self._set(_label_key(labels), value)
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    """ Distribution of observed values over fixed buckets, optionally split by labels
+
+    Every label set holds one count per bucket, one for values above the
+    last bucket, and the sum. Counts are made cumulative only when rendered.
+    """
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+
+        self._values: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels) -> "BoundMetric":
+        return BoundMetric(self, _label_key(labels))
+
+    def observe(self, value: float, **labels):
+        self._observe(_label_key(labels), value)
+
+    def _observe(self, key: LabelKey, value: float):
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+
+            counts[index] += 1
+            counts[-1] += value
+
+    def count(self, **labels) -> int:
+        counts = self._values.get(_label_key(labels))
+
+        return sum(counts[:-1]) if counts is not None else 0
+
+    def samples(self) -> List[Tuple[LabelKey, List[float]]]:
+        with self._lock:
+            return [(key, list(counts)) for key, counts in self._values.items()]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class BoundMetric:
+    """ Metric with its labels resolved once, for hot paths """
+
+    __slots__ = ("metric", "key")
+
+    def __init__(self, metric, key: LabelKey):
+        self.metric = metric
+        self.key = key
+
+    def inc(self, amount: float = 1):
+        self.metric._inc(self.key, amount)
+
+    def dec(self, amount: float = 1):
+        self.metric._inc(self.key, -amount)
+
+    def set(self, value: float):
+        self.metric._set(self.key, value)
+
+    def observe(self, value: float):
+        self.metric._observe(self.key, value)
+
+
+class Registry:
+    """ Process wide collection of named metrics """
+
+    def __init__(self):
+        self._metrics: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, Metric, name: str, description: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+
+            if metric is None:
+                metric = Metric(name, description, **kwargs)
+                self._metrics[name] = metric
+            elif type(metric) is not Metric:
+                raise ValueError(f"Metric { name } is already registered as { metric.metric_type }")
+
+        return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, description, buckets=buckets)
+
+    def collect(self) -> List[Counter]:
+        with self._lock:
+            return list(self._metrics.values())
+
+
+# Prometheus text exposition
+# ---------------------------
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return _escape(value).replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+
+    labels = ",".join(f'{ name }="{ _escape_label(value) }"' for name, value in key)
+
+    return f"{{{ labels }}}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(registry: Registry) -> str:
+    """ Every metric of the registry in the Prometheus text format """
+
+    lines = []
+
+    for metric in sorted(registry.collect(), key=lambda metric: metric.name):
+        lines.append(f"# HELP { metric.name } { _escape(metric.description) }")
+        lines.append(f"# TYPE { metric.name } { metric.metric_type }")
+
+        for key, value in sorted(metric.samples()):
+            if not isinstance(metric, Histogram):
+                lines.append(f"{ metric.name }{ _format_labels(key) } { _format_value(value) }")
+                continue
+
+            cumulative = 0
+            for bound, count in zip(metric.buckets + (math.inf,), value[:-1]):
+                cumulative += count
+                bucket_key = key + (("le", _format_value(bound)),)
+
+                lines.append(
+                    f"{ metric.name }_bucket{ _format_labels(bucket_key) } { cumulative }")
+
+            lines.append(f"{ metric.name }_sum{ _format_labels(key) } { _format_value(value[-1]) }")
+            lines.append(f"{ metric.name }_count{ _format_labels(key) } { cumulative }")
+
+    return "\n".join(lines) + "\n"
+
+
+registry = Registry()
@@ -0,0 +1,138 @@
+import time
+from typing import (
+    Dict,
+    Iterable,
+    Set,
+    Tuple,
+)
+
+from CTFe.utils import query_stats_utils
+from CTFe.utils.metrics_utils import (
+    BoundMetric,
+    registry,
+)
+
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time spent handling requests, by router prefix")
+requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "Requests being handled, by router prefix")
+responses_total = registry.counter(
+    "http_responses_total", "Responses sent, by router prefix and status code")
+request_queries = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per request, by router prefix",
+    buckets=QUERY_COUNT_BUCKETS)
+request_db_duration = registry.histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL per request, by router prefix")
+request_db_rows = registry.counter(
+    "http_request_db_rows_total", "Rows returned or affected by SQL, by router prefix")
+
+
+def route_prefixes(routes: Iterable) -> Set[str]:
+    """ First path segment of every route, e.g. /users for /users/{id} """
+
+    return {
+        "/" + route.path.strip("/").split("/")[0]
+        for route in routes
+    }
+
+
+def server_timing(stats: query_stats_utils.QueryStats, elapsed: float) -> bytes:
+    """ Server-Timing header value with the DB and total time in milliseconds """
+
+    return (
+        f'db;dur={stats.duration * 1000:.2f};desc="{ stats.count } queries, { stats.rows } rows", '
+        f'app;dur={elapsed * 1000:.2f}'
+    ).encode()
+
+
+class MetricsMiddleware:
+    """ Record latency, in-flight requests, status codes and SQL usage of HTTP requests
+
+    Requests are labelled by router prefix instead of full path, which keeps
+    the number of label sets bounded. Paths outside the known prefixes are
+    labelled "other". With <server_timing> set, responses carry the request's
+    DB time and query count in a Server-Timing header.
+
+    Plain ASGI instead of BaseHTTPMiddleware, which would add a task and a
+    queue to every request.
+    """
+
+    def __init__(self, app, prefixes: Iterable[str], server_timing: bool = False):
+        self.app = app
+        self.prefixes = frozenset(prefixes)
+        self.server_timing = server_timing
+
+        # Metrics with resolved labels, keyed by (route, method[, status])
+        self._bound: Dict[Tuple, Tuple[BoundMetric, ...]] = {}
+        self._bound_responses: Dict[Tuple, BoundMetric] = {}
+
+    def route_label(self, path: str) -> str:
+        prefix = "/" + path.split("/", 2)[1]
+
+        return prefix if prefix in self.prefixes else "other"
+
+    def bound_metrics(self, route: str, method: str) -> Tuple[BoundMetric, ...]:
+        bound = self._bound.get((route, method))
+
+        if bound is None:
+            bound = self._bound[(route, method)] = tuple(
+                metric.labels(route=route, method=method)
+                for metric in (
+                    request_duration,
+                    requests_in_progress,
+                    request_queries,
+                    request_db_duration,
+                    request_db_rows,
+                )
+            )
+
+        return bound
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self.route_label(scope["path"])
+        method = scope["method"]
+        status_code = 500
+
+        duration, in_progress, queries, db_duration, db_rows = self.bound_metrics(route, method)
+        stats, token = query_stats_utils.start_request(f"{ method } { scope['path'] }")
+
+        async def send_wrapper(message):
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+                if self.server_timing:
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", server_timing(stats, time.perf_counter() - start)),
+                    ]
+
+            await send(message)
+
+        in_progress.inc()
+        start = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration.observe(time.perf_counter() - start)
+            in_progress.dec()
+
+            queries.observe(stats.count)
+            db_duration.observe(stats.duration)
+            db_rows.inc(stats.rows)
+            query_stats_utils.end_request(token)
+
+            responses = self._bound_responses.get((route, method, status_code))
+            if responses is None:
+                responses = self._bound_responses[(route, method, status_code)] = (
+                    responses_total.labels(route=route, method=method, status=status_code))
+            responses.inc()
@@ -0,0 +1,92 @@
+import sys
+import time
+import threading
+from collections import Counter
+from typing import (
+    Dict,
+    Optional,
+)
+
+
+# Leaf frames of threads waiting for work, left out of the profile by default
+IDLE_FRAMES = {
+    "threading:wait",
+    "selectors:select",
+    "queue:get",
+    "concurrent.futures.thread:_worker",
+}
+
+
+def frame_name(frame) -> str:
+    return f"{ frame.f_globals.get('__name__', '?') }:{ frame.f_code.co_name }"
+
+
+def collapse_stack(frame) -> str:
+    """ Root first, ';' separated frame names of a thread's stack """
+
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """ Periodically samples the stacks of every thread of the worker
+
+    Nothing is hooked into the interpreter: the thread running the profile
+    reads sys._current_frames() every <interval> seconds, so the overhead is
+    limited to the sampling itself and only lasts while a profile runs.
+    Only one profile runs at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def sample(self, stacks: Counter, include_idle: bool):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            if not include_idle and frame_name(frame) in IDLE_FRAMES:
+                continue
+
+            thread_name = names.get(thread_id, str(thread_id))
+            stacks[f"{ thread_name };{ collapse_stack(frame) }"] += 1
+
+    def run(
+        self,
+        seconds: float,
+        interval: float,
+        include_idle: bool = False,
+    ) -> Optional[Dict[str, int]]:
+        """ Sample counts per collapsed stack, None if a profile is already running """
+
+        if not self._lock.acquire(blocking=False):
+            return None
+
+        stacks = Counter()
+
+        try:
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                self.sample(stacks, include_idle)
+                time.sleep(interval)
+        finally:
+            self._lock.release()
+
+        return dict(stacks)
+
+
+def render_collapsed(stacks: Dict[str, int]) -> str:
+    """ One '<stack> <count>' line per stack, the input of flamegraph.pl and speedscope """
+
+    lines = [f"{ stack } { count }" for stack, count in sorted(stacks.items())]
+
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+profiler = SamplingProfiler()
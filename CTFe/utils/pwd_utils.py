@@ -1,14 +1,41 @@
+from typing import (
+    Optional,
+    Tuple,
+)
+
 from passlib.context import CryptContext
 
+from CTFe.config import constants
+
+
+def make_context(scheme: str, rounds: int) -> CryptContext:
+    """ Hash with <scheme> at exactly <rounds>, flag anything else as outdated """
+
+    schemes = [scheme] + [
+        legacy for legacy in constants.PWD_LEGACY_SCHEMES if legacy != scheme
+    ]
 
-pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        **{
+            f"{ scheme }__default_rounds": rounds,
+            f"{ scheme }__min_rounds": rounds,
+            f"{ scheme }__max_rounds": rounds,
+        },
+    )
+
+
+pwd_ctx = make_context(constants.PWD_SCHEME, constants.PWD_ROUNDS)
 
 
 def verify_password(
     plain_password: str,
     hashed_password: str,
-) -> bool:
-    return pwd_ctx.verify(plain_password, hashed_password)
+) -> Tuple[bool, Optional[str]]:
+    """ Return whether the password matches and, if the stored hash is out of date, a new one """
+
+    return pwd_ctx.verify_and_update(plain_password, hashed_password)
 
 
 def hash_password(plain_password):
@@ -0,0 +1,138 @@
+import re
+import time
+from contextvars import ContextVar
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from CTFe.utils.metrics_utils import registry
+
+
+WHITESPACE_RE = re.compile(r"\s+")
+IN_LIST_RE = re.compile(r"\bIN \([^()]*\)", re.IGNORECASE)
+
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+
+queries_total = registry.counter(
+    "db_queries_total", "SQL statements executed").labels()
+query_duration = registry.histogram(
+    "db_query_duration_seconds", "Time spent executing single SQL statements",
+    buckets=QUERY_BUCKETS).labels()
+
+
+def normalize_statement(statement: str) -> str:
+    """ Statement structure, ignoring layout and the length of IN lists """
+
+    statement = WHITESPACE_RE.sub(" ", statement).strip()
+
+    return IN_LIST_RE.sub("IN (...)", statement)
+
+
+class QueryStats:
+    """ SQL statements executed on behalf of one request
+
+    With <record_statements> set, the text of every SELECT is counted too.
+    """
+
+    __slots__ = ("label", "count", "duration", "rows", "statements")
+
+    def __init__(self, label: Optional[str] = None, record_statements: bool = False):
+        self.label = label
+        self.count = 0
+        self.duration = 0.0
+        self.rows = 0
+        self.statements: Optional[Dict[str, int]] = {} if record_statements else None
+
+    def add(self, duration: float, rows: int, statement: Optional[str] = None):
+        self.count += 1
+        self.duration += duration
+        self.rows += max(rows, 0)
+
+        if self.statements is not None and statement is not None:
+            if statement.lstrip()[:6].upper() == "SELECT":
+                self.statements[statement] = self.statements.get(statement, 0) + 1
+
+
+# Shared by reference with the threadpool copies of the request context,
+# so it has to be mutated in place, never replaced
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None)
+
+
+# Called with the stats of every finished request. While any is registered
+# the statements themselves are recorded, e.g. by the N+1 test detector
+_request_listeners: List[Callable[[QueryStats], None]] = []
+
+
+def add_request_listener(listener: Callable[[QueryStats], None]):
+    _request_listeners.append(listener)
+
+
+def remove_request_listener(listener: Callable[[QueryStats], None]):
+    _request_listeners.remove(listener)
+
+
+# Called with (conn, statement, parameters, context, executemany, duration)
+# after every statement, e.g. by the slow query log
+_statement_listeners: List[Callable] = []
+
+
+def add_statement_listener(listener: Callable):
+    if listener not in _statement_listeners:
+        _statement_listeners.append(listener)
+
+
+def remove_statement_listener(listener: Callable):
+    _statement_listeners.remove(listener)
+
+
+def start_request(label: Optional[str] = None):
+    """ Collect the statements of the current context into fresh stats """
+
+    stats = QueryStats(label, record_statements=bool(_request_listeners))
+
+    return stats, _current_stats.set(stats)
+
+
+def end_request(token):
+    stats = _current_stats.get()
+    _current_stats.reset(token)
+
+    for listener in list(_request_listeners):
+        listener(stats)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+
+    queries_total.inc()
+    query_duration.observe(duration)
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(duration, cursor.rowcount, statement)
+
+    for listener in _statement_listeners:
+        listener(conn, statement, parameters, context, executemany, duration)
+
+
+def install(engine: Engine):
+    """ Time every statement the engine executes """
+
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -2,7 +2,13 @@ from datetime import (
     datetime,
     timedelta,
 )
+import time
 from contextlib import asynccontextmanager
+from typing import (
+    Dict,
+    Optional,
+    Tuple,
+)
 
 import aioredis
 from fastapi import (
@@ -15,17 +21,123 @@ from CTFe.utils import jwt_utils
 from CTFe.config import constants
 
 
+# Redis url of the in-process stand-in, see InMemoryRedis
+IN_MEMORY_URL = "memory://"
+
+
+def _to_bytes(value) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+def _decode(value: Optional[bytes], encoding: Optional[str]):
+    return value.decode(encoding) if value is not None and encoding else value
+
+
+class InMemoryRedis:
+    """ In-process stand-in for the subset of the aioredis API used here
+
+    Values are stored and returned as bytes like redis does, and keys expire.
+    Meant for tests, state is neither shared between processes nor persisted.
+    """
+
+    def __init__(self):
+        # key -> (value, expires_at), value is bytes or a dict of bytes for hashes
+        self._data: Dict[bytes, Tuple[object, Optional[float]]] = {}
+
+    def _get(self, key):
+        key = _to_bytes(key)
+        entry = self._data.get(key)
+
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+
+        return entry
+
+    def _hash(self, key) -> dict:
+        entry = self._get(key)
+
+        if entry is None:
+            entry = self._data[_to_bytes(key)] = ({}, None)
+
+        return entry[0]
+
+    async def get(self, key, *, encoding: Optional[str] = None):
+        entry = self._get(key)
+
+        return _decode(entry[0] if entry is not None else None, encoding)
+
+    async def set(self, key, value, *, expire: int = 0):
+        expires_at = time.monotonic() + expire if expire else None
+        self._data[_to_bytes(key)] = (_to_bytes(value), expires_at)
+
+        return True
+
+    async def delete(self, key, *keys) -> int:
+        deleted = 0
+        for key in (key, *keys):
+            if self._get(key) is not None:
+                del self._data[_to_bytes(key)]
+                deleted += 1
+
+        return deleted
+
+    async def expire(self, key, timeout: int) -> bool:
+        entry = self._get(key)
+        if entry is None:
+            return False
+
+        self._data[_to_bytes(key)] = (entry[0], time.monotonic() + timeout)
+
+        return True
+
+    async def hget(self, key, field, *, encoding: Optional[str] = None):
+        entry = self._get(key)
+        value = entry[0].get(_to_bytes(field)) if entry is not None else None
+
+        return _decode(value, encoding)
+
+    async def hset(self, key, field, value) -> int:
+        fields = self._hash(key)
+        is_new = _to_bytes(field) not in fields
+        fields[_to_bytes(field)] = _to_bytes(value)
+
+        return int(is_new)
+
+    async def hincrby(self, key, field, increment: int = 1) -> int:
+        fields = self._hash(key)
+        value = int(fields.get(_to_bytes(field), b"0")) + increment
+        fields[_to_bytes(field)] = _to_bytes(value)
+
+        return value
+
+    def flushdb(self):
+        self._data.clear()
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
 class RedisDataAccessLayer:
     def __init__(self):
         self.redis_url: str = None
         self.redis_db: int = None
 
+        self._in_memory = InMemoryRedis()
+
     @asynccontextmanager
     async def get_redis_conn(self):
         """ Provide a transaction scope for redis """
         if self.redis_url is None:
             raise ValueError(f"Invalid redis url: { self.redis_url }")
 
+        if self.redis_url == IN_MEMORY_URL:
+            yield self._in_memory
+            return
+
         redis = await aioredis.create_redis_pool(self.redis_url, db=self.redis_db)
 
         try:
@@ -0,0 +1,152 @@
+import math
+import threading
+from datetime import datetime
+from typing import (
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from CTFe.utils.history_utils import ScoreHistory
+
+
+def decayed_value(
+    initial_value: int,
+    minimum_value: int,
+    decay: int,
+    solve_count: int,
+) -> int:
+    """ Value of a challenge after <solve_count> solves
+
+    Quadratic decay: the first solve is worth <initial_value> and the value
+    reaches <minimum_value> after <decay> further solves.
+    """
+
+    solves = max(solve_count - 1, 0)
+
+    value = (
+        (minimum_value - initial_value) / (decay ** 2) * (solves ** 2)
+        + initial_value
+    )
+
+    return max(math.ceil(value), minimum_value)
+
+
+class ScoringParams(NamedTuple):
+    initial_value: int
+    minimum_value: int
+    decay: int
+
+
+class Scoreboard:
+    """ Team totals under dynamic scoring
+
+    Every solver of a challenge holds its current value, so a new solve only
+    has to move the totals of that challenge's solvers by the value change:
+    O(solvers of the challenge) instead of O(teams x challenges).
+    Changed totals are also fed to the score history, if one is given.
+    """
+
+    def __init__(self, history: Optional[ScoreHistory] = None):
+        self.totals: Dict[int, int] = {}
+        self.params: Dict[int, ScoringParams] = {}
+        self.values: Dict[int, int] = {}
+        self.solvers: Dict[int, List[int]] = {}
+        self.solved: Set[Tuple[int, int]] = set()
+
+        # Time of each team's latest solve, breaks ties between equal scores
+        self.last_solve: Dict[int, datetime] = {}
+
+        # Bumped on every change, lets readers cache anything derived from it
+        self.version = 0
+
+        # Highest attempt id already applied, used to catch up with new solves
+        self.last_attempt_id = 0
+
+        self.history = history
+
+        self._lock = threading.RLock()
+
+    def _value(self, challenge_id: int) -> int:
+        params = self.params[challenge_id]
+
+        return decayed_value(*params, len(self.solvers[challenge_id]))
+
+    def _move_solvers(self, challenge_id: int, new_value: int) -> Dict[int, int]:
+        delta = new_value - self.values[challenge_id]
+        self.values[challenge_id] = new_value
+
+        if delta == 0:
+            return {}
+
+        for team_id in self.solvers[challenge_id]:
+            self.totals[team_id] += delta
+
+        return {team_id: self.totals[team_id] for team_id in self.solvers[challenge_id]}
+
+    def _record(self, changed: Dict[int, int], at: Optional[datetime]):
+        if self.history is not None:
+            self.history.record(changed, at or datetime.utcnow())
+
+    def set_challenge(
+        self,
+        challenge_id: int,
+        initial_value: int,
+        minimum_value: int,
+        decay: int,
+        at: Optional[datetime] = None,
+    ) -> Dict[int, int]:
+        """ Add a challenge or change its scoring, returning the changed team totals """
+
+        with self._lock:
+            self.params[challenge_id] = ScoringParams(initial_value, minimum_value, decay)
+            self.solvers.setdefault(challenge_id, [])
+            self.values.setdefault(challenge_id, 0)
+
+            changed = self._move_solvers(challenge_id, self._value(challenge_id))
+            self._record(changed, at)
+            self.version += 1
+
+            return changed
+
+    def solve(
+        self,
+        team_id: int,
+        challenge_id: int,
+        at: Optional[datetime] = None,
+    ) -> Dict[int, int]:
+        """ Count a team's solve of a challenge, returning the changed team totals """
+
+        at = at or datetime.utcnow()
+
+        with self._lock:
+            if (team_id, challenge_id) in self.solved:
+                return {}
+
+            self.solved.add((team_id, challenge_id))
+            self.last_solve[team_id] = max(self.last_solve.get(team_id, at), at)
+            self.solvers[challenge_id].append(team_id)
+            self.totals[team_id] = self.totals.get(team_id, 0) + self.values[challenge_id]
+
+            changed = self._move_solvers(challenge_id, self._value(challenge_id))
+            changed[team_id] = self.totals[team_id]
+            self._record(changed, at)
+            self.version += 1
+
+            return changed
+
+    def ranking(self) -> List[Tuple[int, int]]:
+        """ (team_id, score) pairs, best first
+
+        Equal scores are ranked by who reached them first, i.e. by the time
+        of the team's latest solve.
+        """
+
+        with self._lock:
+            return sorted(
+                self.totals.items(),
+                key=lambda item: (-item[1], self.last_solve[item[0]], item[0]),
+            )
@@ -0,0 +1,130 @@
+import hashlib
+import threading
+from collections import (
+    OrderedDict,
+    deque,
+)
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import (
+    List,
+    Optional,
+)
+
+from sqlalchemy.engine import Engine
+
+from CTFe.config import constants
+from CTFe.utils import query_stats_utils
+from CTFe.utils.metrics_utils import registry
+
+
+slow_queries_total = registry.counter(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_THRESHOLD_MS").labels()
+
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+
+class SlowQuery:
+    __slots__ = (
+        "at", "duration_ms", "route", "origin", "statement", "params_fingerprint", "plan")
+
+    def __init__(self, duration_ms, route, origin, statement, params_fingerprint):
+        self.at = datetime.utcnow()
+        self.duration_ms = duration_ms
+        self.route = route
+        self.origin = origin
+        self.statement = statement
+        self.params_fingerprint = params_fingerprint
+
+        # Filled in by the background EXPLAIN
+        self.plan: Optional[str] = None
+
+
+def fingerprint(parameters) -> str:
+    """ Short hash of the bound values, tells repeated calls apart without logging them """
+
+    return hashlib.sha256(repr(parameters).encode()).hexdigest()[:16]
+
+
+class SlowQueryLog:
+    """ Ring buffer of the latest statements slower than a threshold
+
+    Plans are captured with EXPLAIN (never ANALYZE, so nothing is executed
+    twice) on a background thread with its own connection, off the request
+    path. Each normalized statement is explained once while it is recent.
+    """
+
+    def __init__(self, threshold_ms: float, size: int):
+        self.threshold = threshold_ms / 1000
+
+        self._entries = deque(maxlen=size)
+        self._plans: OrderedDict = OrderedDict()
+        self._plans_size = size
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+
+    def observe(self, conn, statement, parameters, context, executemany, duration):
+        """ Statement listener, see query_stats_utils.add_statement_listener """
+
+        if duration < self.threshold or conn.get_execution_options().get("explain"):
+            return
+
+        stats = query_stats_utils.current_stats()
+        origin = context.execution_options.get("origin") if context is not None else None
+
+        entry = SlowQuery(
+            duration_ms=round(duration * 1000, 3),
+            route=stats.label if stats is not None else None,
+            origin=origin,
+            statement=query_stats_utils.normalize_statement(statement),
+            params_fingerprint=fingerprint(parameters),
+        )
+        slow_queries_total.inc()
+
+        with self._lock:
+            self._entries.append(entry)
+            entry.plan = self._plans.get(entry.statement)
+
+        if entry.plan is None and not executemany:
+            self._executor.submit(self._explain, conn.engine, entry, statement, parameters)
+
+    def _explain(self, engine: Engine, entry: SlowQuery, statement: str, parameters):
+        prefix = EXPLAIN_PREFIXES.get(engine.dialect.name)
+        if prefix is None:
+            return
+
+        try:
+            with engine.connect() as conn:
+                rows = (
+                    conn
+                    .execution_options(explain=True)
+                    .execute(prefix + statement, parameters)
+                    .fetchall()
+                )
+            plan = "\n".join(" ".join(str(value) for value in row) for row in rows)
+        except Exception as e:
+            plan = f"EXPLAIN failed: { e }"
+
+        with self._lock:
+            entry.plan = plan
+
+            self._plans[entry.statement] = plan
+            while len(self._plans) > self._plans_size:
+                self._plans.popitem(last=False)
+
+    def entries(self) -> List[SlowQuery]:
+        """ Logged statements, newest first """
+
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+
+
+slow_query_log = SlowQueryLog(constants.SLOW_QUERY_THRESHOLD_MS, constants.SLOW_QUERY_LOG_SIZE)
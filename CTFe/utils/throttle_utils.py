@@ -0,0 +1,177 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import (
+    Optional,
+    Tuple,
+)
+
+import aioredis
+
+from CTFe.config import constants
+from CTFe.utils.metrics_utils import registry
+from CTFe.utils.redis_utils import (
+    RedisDataAccessLayer,
+    redis_dal,
+)
+
+
+throttled_total = registry.counter(
+    "login_throttled_total", "Login requests rejected before the DB lookup")
+failures_total = registry.counter(
+    "login_failures_total", "Failed login attempts counted by the throttle")
+memory_entries = registry.gauge(
+    "login_throttle_memory_entries", "Throttle keys held by the in-process fallback")
+redis_available = registry.gauge(
+    "login_throttle_redis_available", "1 if throttle state is kept in redis, 0 if in-process")
+
+
+class LoginThrottle:
+    """ Failed login counters per username and per IP with exponential backoff
+
+    State lives in redis so every worker sees the same counters. When redis
+    can't be reached the counters are kept in-process instead.
+    """
+
+    key_prefix = "login-throttle"
+
+    def __init__(self, redis_dal: RedisDataAccessLayer):
+        self.redis_dal = redis_dal
+
+        # key -> (failures, locked_until, expires_at)
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _keys(self, username: str, ip: Optional[str]):
+        keys = [("username", f"{ self.key_prefix }:username:{ username }")]
+
+        if ip is not None:
+            keys.append(("ip", f"{ self.key_prefix }:ip:{ ip }"))
+
+        return keys
+
+    @staticmethod
+    def _free_attempts(scope: str) -> int:
+        if scope == "ip":
+            return constants.LOGIN_FREE_ATTEMPTS_PER_IP
+        return constants.LOGIN_FREE_ATTEMPTS_PER_USERNAME
+
+    @staticmethod
+    def backoff(failures: int, free_attempts: int) -> float:
+        """ Seconds to lock a key out for after the given number of failures """
+
+        if failures <= free_attempts:
+            return 0
+
+        delay = constants.LOGIN_BACKOFF_BASE * 2 ** (failures - free_attempts - 1)
+
+        return min(delay, constants.LOGIN_BACKOFF_MAX)
+
+    # In-process fallback
+    # --------------------
+    def _memory_get(self, key: str) -> Tuple[int, float]:
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+
+            if entry is None:
+                return 0, 0
+            if entry[2] <= now:
+                del self._memory[key]
+                return 0, 0
+
+            return entry[0], entry[1]
+
+    def _memory_incr(self, key: str, free_attempts: int) -> int:
+        now = time.time()
+
+        with self._lock:
+            failures, _, expires_at = self._memory.pop(key, (0, 0, 0))
+            if expires_at <= now:
+                failures = 0
+
+            failures += 1
+            locked_until = now + self.backoff(failures, free_attempts)
+
+            self._memory[key] = (
+                failures, locked_until, now + constants.LOGIN_FAILURE_WINDOW)
+
+            while len(self._memory) > constants.LOGIN_THROTTLE_MEMORY_SIZE:
+                self._memory.popitem(last=False)
+
+            memory_entries.set(len(self._memory))
+
+        return failures
+
+    def _memory_delete(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+            memory_entries.set(len(self._memory))
+
+    # Public interface
+    # -----------------
+    async def retry_after(self, username: str, ip: Optional[str]) -> float:
+        """ Seconds until the next login attempt is allowed, 0 if allowed now """
+
+        keys = self._keys(username, ip)
+        now = time.time()
+
+        try:
+            async with self.redis_dal.get_redis_conn() as redis:
+                states = [
+                    await redis.hget(key, "locked_until", encoding="utf-8")
+                    for _, key in keys
+                ]
+            states = [float(locked_until or 0) for locked_until in states]
+            redis_available.set(1)
+        except (OSError, aioredis.RedisError):
+            states = [self._memory_get(key)[1] for _, key in keys]
+            redis_available.set(0)
+
+        retry_after = 0
+        for (scope, _), locked_until in zip(keys, states):
+            if locked_until > now:
+                throttled_total.inc(scope=scope)
+                retry_after = max(retry_after, locked_until - now)
+
+        return retry_after
+
+    async def register_failure(self, username: str, ip: Optional[str]):
+        """ Count a failed login and extend the lockout if needed """
+
+        keys = self._keys(username, ip)
+
+        try:
+            async with self.redis_dal.get_redis_conn() as redis:
+                for scope, key in keys:
+                    failures = await redis.hincrby(key, "failures", 1)
+                    locked_until = time.time() + self.backoff(
+                        failures, self._free_attempts(scope))
+
+                    await redis.hset(key, "locked_until", locked_until)
+                    await redis.expire(key, constants.LOGIN_FAILURE_WINDOW)
+            redis_available.set(1)
+        except (OSError, aioredis.RedisError):
+            for scope, key in keys:
+                self._memory_incr(key, self._free_attempts(scope))
+            redis_available.set(0)
+
+        for scope, _ in keys:
+            failures_total.inc(scope=scope)
+
+    async def reset(self, username: str):
+        """ Clear the username counter after a successful login """
+
+        _, key = self._keys(username, None)[0]
+
+        self._memory_delete(key)
+
+        try:
+            async with self.redis_dal.get_redis_conn() as redis:
+                await redis.delete(key)
+        except (OSError, aioredis.RedisError):
+            pass
+
+
+login_throttle = LoginThrottle(redis_dal)
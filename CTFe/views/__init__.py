@@ -5,3 +5,6 @@ from CTFe.views.challenge_view import router as challenge_router
 from CTFe.views.attempt_view import router as attempt_router
 from CTFe.views.player_view import router as player_router
 from CTFe.views.contributor_view import router as contributor_router
+from CTFe.views.scoreboard_view import router as scoreboard_router
+from CTFe.views.admin_view import router as admin_router
+from CTFe.views.metrics_view import router as metrics_router
@@ -0,0 +1,112 @@
+from typing import List
+
+from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+
+from CTFe.config.database import dal
+from CTFe.operations import scoreboard_ops
+from CTFe.schemas import (
+    admin_schemas,
+    scoreboard_schemas,
+)
+from CTFe.utils.profiler_utils import (
+    profiler,
+    render_collapsed,
+)
+from CTFe.utils.slow_query_utils import slow_query_log
+from CTFe.config import constants
+
+
+router = APIRouter()
+
+
+@router.get("/scoreboard", response_model=List[scoreboard_schemas.Entry])
+async def get_live_scoreboard(
+    *,
+    session: Session = Depends(dal.get_session),
+) -> Response:
+    """ Live scoreboard, including solves made after a freeze """
+
+    body = scoreboard_ops.render_scoreboard(session)
+
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/scoreboard/freeze", response_model=scoreboard_schemas.Snapshot)
+async def freeze_scoreboard(
+    *,
+    session: Session = Depends(dal.get_session),
+) -> scoreboard_schemas.Snapshot:
+    """ Freeze the public scoreboard at its current state """
+
+    db_snapshot = scoreboard_ops.freeze_scoreboard(session)
+
+    if db_snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The scoreboard is already frozen",
+        )
+
+    return db_snapshot
+
+
+@router.post("/scoreboard/unfreeze", status_code=204)
+async def unfreeze_scoreboard(
+    *,
+    session: Session = Depends(dal.get_session),
+):
+    """ Make the live scoreboard public again """
+
+    if not scoreboard_ops.unfreeze_scoreboard(session):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The scoreboard is not frozen",
+        )
+
+
+@router.get("/slow-queries", response_model=List[admin_schemas.SlowQuery])
+async def get_slow_queries() -> List[admin_schemas.SlowQuery]:
+    """ Latest statements over SLOW_QUERY_THRESHOLD_MS with their plans, newest first """
+
+    return slow_query_log.entries()
+
+
+@router.delete("/slow-queries", status_code=204)
+async def clear_slow_queries():
+    """ Empty the slow query log """
+
+    slow_query_log.clear()
+
+
+@router.get("/profile")
+async def profile_worker(
+    *,
+    seconds: float = Query(10, gt=0, le=constants.PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    include_idle: bool = False,
+) -> Response:
+    """ Sample the stacks of this worker for <seconds>, in the collapsed stack format
+
+    Feed the output to flamegraph.pl or speedscope. Every stack starts with
+    the thread name; MainThread runs the event loop and async handlers.
+    """
+
+    # The sampling thread is left out of its own profile
+    stacks = await run_in_threadpool(
+        profiler.run, seconds, interval_ms / 1000, include_idle)
+
+    if stacks is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running",
+        )
+
+    return Response(content=render_collapsed(stacks), media_type="text/plain")
@@ -89,11 +89,13 @@ async def get_attempt(
 @router.get("/", response_model=List[attempt_schemas.Details])
 async def get_all_attempts(
     *,
+    include_archived: bool = False,
     session: Session = Depends(dal.get_session)
 ) -> List[attempt_schemas.Details]:
-    """ Get all attempt records from DB """
+    """ Get all attempt records from DB, archived ones only if asked for """
 
-    db_attempts = attempt_ops.query_attempts_by_(session).all()
+    db_attempts = attempt_ops.query_attempts_by_(
+        session, include_archived=include_archived).all()
 
     return db_attempts
 
@@ -1,8 +1,11 @@
+import math
+
 from sqlalchemy import and_
 from sqlalchemy.orm import Session
 from fastapi import (
     APIRouter,
     Depends,
+    Request,
     status,
     HTTPException,
 )
@@ -16,8 +19,9 @@ from CTFe.schemas import user_schemas
 from CTFe.operations import (
     auth_ops,
     user_ops,
+    credential_ops,
 )
-from CTFe.utils import pwd_utils
+from CTFe.utils.throttle_utils import login_throttle
 
 
 router = APIRouter()
@@ -25,6 +29,7 @@ router = APIRouter()
 
 @router.post("/token")
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     session: Session = Depends(dal.get_session),
 ):
@@ -35,6 +40,18 @@ async def login(
         detail="Incorrect username or password",
     )
 
+    # Reject throttled clients before touching the DB or bcrypt
+    client_ip = request.client.host if request.client else None
+
+    retry_after = await login_throttle.retry_after(form_data.username, client_ip)
+
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
     conditions = and_(
         User.username == form_data.username,
     )
@@ -42,16 +59,21 @@ async def login(
     db_user = user_ops.query_users_by_(session, conditions).first()
 
     if db_user is None:
+        await login_throttle.register_failure(form_data.username, client_ip)
+
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
     is_correct_password = False
+    new_hashed_password = None
 
     try:
-        is_correct_password = pwd_utils.verify_password(form_data.password, db_user.password)
+        is_correct_password, new_hashed_password = await credential_ops.verify_password(
+            form_data.password, db_user.password)
     except ValueError:
+        await login_throttle.register_failure(form_data.username, client_ip)
         raise incorrect_credentials_exception
     except:
         raise
@@ -59,8 +81,15 @@ async def login(
     if db_user is None:
         raise incorrect_credentials_exception
     elif not is_correct_password:
+        await login_throttle.register_failure(form_data.username, client_ip)
         raise incorrect_credentials_exception
 
+    await login_throttle.reset(form_data.username)
+
+    # The stored hash uses an outdated scheme or cost
+    if new_hashed_password is not None:
+        db_user = user_ops.update_password_hash(session, db_user, new_hashed_password)
+
     token = auth_ops.create_access_token(db_user=db_user)
 
     return {
@@ -88,7 +117,7 @@ async def register(
             detail=f"The username: { user_create.username } is already taken"
         )
 
-    db_user = user_ops.create_user(session, user_create)
+    db_user = await user_ops.create_user(session, user_create)
 
     token = auth_ops.create_access_token(db_user=db_user)
 
@@ -115,7 +115,7 @@ async def update_contributor(
 ) -> contributor_schemas.Details:
     """ Update contributor record from DB """
 
-    db_contributor = contributor_ops.update_contributor(
+    db_contributor = await contributor_ops.update_contributor(
         session, db_contributor, contributor_update)
 
     return db_contributor
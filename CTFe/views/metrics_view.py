@@ -0,0 +1,18 @@
+from fastapi import (
+    APIRouter,
+    Response,
+)
+
+from CTFe.utils import metrics_utils
+
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics() -> Response:
+    """ Every collected metric in the Prometheus text format """
+
+    body = metrics_utils.render_prometheus(metrics_utils.registry)
+
+    return Response(content=body, media_type=metrics_utils.PROMETHEUS_CONTENT_TYPE)
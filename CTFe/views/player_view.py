@@ -4,6 +4,7 @@ from typing import (
 )
 
 from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import (
     APIRouter,
@@ -111,7 +112,7 @@ async def update_player(
 ) -> player_schemas.Details:
     """ Update player record from DB """
 
-    db_player = player_ops.update_player(session, db_player, player_update)
+    db_player = await player_ops.update_player(session, db_player, player_update)
 
     return db_player
 
@@ -137,7 +138,7 @@ def lead_team(
     """ Create team and assign this player as the captain """
 
     # Player is not part of another team
-    if db_player.team is not None:
+    if db_player.team_id is not None:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
             detail="You are already part of a team"
@@ -156,10 +157,23 @@ def lead_team(
             detail=f"The name: { team_create.name } is already taken",
         )
 
-    db_team = team_ops.create_team(session, team_create)
-    db_player = player_ops.lead_team(session, db_player, db_team)
+    try:
+        db_new_player = player_ops.lead_team(session, db_player, team_create)
+    except IntegrityError:
+        # Another request took the name after the check above
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"The name: { team_create.name } is already taken",
+        )
 
-    return db_player
+    # Joined another team after the check above
+    if db_new_player is None:
+        raise HTTPException(
+            status.HTTP_403_FORBIDDEN,
+            detail="You are already part of a team"
+        )
+
+    return db_new_player
 
 
 @router.patch("/quit-team", status_code=204)
@@ -170,20 +184,13 @@ def quit_team(
 ) -> player_schemas.Details:
     """ Quit team and assign the next member as captain or delete team if no other members """
 
-    db_team = db_player.team
-
     # Team doesn't exist
-    if db_team is None:
+    if not player_ops.quit_team(session, db_player):
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
             detail="You are not part of a team",
         )
 
-    if len(db_team.players) <= 1:
-        team_ops.delete_team(session, db_team)
-    else:
-        player_ops.quit_team(session, db_player)
-
 
 @router.patch("/invite-player/{player_id}", status_code=204)
 def invite_player(
@@ -204,7 +211,7 @@ def invite_player(
         )
 
     # The team is full
-    if len(db_team.players) >= constants.MAX_TEAM_MEMBERS:
+    if db_team.member_count >= constants.MAX_TEAM_MEMBERS:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
             detail="The team is full",
@@ -223,64 +230,83 @@ def invite_player(
             detail="Player not found",
         )
 
-    # New player has already been invited
-    if db_team in db_new_player.team_invites:
+    # New player is part of another team
+    if db_new_player.team_id is not None:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
-            detail=f"This player has already been invited",
+            detail="Player is already part of a team",
         )
 
+    outcome = player_ops.invite_player(session, db_new_player, db_team)
 
-    # New player is part of another team
-    if db_new_player.team is not None:
+    # New player has already been invited
+    if outcome == enums.MembershipOutcome.ALREADY_INVITED:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
-            detail="Player is already part of a team",
+            detail=f"This player has already been invited",
         )
 
-    player_ops.invite_player(session, db_new_player, db_team)
+    # The team has used up its pending invites
+    if outcome == enums.MembershipOutcome.INVITE_LIMIT:
+        raise HTTPException(
+            status.HTTP_403_FORBIDDEN,
+            detail="The team has too many pending invites",
+        )
 
 
-@router.patch("/delete-invite/{player_id}", status_code=204)
-def remove_invitation(
+@router.post("/invite-players", response_model=List[player_schemas.InviteResult])
+def invite_players(
     *,
-    player_id: int,
+    batch_invite: player_schemas.BatchInvite,
     db_player: User = Depends(auth_ops.get_current_user),
     session: Session = Depends(dal.get_session),
-) -> player_schemas.Details:
-    """ Delete player invitation to join the team """
+) -> List[player_schemas.InviteResult]:
+    """ Invite many players to join the team, reporting the outcome for each of them """
 
     db_team = db_player.team
 
-    conditions = and_(
-        User.id == player_id,
-    )
-
-    db_new_player = player_ops.query_players_by_(session, conditions).first()
+    # Team doesn't exist
+    if db_team is None:
+        raise HTTPException(
+            status.HTTP_403_FORBIDDEN,
+            detail="You are not part of a team",
+        )
 
-    # Player not found
-    if db_new_player is None:
+    # The team is full
+    if db_team.member_count >= constants.MAX_TEAM_MEMBERS:
         raise HTTPException(
-            status.HTTP_404_NOT_FOUND,
-            detail="Player not found",
+            status.HTTP_403_FORBIDDEN,
+            detail="The team is full",
         )
 
+    results = player_ops.invite_players(session, db_team, batch_invite)
+
+    return results
+
+
+@router.patch("/delete-invite/{username}", status_code=204)
+def remove_invitation(
+    *,
+    username: str,
+    db_player: User = Depends(auth_ops.get_current_user),
+    session: Session = Depends(dal.get_session),
+) -> player_schemas.Details:
+    """ Delete player invitation to join the team """
+
     # Team doesn't exist
-    if db_team is None:
+    if db_player.team_id is None:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
             detail="You are not part of a team",
         )
 
-    # The team hasn't invited the player
-    if db_new_player not in db_team.player_invites:
+    # Unknown player, or the team hasn't invited the player
+    if not player_ops.remove_invitation(session, db_player.team_id, username):
         raise HTTPException(
-            status.HTTP_403_FORBIDDEN,
-            detail=f"This player has not been invited",
+            status.HTTP_404_NOT_FOUND,
+            detail="Invitation not found",
         )
 
-    player_ops.remove_invitation(session, db_new_player, db_team)
-
 
 @router.patch("/accept-invite/{team_id}", status_code=204)
 def accept_invite(
@@ -292,31 +318,31 @@ def accept_invite(
     """ Accept player invitation to join the team """
 
     # User is already in a team
-    if db_player.team is not None:
+    if db_player.team_id is not None:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
             detail="You are already part of a team",
         )
 
-    conditions = and_(
-        Team.id == team_id,
-        Team.player_invites.any(id = db_player.id),
-    )
+    outcome = player_ops.accept_invite(session, db_player, team_id)
 
-    db_team = team_ops.query_teams_by_(session, conditions).first()
+    # Joined another team meanwhile
+    if outcome == enums.MembershipOutcome.ALREADY_IN_TEAM:
+        raise HTTPException(
+            status.HTTP_403_FORBIDDEN,
+            detail="You are already part of a team",
+        )
 
-    # Team doesn't exist
-    if db_team is None:
+    # Team doesn't exist or hasn't invited the player
+    if outcome == enums.MembershipOutcome.NOT_INVITED:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
             detail="The team is not found",
         )
 
     # The team is full
-    if len(db_team.players) >= constants.MAX_TEAM_MEMBERS:
+    if outcome == enums.MembershipOutcome.TEAM_FULL:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
             detail="The team is full",
         )
-
-    player_ops.accept_invite(session, db_player, db_team)
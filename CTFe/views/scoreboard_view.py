@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import (
+    List,
+    Optional,
+)
+
+from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    Response,
+)
+
+from CTFe.config.database import dal
+from CTFe.operations import scoreboard_ops
+from CTFe.schemas import scoreboard_schemas
+
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[scoreboard_schemas.Entry])
+async def get_scoreboard(
+    *,
+    session: Session = Depends(dal.get_session),
+) -> Response:
+    """ Teams ranked by their dynamic score, as of the freeze if frozen """
+
+    # Already rendered bytes, skip response model validation and encoding
+    body = scoreboard_ops.public_scoreboard(session)
+
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/history", response_model=List[scoreboard_schemas.HistorySeries])
+async def get_score_history(
+    *,
+    top: int = 10,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    session: Session = Depends(dal.get_session),
+) -> List[scoreboard_schemas.HistorySeries]:
+    """ Score over time of the top ranked teams """
+
+    return scoreboard_ops.score_history(session, top, since, until)
@@ -105,7 +105,7 @@ async def get_all_teams(
 ) -> List[team_schemas.Details]:
     """ Get all team records from DB """
 
-    db_teams = team_ops.query_teams_by_(session).all()
+    db_teams = team_ops.query_team_details_by_(session).all()
 
     return db_teams
 
@@ -39,7 +39,7 @@ async def create_user(
             detail=f"The username: { user_create.username } is already taken",
         )
 
-    db_user = user_ops.create_user(session, user_create)
+    db_user = await user_ops.create_user(session, user_create)
 
     return db_user
 
@@ -123,7 +123,7 @@ async def update_user(
             detail="User not found",
         )
 
-    db_user = user_ops.update_user(session, db_user, user_update)
+    db_user = await user_ops.update_user(session, db_user, user_update)
 
     return db_user
 
@@ -0,0 +1,67 @@
+""" Decode cost per request with and without the decoded-JWT cache
+
+Every authenticated request decodes its bearer token at least once through
+`auth_ops.get_current_user`. Run from the root directory:
+
+    python -m benchmarks.bench_jwt_decode [--requests 20000] [--users 100]
+"""
+import argparse
+import json
+import time
+from datetime import (
+    datetime,
+    timedelta,
+)
+
+from CTFe.utils import jwt_utils
+
+
+def make_tokens(users: int):
+    expire = datetime.utcnow() + timedelta(minutes=15)
+
+    return [
+        jwt_utils.encode({
+            "sub": str(id),
+            "exp": expire,
+            "iat": datetime.utcnow().timestamp(),
+        })
+        for id in range(users)
+    ]
+
+
+def run(decode, tokens, requests: int) -> float:
+    """ Return the mean decode cost per request in microseconds """
+
+    start = time.perf_counter()
+
+    for i in range(requests):
+        decode(tokens[i % len(tokens)])
+
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    tokens = make_tokens(args.users)
+    cache = jwt_utils.TokenCache(max(args.users, 1))
+
+    uncached_us = run(jwt_utils.decode, tokens, args.requests)
+    cached_us = run(cache.decode, tokens, args.requests)
+
+    print(json.dumps({
+        "benchmark": "jwt_decode",
+        "requests": args.requests,
+        "users": args.users,
+        "uncached_us_per_request": round(uncached_us, 3),
+        "cached_us_per_request": round(cached_us, 3),
+        "speedup": round(uncached_us / cached_us, 2),
+        "cache": cache.stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+""" Per-request overhead of the HTTP metrics middleware
+
+Calls a bare ASGI app directly, with and without MetricsMiddleware in front
+of it, so the difference is the cost of collecting the metrics. Run from
+the root directory:
+
+    python -m benchmarks.bench_metrics_overhead [--requests 50000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from CTFe.utils import middleware_utils
+
+
+PATHS = ["/users/1", "/attempts/", "/players/invite", "/scoreboard/", "/unknown"]
+
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def run(app, requests: int) -> float:
+    """ Return the mean cost per request in microseconds """
+
+    scopes = [
+        {"type": "http", "method": "GET", "path": path}
+        for path in PATHS
+    ]
+
+    start = time.perf_counter()
+
+    for i in range(requests):
+        await app(scopes[i % len(scopes)], receive, send)
+
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50_000)
+    args = parser.parse_args()
+
+    measured_app = middleware_utils.MetricsMiddleware(
+        bare_app, prefixes={"/users", "/attempts", "/players", "/scoreboard"})
+
+    loop = asyncio.get_event_loop()
+
+    bare_us = loop.run_until_complete(run(bare_app, args.requests))
+    measured_us = loop.run_until_complete(run(measured_app, args.requests))
+
+    print(json.dumps({
+        "benchmark": "metrics_overhead",
+        "requests": args.requests,
+        "bare_us_per_request": round(bare_us, 3),
+        "measured_us_per_request": round(measured_us, 3),
+        "overhead_us_per_request": round(measured_us - bare_us, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
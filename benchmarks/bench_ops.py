@@ -0,0 +1,202 @@
+""" Cost of the operations layer functions against a seeded database
+
+Calls user_ops, team_ops, player_ops, challenge_ops and attempt_ops
+directly, without HTTP in between, so the numbers are the ORM and SQL cost.
+The database at --db-url is DROPPED and seeded first through
+seed_ops, it defaults to the test database. Run from the root directory:
+
+    python -m benchmarks.bench_ops [--teams 1000] [--attempts 100000] [--save baseline.json]
+
+Compare a run with a saved one through benchmarks.compare_baseline.
+"""
+import argparse
+import json
+import random
+import time
+from typing import (
+    Callable,
+    Dict,
+)
+
+from sqlalchemy import (
+    and_,
+    create_engine,
+)
+from sqlalchemy.orm import (
+    Session,
+    sessionmaker,
+)
+
+from CTFe.config import constants
+from CTFe.config.database import Base
+from CTFe.models import (
+    Attempt,
+    Team,
+    User,
+)
+from CTFe.operations import (
+    attempt_ops,
+    challenge_ops,
+    player_ops,
+    seed_ops,
+    team_ops,
+    user_ops,
+)
+from CTFe.schemas import attempt_schemas
+from CTFe.utils import enums
+
+
+TEST_DB_URL = f"{constants.DB_TYPE}://{constants.TEST_DB_USERNAME}:{constants.TEST_DB_PASSWORD}@{constants.TEST_DB_ADDRESS}:{constants.TEST_DB_PORT}/{constants.TEST_DB_NAME}"
+
+
+# Cases
+# ------
+def make_cases(args) -> Dict[str, Callable[[Session, random.Random], None]]:
+    """ Benchmarked calls, each given a new session and the run's generator """
+
+    def player_id(rng):
+        return rng.randint(1, args.teams * args.team_size)
+
+    def team_id(rng):
+        return rng.randint(1, args.teams)
+
+    def get_user_by_username(session, rng):
+        conditions = and_(User.username == f"player{ player_id(rng) }")
+        user_ops.query_users_by_(session, conditions).first()
+
+    def get_player(session, rng):
+        conditions = and_(User.id == player_id(rng))
+        player_ops.query_players_by_(session, conditions).first()
+
+    def get_team_details(session, rng):
+        conditions = and_(Team.id == team_id(rng))
+        team_ops.query_team_details_by_(session, conditions).first()
+
+    def get_all_team_details(session, rng):
+        team_ops.query_team_details_by_(session).all()
+
+    def invite_and_remove_player(session, rng):
+        db_team = session.query(Team).get(team_id(rng))
+        db_player = session.query(User).get(
+            rng.randint(args.teams * args.team_size + 1, args.teams * args.team_size * 2))
+
+        if player_ops.invite_player(session, db_player, db_team) == enums.MembershipOutcome.OK:
+            player_ops.remove_invitation(session, db_team.id, db_player.username)
+
+    def get_all_challenges(session, rng):
+        challenge_ops.query_challenges_by_(session).all()
+
+    def get_team_attempts(session, rng):
+        conditions = and_(Attempt.team_id == team_id(rng))
+        attempt_ops.query_attempts_by_(session, conditions).all()
+
+    def create_wrong_attempt(session, rng):
+        attempt_ops.create_attempt(session, attempt_schemas.Create(
+            flag="wrong",
+            team_id=team_id(rng),
+            challenge_id=rng.randint(1, args.challenges),
+        ))
+
+    return {
+        "user_ops.query_users_by_username": get_user_by_username,
+        "player_ops.query_players_by_id": get_player,
+        "team_ops.query_team_details_by_id": get_team_details,
+        "team_ops.query_team_details_all": get_all_team_details,
+        "player_ops.invite_and_remove": invite_and_remove_player,
+        "challenge_ops.query_challenges_all": get_all_challenges,
+        "attempt_ops.query_attempts_by_team": get_team_attempts,
+        "attempt_ops.create_attempt_wrong": create_wrong_attempt,
+    }
+
+
+def run(SessionLocal, case, rng: random.Random, repeat: int) -> dict:
+    """ Call <case> <repeat> times, each in a new session """
+
+    durations = []
+
+    for _ in range(repeat):
+        session = SessionLocal()
+        start = time.perf_counter()
+        try:
+            case(session, rng)
+        finally:
+            session.close()
+        durations.append(time.perf_counter() - start)
+
+    durations.sort()
+
+    return {
+        "mean_us": round(sum(durations) / repeat * 1_000_000, 1),
+        "p50_us": round(durations[repeat // 2] * 1_000_000, 1),
+        "p99_us": round(durations[min(repeat * 99 // 100, repeat - 1)] * 1_000_000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url", default=TEST_DB_URL)
+    parser.add_argument("--teams", type=int, default=1_000)
+    parser.add_argument("--team-size", type=int, default=4)
+    parser.add_argument("--challenges", type=int, default=50)
+    parser.add_argument("--attempts", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="Run the cases whose name contains this")
+    parser.add_argument("--save", help="Also write the results to this file, as a baseline")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url)
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    # Fixed team sizes and as many free players as members keep the ids predictable
+    config = seed_ops.SeedConfig(
+        teams=args.teams,
+        min_team_size=args.team_size,
+        max_team_size=args.team_size,
+        free_players=args.teams * args.team_size,
+        challenges=args.challenges,
+        attempts=args.attempts,
+        seed=args.seed,
+    )
+
+    start = time.perf_counter()
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    session = SessionLocal()
+    try:
+        seed_ops.seed_database(session, config)
+    finally:
+        session.close()
+
+    seed_s = time.perf_counter() - start
+
+    rng = random.Random(args.seed)
+
+    results = {
+        name: run(SessionLocal, case, rng, args.repeat)
+        for name, case in make_cases(args).items()
+        if args.only is None or args.only in name
+    }
+
+    report = json.dumps({
+        "benchmark": "ops",
+        "config": {
+            name: value
+            for name, value in vars(args).items()
+            if name not in ("db_url", "save")
+        },
+        "seed_s": round(seed_s, 2),
+        "results": results,
+    }, indent=2)
+
+    print(report)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+""" Cost of serving the public scoreboard, frozen and live, against a seeded database
+
+Times scoreboard_ops.public_scoreboard, the function behind /scoreboard/,
+each call in a new session as requests do:
+
+- frozen: the active snapshot lookup plus its stored body
+- live: the active snapshot lookup, the scoreboard generation check and
+  sync, and the body rendered once per scoreboard version
+- rendered: ranking and rendering the live scoreboard on every request,
+  what both paths avoid
+
+The database at --db-url is DROPPED and seeded first through seed_ops, it
+defaults to the test database. Run from the root directory:
+
+    python -m benchmarks.bench_scoreboard_snapshot [--requests 2000] [--teams 500]
+"""
+import argparse
+import json
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from CTFe.config.database import Base
+from CTFe.operations import (
+    scoreboard_ops,
+    seed_ops,
+)
+from benchmarks.bench_ops import TEST_DB_URL
+
+
+def render(session) -> bytes:
+    """ What every request would do without stored bytes """
+
+    scoreboard = scoreboard_ops.get_scoreboard(session)
+
+    return scoreboard_ops.render_entries(scoreboard_ops.rank_teams(session, scoreboard))
+
+
+def run(SessionLocal, serve, requests: int) -> float:
+    """ Return the mean cost per request in microseconds, each in a new session """
+
+    start = time.perf_counter()
+
+    for _ in range(requests):
+        session = SessionLocal()
+        try:
+            serve(session)
+        finally:
+            session.close()
+
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url", default=TEST_DB_URL)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--teams", type=int, default=500)
+    parser.add_argument("--challenges", type=int, default=40)
+    parser.add_argument("--attempts", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=38)
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url)
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    config = seed_ops.SeedConfig(
+        teams=args.teams,
+        challenges=args.challenges,
+        attempts=args.attempts,
+        seed=args.seed,
+    )
+
+    session = SessionLocal()
+    try:
+        seed_ops.seed_database(session, config)
+
+        # Build the live scoreboard and its rendering outside the timings
+        snapshot = scoreboard_ops.public_scoreboard(session)
+    finally:
+        session.close()
+
+    rendered_us = run(SessionLocal, render, args.requests)
+    live_us = run(SessionLocal, scoreboard_ops.public_scoreboard, args.requests)
+
+    session = SessionLocal()
+    try:
+        scoreboard_ops.freeze_scoreboard(session)
+        frozen_us = run(SessionLocal, scoreboard_ops.public_scoreboard, args.requests)
+        scoreboard_ops.unfreeze_scoreboard(session)
+    finally:
+        session.close()
+
+    print(json.dumps({
+        "benchmark": "scoreboard_snapshot",
+        "config": {
+            name: value
+            for name, value in vars(args).items()
+            if name != "db_url"
+        },
+        "snapshot_bytes": len(snapshot),
+        "rendered_us_per_request": round(rendered_us, 3),
+        "live_us_per_request": round(live_us, 3),
+        "frozen_us_per_request": round(frozen_us, 3),
+        "live_speedup": round(rendered_us / live_us, 2),
+        "frozen_speedup": round(rendered_us / frozen_us, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+""" Flag regressions of a benchmark run against a saved baseline
+
+Works on the JSON printed by any benchmark here: timings (keys with _us or
+_ms) regress when they grow, throughputs (_rps) and speedups when they
+shrink, by more than --tolerance. Run from the root directory:
+
+    python -m benchmarks.compare_baseline baseline.json current.json [--tolerance 0.1]
+
+Exits with 1 if anything regressed.
+"""
+import argparse
+import json
+import re
+import sys
+from typing import (
+    Dict,
+    Iterator,
+    Tuple,
+)
+
+
+LOWER_IS_BETTER_RE = re.compile(r"_(us|ms)(_|$)")
+HIGHER_IS_BETTER_RE = re.compile(r"(_rps|speedup)$")
+
+
+def flatten(report: dict, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """ (dotted key, value) of every number in the report """
+
+    for key, value in report.items():
+        name = f"{ prefix }{ key }"
+
+        if isinstance(value, dict):
+            yield from flatten(value, f"{ name }.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    tolerance: float,
+) -> Dict[str, Tuple[float, float, float]]:
+    """ key -> (baseline, current, relative change) of the regressed metrics """
+
+    baseline_values = dict(flatten(baseline))
+    regressions = {}
+
+    for key, value in flatten(current):
+        if key.startswith("config.") or key not in baseline_values:
+            continue
+
+        leaf = key.rsplit(".", 1)[-1]
+        base = baseline_values[key]
+
+        if base == 0:
+            continue
+
+        change = (value - base) / base
+
+        if LOWER_IS_BETTER_RE.search(leaf) and change > tolerance:
+            regressions[key] = (base, value, change)
+        elif HIGHER_IS_BETTER_RE.search(leaf) and change < -tolerance:
+            regressions[key] = (base, value, change)
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative change")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    if baseline.get("config") != current.get("config"):
+        print("warning: the runs were made with different configs", file=sys.stderr)
+
+    regressions = compare(baseline, current, args.tolerance)
+
+    for key, (base, value, change) in sorted(regressions.items()):
+        print(f"REGRESSION { key }: { base } -> { value } ({change:+.1%})")
+
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
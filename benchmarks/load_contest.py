@@ -0,0 +1,268 @@
+""" Load test modelling a contest against a running app
+
+Players register and log in, form teams through lead-team and batch
+invites, then every team polls the challenges and submits flags for
+--duration seconds. Challenge and attempt routes are admin only, so those
+requests go out with an admin token on behalf of the teams. Start the app
+with its DB and redis first, then run from the root directory:
+
+    python -m benchmarks.load_contest [--base-url http://localhost:8000] [--teams 50]
+
+Prints throughput, p50/p99 latency and errors per endpoint as JSON. The
+workload is fixed by --seed; --run-id only keeps names unique across runs.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+import httpx
+
+
+PASSWORD = "load-test-password"
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.status_counts: Dict[int, int] = defaultdict(int)
+
+    def report(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "status_counts": dict(sorted(self.status_counts.items())),
+        }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """ Nearest-rank percentile of sorted values """
+
+    if not values:
+        return 0
+
+    rank = max(round(pct / 100 * len(values)) - 1, 0)
+
+    return values[min(rank, len(values) - 1)]
+
+
+class Contest:
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.limit = asyncio.Semaphore(args.concurrency)
+
+        self.stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+
+        self.admin_token: Optional[str] = None
+        self.flags: Dict[int, str] = {}
+
+    async def request(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        token: Optional[str] = None,
+        **kwargs,
+    ) -> Optional[httpx.Response]:
+        """ Send a request, timing it under <endpoint>; None on transport errors """
+
+        headers = {"Authorization": f"Bearer { token }"} if token else {}
+        stats = self.stats[endpoint]
+
+        async with self.limit:
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, headers=headers, **kwargs)
+            except httpx.HTTPError:
+                stats.latencies.append(time.perf_counter() - start)
+                stats.errors += 1
+                return None
+
+            stats.latencies.append(time.perf_counter() - start)
+
+        stats.status_counts[response.status_code] += 1
+        if response.status_code >= 400:
+            stats.errors += 1
+
+        return response
+
+    # Setup
+    # ------
+    async def register(self, username: str, user_type: str = "player") -> Optional[str]:
+        response = await self.request(
+            "POST /register", "POST", "/register",
+            json={"username": username, "password": PASSWORD, "user_type": user_type},
+        )
+
+        return response.json()["token"] if response is not None and not response.is_error else None
+
+    async def login(self, username: str) -> Optional[str]:
+        response = await self.request(
+            "POST /token", "POST", "/token",
+            data={"username": username, "password": PASSWORD},
+        )
+
+        return response.json()["token"] if response is not None and not response.is_error else None
+
+    async def create_challenges(self):
+        for i in range(self.args.challenges):
+            flag = f"CTF{{{ self.args.run_id }-{ i }}}"
+
+            response = await self.request(
+                "POST /challenges/", "POST", "/challenges/", self.admin_token,
+                json={"name": f"{ self.args.run_id }-challenge-{ i }", "flag": flag},
+            )
+
+            if response is not None and not response.is_error:
+                self.flags[response.json()["id"]] = flag
+
+    async def form_team(self, team: int) -> Optional[int]:
+        """ Register and log in the team's players, then build the team; returns its id """
+
+        usernames = [
+            f"{ self.args.run_id }-team{ team }-player{ i }"
+            for i in range(self.args.team_size)
+        ]
+
+        await asyncio.gather(*(self.register(username) for username in usernames))
+        tokens = await asyncio.gather(*(self.login(username) for username in usernames))
+
+        captain_token, *member_tokens = tokens
+        if captain_token is None:
+            return None
+
+        response = await self.request(
+            "POST /players/lead-team", "POST", "/players/lead-team", captain_token,
+            json={"name": f"{ self.args.run_id }-team{ team }"},
+        )
+        if response is None or response.is_error:
+            return None
+
+        team_id = response.json()["team_id"]
+
+        await self.request(
+            "POST /players/invite-players", "POST", "/players/invite-players", captain_token,
+            json={"usernames": usernames[1:]},
+        )
+
+        await asyncio.gather(*(
+            self.request(
+                "PATCH /players/accept-invite/{team_id}",
+                "PATCH", f"/players/accept-invite/{ team_id }", token,
+            )
+            for token in member_tokens
+            if token is not None
+        ))
+
+        return team_id
+
+    # Contest
+    # --------
+    async def play(self, team_id: int, rng: random.Random, deadline: float):
+        """ Poll the challenges and submit flags until the deadline """
+
+        while time.perf_counter() < deadline:
+            await self.request("GET /challenges/", "GET", "/challenges/", self.admin_token)
+
+            if self.flags:
+                challenge_id = rng.choice(sorted(self.flags))
+                flag = (
+                    self.flags[challenge_id]
+                    if rng.random() < self.args.correct_ratio else
+                    f"wrong-{ rng.getrandbits(32) }"
+                )
+
+                await self.request(
+                    "POST /attempts/", "POST", "/attempts/", self.admin_token,
+                    json={"flag": flag, "team_id": team_id, "challenge_id": challenge_id},
+                )
+
+            await asyncio.sleep(rng.expovariate(1 / self.args.think) if self.args.think else 0)
+
+    async def run(self) -> dict:
+        phases = {}
+
+        start = time.perf_counter()
+        self.admin_token = await self.register(f"{ self.args.run_id }-admin", "admin")
+        if self.admin_token is None:
+            raise SystemExit("Could not register the admin user, is the app running?")
+        await self.create_challenges()
+        phases["setup_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        team_ids = await asyncio.gather(*(self.form_team(team) for team in range(self.args.teams)))
+        team_ids = [team_id for team_id in team_ids if team_id is not None]
+        phases["team_formation_s"] = time.perf_counter() - start
+
+        # One generator per team, drawn in order, so the workload only depends on the seed
+        rngs = [random.Random(self.random.getrandbits(64)) for _ in team_ids]
+
+        start = time.perf_counter()
+        deadline = start + self.args.duration
+        await asyncio.gather(*(
+            self.play(team_id, rng, deadline)
+            for team_id, rng in zip(team_ids, rngs)
+        ))
+        phases["contest_s"] = time.perf_counter() - start
+
+        elapsed = sum(phases.values())
+
+        return {
+            "benchmark": "load_contest",
+            "config": {
+                name: value
+                for name, value in vars(self.args).items()
+                if name != "base_url"
+            },
+            "teams_formed": len(team_ids),
+            "phases": {name: round(value, 3) for name, value in phases.items()},
+            "endpoints": {
+                endpoint: stats.report(elapsed)
+                for endpoint, stats in sorted(self.stats.items())
+            },
+        }
+
+
+async def main_async(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30, limits=limits) as client:
+        return await Contest(client, args).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--team-size", type=int, default=4)
+    parser.add_argument("--challenges", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of flag submissions")
+    parser.add_argument("--correct-ratio", type=float, default=0.2)
+    parser.add_argument("--think", type=float, default=1, help="Mean seconds between a team's requests")
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight at most")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--run-id", default=f"load{ int(time.time()) }")
+    args = parser.parse_args()
+
+    report = asyncio.get_event_loop().run_until_complete(main_async(args))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import os
+
 from fastapi.testclient import TestClient
 
 from CTFe.config import constants
@@ -6,16 +8,35 @@ from CTFe.config.database import (
     dal,
     Base,
 )
-from CTFe.utils.redis_utils import redis_dal
+from CTFe.utils.redis_utils import (
+    IN_MEMORY_URL,
+    redis_dal,
+)
+
+# Name of the pytest-xdist worker (gw0, gw1, ...), None when not run in parallel
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER")
 
-dal.db_url = f"{constants.DB_TYPE}://{constants.TEST_DB_USERNAME}:{constants.TEST_DB_PASSWORD}@{constants.TEST_DB_ADDRESS}:{constants.TEST_DB_PORT}/{constants.TEST_DB_NAME}"
+if constants.TEST_BACKEND == "sqlite":
+    # In-memory, so every worker process already has its own DB and redis
+    dal.db_url = "sqlite://"
+    redis_dal.redis_url = IN_MEMORY_URL
+else:
+    dal.db_url = f"{constants.DB_TYPE}://{constants.TEST_DB_USERNAME}:{constants.TEST_DB_PASSWORD}@{constants.TEST_DB_ADDRESS}:{constants.TEST_DB_PORT}/{constants.TEST_DB_NAME}"
+    redis_dal.redis_url = constants.TEST_REDIS_ADDRESS
+    redis_dal.redis_db = constants.TEST_REDIS_DB_NAME
+
+    # Workers share the servers, so each one gets its own schema and redis DB
+    if XDIST_WORKER is not None:
+        dal.schema = f"test_{ XDIST_WORKER }"
+        redis_dal.redis_db += int(XDIST_WORKER.lstrip("gw"))
 
 dal.init()
 
+if dal.schema is not None:
+    with dal.engine.begin() as connection:
+        connection.execute(f"CREATE SCHEMA IF NOT EXISTS { dal.schema }")
+
 Base.metadata.drop_all(dal.engine)
 Base.metadata.create_all(dal.engine)
 
-redis_dal.redis_url = constants.TEST_REDIS_ADDRESS
-redis_dal.redis_db = constants.TEST_REDIS_DB_NAME
-
 BASE_URL = "http://localhost:8000"
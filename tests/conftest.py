@@ -0,0 +1,8 @@
+from .db_rollback import (
+    pytest_configure,
+    rollback_db,
+)
+from .n_plus_one import (
+    detect_n_plus_one,
+    pytest_runtest_call,
+)
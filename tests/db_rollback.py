@@ -0,0 +1,79 @@
+""" pytest plugin running every test inside one DB transaction that is rolled back
+
+The `rollback_db` fixture (autouse) hands a single session, bound to a
+connection with an open transaction, to both `dal.get_session` (the
+dependency of the routes) and `dal.get_session_ctx` (used by the tests).
+The session works inside a SAVEPOINT that is restarted after every
+`session.commit()` or `session.rollback()` of the code under test, so
+teardown is one rollback and tests can't see each other's rows. The
+scoreboard state cached by scoreboard_ops is reset too, it would outlive
+the rows it was built from.
+
+Tests that need real commits, e.g. from concurrent connections, opt out
+with `@pytest.mark.no_rollback` and clean up after themselves.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from CTFe.main import app
+from CTFe.config.database import dal
+from CTFe.operations import scoreboard_ops
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "no_rollback: let the test commit for real, without the rollback_db fixture")
+
+
+@pytest.fixture(autouse=True)
+def rollback_db(request, monkeypatch):
+    # Every test starts from a worker that hasn't built or served a scoreboard
+    for name in ("_scoreboard", "_generation", "_rendered", "_snapshot"):
+        monkeypatch.setattr(scoreboard_ops, name, None)
+
+    if request.node.get_closest_marker("no_rollback") is not None:
+        yield None
+        return
+
+    connection = dal.engine.connect()
+    transaction = connection.begin()
+
+    session = dal._SessionLocal(bind=connection)
+    session.begin_nested()
+
+    @event.listens_for(session, "after_transaction_end")
+    def restart_savepoint(session, ended_transaction):
+        # The SAVEPOINT was committed or rolled back, open the next one
+        if ended_transaction.nested and not ended_transaction._parent.nested:
+            session.expire_all()
+            session.begin_nested()
+
+    def get_session():
+        try:
+            yield session
+        except:
+            # session.rollback() would end the outer transaction too
+            session.transaction.rollback()
+            raise
+
+    get_session_ctx = contextmanager(get_session)
+
+    # The routes depend on the original bound method
+    route_dependency = dal.get_session
+    app.dependency_overrides[route_dependency] = get_session
+    monkeypatch.setattr(dal, "get_session", get_session)
+    monkeypatch.setattr(dal, "get_session_ctx", get_session_ctx)
+
+    try:
+        yield session
+    finally:
+        app.dependency_overrides.pop(route_dependency, None)
+
+        # Unwind the SAVEPOINT first, without opening another one
+        event.remove(session, "after_transaction_end", restart_savepoint)
+        session.rollback()
+        session.close()
+        transaction.rollback()
+        connection.close()
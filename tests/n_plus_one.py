@@ -0,0 +1,120 @@
+""" pytest plugin failing tests whose requests repeat the same SELECT
+
+A lazy-loaded relationship read in a loop, e.g. by a response schema over a
+list of records, runs one structurally identical SELECT per record. Tests
+using the `detect_n_plus_one` fixture fail when one of their requests runs
+one SELECT more than N_PLUS_ONE_THRESHOLD times. Statements the test body
+runs itself, e.g. to set up records, are not checked. The report names the
+relationship the statement most likely loads.
+"""
+import re
+from typing import (
+    Dict,
+    List,
+)
+
+import pytest
+from sqlalchemy.orm import class_mapper
+
+from CTFe.config.database import Base
+from CTFe.utils import query_stats_utils
+
+
+N_PLUS_ONE_THRESHOLD = 3
+
+PARAM = r"(?:%\(\w+\)s|\?|:\w+)"
+BOUND_COLUMN_RE = re.compile(
+    rf"{ PARAM } = (\w+)\.(\w+)|(\w+)\.(\w+) = { PARAM }")
+
+
+def guess_relationships(statement: str) -> List[str]:
+    """ Relationships whose lazy load restricts the columns bound in <statement> """
+
+    upper_statement = statement.upper()
+    where = upper_statement.rfind(" WHERE ")
+    if where == -1:
+        return []
+
+    from_clause = statement[upper_statement.find(" FROM "):where]
+    bound_columns = {
+        (match[1] or match[3], match[2] or match[4])
+        for match in BOUND_COLUMN_RE.finditer(statement[where:])
+    }
+
+    relationships = []
+    for cls in Base._decl_class_registry.values():
+        if not isinstance(cls, type):
+            continue
+
+        for relationship in class_mapper(cls).relationships:
+            # The lazy load selects the target of the relationship
+            if not re.search(rf"\b{ relationship.target.name }\b", from_clause):
+                continue
+
+            tables = {relationship.target.name}
+            if relationship.secondary is not None:
+                tables.add(relationship.secondary.name)
+
+            for _, remote in relationship.local_remote_pairs:
+                if (remote.table.name, remote.name) in bound_columns and remote.table.name in tables:
+                    relationships.append(f"{ cls.__name__ }.{ relationship.key }")
+                    break
+
+    return sorted(relationships)
+
+
+class NPlusOneDetector:
+    def __init__(self, threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.threshold = threshold
+        self.violations: List[str] = []
+
+    def check(self, stats: query_stats_utils.QueryStats):
+        counts: Dict[str, int] = {}
+
+        for statement, count in stats.statements.items():
+            statement = query_stats_utils.normalize_statement(statement)
+            counts[statement] = counts.get(statement, 0) + count
+
+        for statement, count in counts.items():
+            if count <= self.threshold:
+                continue
+
+            relationships = guess_relationships(statement) or ["an unknown relationship"]
+
+            self.violations.append(
+                f"{ stats.label } ran { count } x: { statement[:300] }\n"
+                f"    probably lazy loading { ' or '.join(relationships) }"
+            )
+
+    def report(self) -> str:
+        return "N+1 queries detected:\n  " + "\n  ".join(self.violations)
+
+
+@pytest.fixture
+def detect_n_plus_one(request):
+    """ Fail the test if any of its requests runs into N+1 queries """
+
+    detector = NPlusOneDetector()
+    query_stats_utils.add_request_listener(detector.check)
+    request.node.n_plus_one = detector
+
+    yield detector
+
+    del request.node.n_plus_one
+    query_stats_utils.remove_request_listener(detector.check)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_call(item):
+    """ Fail the test itself once it ran, not its fixture teardown
+
+    Running last, this is only reached when the test body passed.
+    """
+
+    if not hasattr(item, "n_plus_one"):
+        return
+
+    detector = item.n_plus_one
+
+    if detector.violations:
+        pytest.fail(detector.report(), pytrace=False)
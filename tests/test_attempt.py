@@ -11,6 +11,10 @@ from CTFe.models import (
     Team,
     Challenge,
 )
+from CTFe.operations import (
+    attempt_ops,
+    challenge_ops,
+)
 from CTFe.schemas import attempt_schemas
 from CTFe.config import constants
 from . import (
@@ -19,6 +23,10 @@ from . import (
 )
 
 
+# Fail any test whose requests lazy load relationships record by record
+pytestmark = pytest.mark.usefixtures("detect_n_plus_one")
+
+
 # Create attempt tests
 # ------------------
 @pytest.mark.asyncio
@@ -368,3 +376,45 @@ async def test_get_attempt__success():
         session.delete(db_team)
 
         session.commit()
+
+
+# Challenge stats tests
+# ----------------------
+def test_create_attempt__updates_challenge_stats():
+    db_team1 = Team(name="team1")
+    db_team2 = Team(name="team2")
+    db_challenge = Challenge(name="challenge1", description="", flag="flag1")
+
+    with dal.get_session_ctx() as session:
+        session.add_all([db_team1, db_team2, db_challenge])
+        session.commit()
+
+        for flag, db_team in [
+            ("wrong", db_team1),
+            ("flag1", db_team2),
+            ("flag1", db_team1),
+            ("flag1", db_team2),
+        ]:
+            attempt_create = attempt_schemas.Create(
+                flag=flag, team_id=db_team.id, challenge_id=db_challenge.id)
+            attempt_ops.create_attempt(session, attempt_create)
+
+        session.refresh(db_challenge)
+        stats = db_challenge.stats
+
+        assert (stats.attempt_count, stats.solve_count) == (4, 2)
+        assert stats.first_solver_id == db_team2.id
+        first_solve_at = stats.first_solve_at
+
+        challenge_ops.rebuild_challenge_stats(session)
+
+        session.refresh(db_challenge)
+        stats = db_challenge.stats
+
+        assert (stats.attempt_count, stats.solve_count) == (4, 2)
+        assert (stats.first_solver_id, stats.first_solve_at) == (db_team2.id, first_solve_at)
+
+        session.delete(db_challenge)
+        session.delete(db_team1)
+        session.delete(db_team2)
+        session.commit()
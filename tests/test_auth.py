@@ -0,0 +1,180 @@
+from datetime import (
+    datetime,
+    timedelta,
+)
+
+import pytest
+from httpx import AsyncClient
+from jose import ExpiredSignatureError
+
+from CTFe.main import app
+from CTFe.models import User
+from CTFe.config import constants
+from CTFe.utils import (
+    jwt_utils,
+    pwd_utils,
+)
+from CTFe.utils.redis_utils import (
+    RedisDataAccessLayer,
+    redis_dal,
+)
+from CTFe.utils.throttle_utils import (
+    LoginThrottle,
+    redis_available,
+)
+from CTFe.views import auth_view
+from . import (
+    dal,
+    BASE_URL,
+)
+
+
+# Decoded token cache tests
+# --------------------------
+def test_token_cache__hit_after_first_decode():
+    cache = jwt_utils.TokenCache(max_size=2)
+    token = jwt_utils.encode({
+        "sub": "1",
+        "exp": datetime.utcnow() + timedelta(minutes=1),
+    })
+
+    hits = cache.stats()["hits"]
+
+    assert cache.decode(token)["sub"] == "1"
+    assert cache.decode(token)["sub"] == "1"
+    assert cache.stats()["hits"] == hits + 1
+
+
+def test_token_cache__stats_per_instance():
+    cache = jwt_utils.TokenCache(max_size=2)
+    other_cache = jwt_utils.TokenCache(max_size=2)
+    token = jwt_utils.encode({
+        "sub": "1",
+        "exp": datetime.utcnow() + timedelta(minutes=1),
+    })
+    exported_hits = jwt_utils.cache_hits_total.value()
+
+    cache.decode(token)
+    cache.decode(token)
+
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+    assert (other_cache.stats()["hits"], other_cache.stats()["misses"]) == (0, 0)
+
+    # Only the app's token_cache feeds the metrics
+    assert jwt_utils.cache_hits_total.value() == exported_hits
+
+
+def test_token_cache__bounded_size():
+    cache = jwt_utils.TokenCache(max_size=2)
+    expire = datetime.utcnow() + timedelta(minutes=1)
+
+    for id in range(3):
+        cache.decode(jwt_utils.encode({"sub": str(id), "exp": expire}))
+
+    assert cache.stats()["size"] == 2
+
+
+def test_token_cache__expired_token_rejected():
+    cache = jwt_utils.TokenCache(max_size=2)
+    token = jwt_utils.encode({
+        "sub": "1",
+        "exp": datetime.utcnow() - timedelta(seconds=1),
+    })
+
+    with pytest.raises(ExpiredSignatureError):
+        cache.decode(token)
+
+
+# Login throttle tests
+# ---------------------
+def test_login_throttle__backoff_doubles_after_free_attempts():
+    free = 3
+
+    assert LoginThrottle.backoff(free, free) == 0
+    assert LoginThrottle.backoff(free + 1, free) == constants.LOGIN_BACKOFF_BASE
+    assert LoginThrottle.backoff(free + 3, free) == 4 * constants.LOGIN_BACKOFF_BASE
+    assert LoginThrottle.backoff(free + 100, free) == constants.LOGIN_BACKOFF_MAX
+
+
+@pytest.mark.asyncio
+async def test_login__throttled_after_free_attempts(monkeypatch):
+    # Own counters, so neither other tests nor earlier runs lock this one out
+    throttle = LoginThrottle(redis_dal)
+    throttle.key_prefix = f"test-login-throttle-{ datetime.utcnow().timestamp() }"
+    monkeypatch.setattr(auth_view, "login_throttle", throttle)
+
+    credentials = {"username": "unknown", "password": "secret"}
+
+    async with AsyncClient(app=app, base_url=BASE_URL) as client:
+        for _ in range(constants.LOGIN_FREE_ATTEMPTS_PER_USERNAME + 1):
+            response = await client.post("/token", data=credentials)
+
+            assert response.status_code == 404
+
+        response = await client.post("/token", data=credentials)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) == constants.LOGIN_BACKOFF_BASE
+
+
+@pytest.mark.asyncio
+async def test_login_throttle__in_memory_without_redis():
+    # Nothing listens on port 1
+    unreachable_redis_dal = RedisDataAccessLayer()
+    unreachable_redis_dal.redis_url = "redis://127.0.0.1:1"
+
+    throttle = LoginThrottle(unreachable_redis_dal)
+
+    for _ in range(constants.LOGIN_FREE_ATTEMPTS_PER_USERNAME):
+        await throttle.register_failure("player1", None)
+
+    assert await throttle.retry_after("player1", None) == 0
+
+    await throttle.register_failure("player1", None)
+
+    assert await throttle.retry_after("player1", None) > 0
+    assert redis_available.value() == 0
+    assert list(throttle._memory) == [f"{ throttle.key_prefix }:username:player1"]
+
+    await throttle.reset("player1")
+
+    assert await throttle.retry_after("player1", None) == 0
+
+
+# Password rehash tests
+# ----------------------
+def test_make_context__flags_other_costs():
+    pwd_ctx = pwd_utils.make_context("bcrypt", 5)
+
+    assert not pwd_ctx.needs_update(pwd_ctx.hash("secret"))
+    assert pwd_ctx.needs_update(pwd_utils.make_context("bcrypt", 4).hash("secret"))
+    assert pwd_ctx.needs_update(pwd_utils.make_context("bcrypt", 6).hash("secret"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("old_scheme, old_rounds", [
+    ("bcrypt", 4),              # Lower cost
+    ("sha256_crypt", 1000),     # Legacy scheme
+])
+async def test_login__rehashes_outdated_password(monkeypatch, old_scheme, old_rounds):
+    monkeypatch.setattr(constants, "PWD_LEGACY_SCHEMES", ["bcrypt", "sha256_crypt"])
+    monkeypatch.setattr(pwd_utils, "pwd_ctx", pwd_utils.make_context("bcrypt", 5))
+
+    old_hash = pwd_utils.make_context(old_scheme, old_rounds).hash("secret")
+
+    with dal.get_session_ctx() as session:
+        db_user = User(username="player1", password=old_hash)
+        session.add(db_user)
+        session.commit()
+
+        async with AsyncClient(app=app, base_url=BASE_URL) as client:
+            response = await client.post(
+                "/token", data={"username": "player1", "password": "secret"})
+
+        assert response.status_code == 200
+
+        session.refresh(db_user)
+
+        assert db_user.password != old_hash
+        assert db_user.password.startswith("$2b$05$")
+        assert pwd_utils.verify_password("secret", db_user.password) == (True, None)
@@ -0,0 +1,168 @@
+import asyncio
+import os
+import tempfile
+import threading
+
+from sqlalchemy import create_engine
+
+from CTFe.utils import (
+    metrics_utils,
+    query_stats_utils,
+)
+from CTFe.utils.middleware_utils import (
+    MetricsMiddleware,
+    responses_total,
+)
+from CTFe.utils.profiler_utils import (
+    SamplingProfiler,
+    render_collapsed,
+)
+from CTFe.utils.slow_query_utils import SlowQueryLog
+
+
+# Prometheus rendering tests
+# ---------------------------
+def test_render_prometheus__cumulative_histogram_buckets():
+    registry = metrics_utils.Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value, route="/users")
+
+    lines = metrics_utils.render_prometheus(registry).splitlines()
+
+    assert 'latency_seconds_bucket{route="/users",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/users",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/users",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/users"} 4' in lines
+
+
+def test_render_prometheus__escapes_label_values():
+    registry = metrics_utils.Registry()
+    registry.counter("requests_total", "Requests").inc(path='a"b\\c')
+
+    assert 'requests_total{path="a\\"b\\\\c"} 1' in metrics_utils.render_prometheus(registry)
+
+
+# Metrics middleware tests
+# -------------------------
+def test_metrics_middleware__labels_by_router_prefix():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 404, "headers": []})
+
+    async def send(message):
+        pass
+
+    middleware = MetricsMiddleware(app, prefixes={"/users"})
+
+    before = responses_total.value(route="/users", method="GET", status=404)
+
+    for path in ("/users/1", "/users/2", "/elsewhere"):
+        asyncio.get_event_loop().run_until_complete(
+            middleware({"type": "http", "method": "GET", "path": path}, None, send))
+
+    assert responses_total.value(route="/users", method="GET", status=404) == before + 2
+    assert middleware.route_label("/elsewhere") == "other"
+
+
+# Query stats tests
+# ------------------
+def test_query_stats__counts_statements_of_current_request():
+    engine = create_engine("sqlite://")
+    query_stats_utils.install(engine)
+
+    stats, token = query_stats_utils.start_request()
+    try:
+        engine.execute("CREATE TABLE numbers (n INTEGER)")
+        engine.execute("INSERT INTO numbers VALUES (1), (2), (3)")
+        engine.execute("SELECT n FROM numbers").fetchall()
+    finally:
+        query_stats_utils.end_request(token)
+
+    engine.execute("SELECT 1")
+
+    assert stats.count == 3
+    assert stats.rows >= 3
+    assert query_stats_utils.current_stats() is None
+
+
+def test_metrics_middleware__server_timing_header():
+    async def app(scope, receive, send):
+        query_stats_utils.current_stats().add(0.002, 5)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = MetricsMiddleware(app, prefixes={"/users"}, server_timing=True)
+    asyncio.get_event_loop().run_until_complete(
+        middleware({"type": "http", "method": "GET", "path": "/users/"}, None, send))
+
+    headers = dict(messages[0]["headers"])
+
+    assert headers[b"server-timing"].startswith(b'db;dur=2.00;desc="1 queries, 5 rows"')
+
+
+# Slow query log tests
+# ---------------------
+def test_slow_query_log__records_normalized_statement_and_plan():
+    # A file, so the background EXPLAIN connection sees the same tables
+    fd, path = tempfile.mkstemp(suffix=".sqlite")
+    os.close(fd)
+
+    engine = create_engine(f"sqlite:///{ path }")
+    query_stats_utils.install(engine)
+
+    log = SlowQueryLog(threshold_ms=0, size=2)
+    query_stats_utils.add_statement_listener(log.observe)
+    try:
+        engine.execute("CREATE TABLE numbers (n INTEGER)")
+        engine.execute("SELECT n FROM numbers WHERE n IN (1, 2, 3)").fetchall()
+        engine.execute("SELECT n FROM numbers WHERE n = ?", (1,)).fetchall()
+    finally:
+        query_stats_utils.remove_statement_listener(log.observe)
+
+    # The single worker runs the EXPLAINs in order
+    log._executor.submit(lambda: None).result()
+    engine.dispose()
+    os.remove(path)
+
+    newest, oldest = log.entries()
+
+    assert newest.statement == "SELECT n FROM numbers WHERE n = ?"
+    assert oldest.statement == "SELECT n FROM numbers WHERE n IN (...)"
+    assert "SCAN" in newest.plan
+    assert newest.params_fingerprint != oldest.params_fingerprint
+
+
+# Sampling profiler tests
+# ------------------------
+def test_sampling_profiler__collapses_busy_thread_stacks():
+    done = threading.Event()
+
+    def spin():
+        while not done.is_set():
+            sum(range(1000))
+
+    thread = threading.Thread(target=spin, name="busy")
+    thread.start()
+    try:
+        stacks = SamplingProfiler().run(0.2, 0.005)
+    finally:
+        done.set()
+        thread.join()
+
+    busy = [stack for stack in stacks if stack.startswith("busy;")]
+
+    assert busy
+    assert any(stack.endswith(f"{ __name__ }:spin") for stack in busy)
+    assert render_collapsed({"a;b": 2}) == "a;b 2\n"
+
+
+def test_sampling_profiler__one_profile_at_a_time():
+    profiler = SamplingProfiler()
+
+    with profiler._lock:
+        assert profiler.run(0.01, 0.005) is None
@@ -0,0 +1,205 @@
+import argparse
+import gzip
+import importlib
+from datetime import (
+    date,
+    datetime,
+    timedelta,
+)
+
+import pytest
+
+from CTFe.commands import manage_attempt_partitions
+from CTFe.models import (
+    Attempt,
+    Challenge,
+    ChallengeStats,
+    Team,
+)
+from CTFe.models.attempt_model import archived_attempts
+from CTFe.operations import (
+    attempt_ops,
+    challenge_ops,
+    partition_ops,
+    scoreboard_ops,
+    team_ops,
+)
+from CTFe.schemas import attempt_schemas
+from . import dal
+
+
+def add_attempt(session, db_team, db_challenge, at, is_correct=True):
+    db_attempt = Attempt(db_challenge.flag, db_team.id, db_challenge.id, is_correct=is_correct)
+    db_attempt.created_at = at
+
+    session.add(db_attempt)
+    session.commit()
+
+    return db_attempt
+
+
+def archive_attempt(session, id, team_id, challenge_id, at):
+    session.execute(archived_attempts.insert().values(
+        id=id,
+        flag="flag1",
+        is_correct=True,
+        created_at=at,
+        team_id=team_id,
+        challenge_id=challenge_id,
+    ))
+
+
+# Archive reads tests
+# --------------------
+@pytest.fixture
+def archive_table(rollback_db, monkeypatch):
+    """ Plain attempts_archive standing in for the partitioned one, rolled back with the test """
+
+    rollback_db.execute("""
+        CREATE TABLE attempts_archive (
+            id INTEGER,
+            flag VARCHAR,
+            is_correct BOOLEAN,
+            created_at TIMESTAMP,
+            team_id INTEGER,
+            challenge_id INTEGER
+        )
+    """)
+
+    monkeypatch.setattr(partition_ops, "is_partitioned", lambda session, table: True)
+
+
+def test_query_attempts__include_archived(archive_table):
+    db_team = Team(name="team1")
+    db_challenge = Challenge(name="challenge1", description="", flag="flag1")
+
+    with dal.get_session_ctx() as session:
+        session.add_all([db_team, db_challenge])
+        session.commit()
+
+        db_attempt = add_attempt(session, db_team, db_challenge, datetime.utcnow())
+
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        archive_attempt(session, 1001, db_team.id, db_challenge.id, yesterday)
+
+        # Archived rows of deleted teams and challenges are left out
+        archive_attempt(session, 1002, db_team.id + 1, db_challenge.id, yesterday)
+        archive_attempt(session, 1003, db_team.id, db_challenge.id + 1, yesterday)
+        session.commit()
+
+        live = attempt_ops.query_attempts_by_(session).all()
+        everything = attempt_ops.query_attempts_by_(session, include_archived=True).all()
+
+        assert [attempt.id for attempt in live] == [db_attempt.id]
+        assert sorted(attempt.id for attempt in everything) == [db_attempt.id, 1001]
+
+
+def test_create_attempt__solved_before_archiving(archive_table):
+    db_team = Team(name="team1")
+    db_challenge = Challenge(name="challenge1", description="", flag="flag1")
+
+    with dal.get_session_ctx() as session:
+        session.add_all([db_team, db_challenge])
+        session.commit()
+
+        archive_attempt(session, 1001, db_team.id, db_challenge.id, datetime.utcnow() - timedelta(days=1))
+        challenge_ops.rebuild_challenge_stats(session)
+
+        scoreboard = scoreboard_ops.get_scoreboard(session)
+
+        # The same team solves it again, after the first solve was archived
+        attempt_ops.create_attempt(session, attempt_schemas.Create(
+            flag="flag1", team_id=db_team.id, challenge_id=db_challenge.id))
+
+        db_stats = session.query(ChallengeStats).get(db_challenge.id)
+
+        assert (db_stats.attempt_count, db_stats.solve_count) == (2, 1)
+        assert scoreboard_ops.get_scoreboard(session) is scoreboard
+        assert scoreboard.ranking() == [(db_team.id, db_challenge.initial_value)]
+
+
+# Partition command tests
+# ------------------------
+@pytest.fixture
+def partitioned_attempts(rollback_db):
+    """ attempts partitioned by the migration, rolled back with the test """
+
+    if dal.engine.dialect.name == "sqlite":
+        pytest.skip("Needs postgres partitioning")
+
+    pytest.importorskip("alembic")
+
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    migration = importlib.import_module(
+        "CTFe.migrations.versions.7f3b8a1c6e52_partitioned_attempts_by_day")
+
+    with Operations.context(MigrationContext.configure(rollback_db.connection())):
+        migration.upgrade()
+
+
+def test_manage_attempt_partitions__create_and_archive(partitioned_attempts, tmp_path):
+    today = date.today()
+    old_day = today - timedelta(days=10)
+    args = argparse.Namespace(
+        days=3,
+        before=f"{ today - timedelta(days=5):%Y-%m-%d}",
+        output_dir=str(tmp_path),
+        drop=False,
+    )
+
+    db_team = Team(name="team1")
+    db_challenge = Challenge(name="challenge1", description="", flag="flag1")
+
+    with dal.get_session_ctx() as session:
+        session.add_all([db_team, db_challenge])
+        session.commit()
+
+        # No partition yet, both land in attempts_default
+        old_at = datetime.combine(old_day, datetime.min.time()) + timedelta(hours=12)
+        add_attempt(session, db_team, db_challenge, old_at)
+        add_attempt(session, db_team, db_challenge, old_at, is_correct=False)
+
+        # Archiving would leave those rows live, so it refuses
+        with pytest.raises(SystemExit, match=f"{ old_day:%Y-%m-%d}"):
+            manage_attempt_partitions.archive(args)
+
+        # Archiving still created the upcoming partitions
+        upcoming = [partition_ops.partition_name(today + timedelta(days=i)) for i in range(3)]
+        assert [name for name, _ in partition_ops.query_partitions(session)] == upcoming
+
+        manage_attempt_partitions.create(args)
+
+        assert partition_ops.query_default_days(session) == []
+        assert partition_ops.query_partitions(session)[0] == (
+            partition_ops.partition_name(old_day), old_day)
+
+        manage_attempt_partitions.archive(args)
+
+        name = partition_ops.partition_name(old_day)
+        assert partition_ops.query_partitions(session, "attempts_archive") == [(name, old_day)]
+        assert name not in [name for name, _ in partition_ops.query_partitions(session)]
+
+        with gzip.open(tmp_path / f"{ name }.csv.gz", "rt") as archive:
+            assert len(archive.readlines()) == 3
+
+        # Live reads skip the archive, the stats and scoreboard rebuilds don't
+        assert attempt_ops.query_attempts_by_(session).all() == []
+        assert len(attempt_ops.query_attempts_by_(session, include_archived=True).all()) == 2
+
+        challenge_ops.rebuild_challenge_stats(session)
+        attempt_ops.create_attempt(session, attempt_schemas.Create(
+            flag="flag1", team_id=db_team.id, challenge_id=db_challenge.id))
+
+        db_stats = session.query(ChallengeStats).get(db_challenge.id)
+        assert (db_stats.attempt_count, db_stats.solve_count) == (3, 1)
+        assert scoreboard_ops.get_scoreboard(session).ranking() == [
+            (db_team.id, db_challenge.initial_value)]
+
+        # The archived partition doesn't hold on to the team or the challenge
+        team_ops.delete_team(session, db_team)
+        challenge_ops.delete_challenge(session, db_challenge)
+
+        attempts = partition_ops.attempt_entity(session, include_archived=True)
+        assert session.query(attempts).count() == 0
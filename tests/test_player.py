@@ -0,0 +1,494 @@
+import importlib
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.exc import DBAPIError
+
+from CTFe.main import app
+from CTFe.models import (
+    Team,
+    User,
+)
+from CTFe.operations import (
+    auth_ops,
+    player_ops,
+)
+from CTFe.operations.CRUD_ops import retry_on_conflict
+from CTFe.schemas import (
+    player_schemas,
+    team_schemas,
+)
+from CTFe.utils import (
+    enums,
+    query_stats_utils,
+)
+from CTFe.config import constants
+from . import (
+    dal,
+    BASE_URL,
+)
+
+
+def create_captain(session):
+    """ Player leading team1 """
+
+    db_captain = User(username="captain", password="secret")
+    session.add(db_captain)
+    session.commit()
+
+    return player_ops.lead_team(session, db_captain, team_schemas.Create(name="team1"))
+
+
+# Team counter tests
+# -------------------
+def test_change_counts__never_below_zero():
+    db_team = Team(name="team1")
+    db_team.member_count = 1
+
+    with dal.get_session_ctx() as session:
+        session.add(db_team)
+        session.commit()
+
+        assert player_ops.change_member_count(session, db_team.id, -1)
+        assert not player_ops.change_member_count(session, db_team.id, -1)
+
+        assert player_ops.change_invite_count(session, db_team.id, 1)
+        assert player_ops.change_invite_count(session, db_team.id, -1)
+        assert not player_ops.change_invite_count(session, db_team.id, -1)
+
+        session.commit()
+        session.refresh(db_team)
+
+        assert (db_team.member_count, db_team.invite_count) == (0, 0)
+
+
+def test_membership__at_team_capacity():
+    db_players = [
+        User(username=f"player{ i }", password="secret")
+        for i in range(constants.MAX_TEAM_MEMBERS)
+    ]
+
+    with dal.get_session_ctx() as session:
+        session.add_all(db_players)
+        session.commit()
+
+        db_team = create_captain(session).team
+        *db_members, db_extra_player = db_players
+
+        for db_player in db_players:
+            player_ops.invite_player(session, db_player, db_team)
+
+        for db_player in db_members:
+            assert player_ops.accept_invite(session, db_player, db_team.id) == enums.MembershipOutcome.OK
+
+        # The captain filled the last seat
+        outcome = player_ops.accept_invite(session, db_extra_player, db_team.id)
+        assert outcome == enums.MembershipOutcome.TEAM_FULL
+
+        session.refresh(db_team)
+        assert (db_team.member_count, db_team.invite_count) == (constants.MAX_TEAM_MEMBERS, 1)
+
+        # Quitting frees a seat, without double counting a second quit
+        assert player_ops.quit_team(session, db_members[0])
+        assert not player_ops.quit_team(session, db_members[0])
+
+        outcome = player_ops.accept_invite(session, db_extra_player, db_team.id)
+        assert outcome == enums.MembershipOutcome.OK
+
+        session.refresh(db_team)
+        assert (db_team.member_count, db_team.invite_count) == (constants.MAX_TEAM_MEMBERS, 0)
+        assert db_team.member_count == len(db_team.players)
+
+
+def test_counts_migration__backfills_counts():
+    pytest.importorskip("alembic")
+
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    migration = importlib.import_module(
+        "CTFe.migrations.versions.9e2d41c7a8f3_added_member_and_invite_counts_to_teams")
+
+    db_players = [User(username=f"player{ i }", password="secret") for i in range(3)]
+
+    with dal.get_session_ctx() as session:
+        session.add_all(db_players)
+        session.commit()
+
+        db_team = create_captain(session).team
+        player_ops.invite_player(session, db_players[0], db_team)
+        player_ops.accept_invite(session, db_players[0], db_team.id)
+        player_ops.invite_player(session, db_players[1], db_team)
+        player_ops.invite_player(session, db_players[2], db_team)
+        team_id = db_team.id
+
+        # Back to the schema before the migration, the rollback restores it
+        connection = session.connection()
+        connection.execute("ALTER TABLE teams DROP COLUMN member_count")
+        connection.execute("ALTER TABLE teams DROP COLUMN invite_count")
+
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+
+        counts = connection.execute(
+            "SELECT member_count, invite_count FROM teams WHERE id = :id", {"id": team_id}
+        ).first()
+
+        assert tuple(counts) == (2, 2)
+
+
+# Transaction retry tests
+# ------------------------
+class PGError(Exception):
+    """ Driver error carrying a SQLSTATE, as psycopg2 raises """
+
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+class FakeSession:
+    rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def failing_operation(pgcodes):
+    """ Raise a DBAPIError for each pgcode in turn, then succeed """
+
+    calls = []
+
+    @retry_on_conflict
+    def operation(session):
+        calls.append(session)
+
+        if len(calls) <= len(pgcodes):
+            raise DBAPIError("UPDATE teams", {}, PGError(pgcodes[len(calls) - 1]))
+
+        return "done"
+
+    return operation, calls
+
+
+@pytest.mark.parametrize("pgcode", ["40001", "40P01"])
+def test_retry_on_conflict__retries_until_success(monkeypatch, pgcode):
+    monkeypatch.setattr(constants, "DB_RETRY_BACKOFF", 0)
+
+    operation, calls = failing_operation([pgcode] * constants.DB_TRANSACTION_RETRIES)
+    session = FakeSession()
+
+    assert operation(session) == "done"
+    assert len(calls) == constants.DB_TRANSACTION_RETRIES + 1
+    assert session.rollbacks == constants.DB_TRANSACTION_RETRIES
+
+
+@pytest.mark.parametrize("pgcode", ["40001", "40P01"])
+def test_retry_on_conflict__gives_up_after_the_retries(monkeypatch, pgcode):
+    monkeypatch.setattr(constants, "DB_RETRY_BACKOFF", 0)
+
+    operation, calls = failing_operation([pgcode] * (constants.DB_TRANSACTION_RETRIES + 1))
+    session = FakeSession()
+
+    with pytest.raises(DBAPIError) as error:
+        operation(session)
+
+    assert error.value.orig.pgcode == pgcode
+    assert len(calls) == constants.DB_TRANSACTION_RETRIES + 1
+    assert session.rollbacks == constants.DB_TRANSACTION_RETRIES + 1
+
+
+@pytest.mark.parametrize("pgcode", ["23505", None])
+def test_retry_on_conflict__reraises_other_errors(monkeypatch, pgcode):
+    monkeypatch.setattr(constants, "DB_RETRY_BACKOFF", 0)
+
+    # A unique violation, or a driver without SQLSTATEs (SQLite)
+    operation, calls = failing_operation([pgcode])
+    session = FakeSession()
+
+    with pytest.raises(DBAPIError) as error:
+        operation(session)
+
+    assert error.value.orig.pgcode == pgcode
+    assert len(calls) == 1
+    assert session.rollbacks == 1
+
+
+# Captain tests
+# --------------
+def test_quit_team__captain_passes_to_lowest_member():
+    db_players = [User(username=f"player{ i }", password="secret") for i in range(2)]
+
+    with dal.get_session_ctx() as session:
+        session.add_all(db_players)
+        session.commit()
+
+        db_captain = create_captain(session)
+        db_team = db_captain.team
+
+        # Joining order doesn't matter, the lowest id does
+        for db_player in reversed(db_players):
+            player_ops.invite_player(session, db_player, db_team)
+            assert player_ops.accept_invite(session, db_player, db_team.id) == enums.MembershipOutcome.OK
+
+        assert player_ops.quit_team(session, db_captain)
+
+        session.refresh(db_team)
+
+        assert db_team.captain_id == db_players[0].id
+        assert db_team.member_count == 2
+
+
+def test_accept_invite__fills_empty_captaincy():
+    # Teams created by an admin start without a captain
+    db_team = Team(name="team1")
+    db_player = User(username="player1", password="secret")
+
+    with dal.get_session_ctx() as session:
+        session.add_all([db_team, db_player])
+        session.commit()
+
+        player_ops.invite_player(session, db_player, db_team)
+
+        assert player_ops.accept_invite(session, db_player, db_team.id) == enums.MembershipOutcome.OK
+
+        session.refresh(db_team)
+
+        assert db_team.captain_id == db_player.id
+        assert (db_team.member_count, db_team.invite_count) == (1, 0)
+
+
+# Invite tests
+# -------------
+def test_invite_player__already_invited():
+    db_team = Team(name="team1")
+    db_player = User(username="player1", password="secret")
+
+    with dal.get_session_ctx() as session:
+        session.add_all([db_team, db_player])
+        session.commit()
+
+        outcome = player_ops.invite_player(session, db_player, db_team)
+        assert outcome == enums.MembershipOutcome.OK
+
+        # The duplicate row is ignored, not raised as an IntegrityError
+        outcome = player_ops.invite_player(session, db_player, db_team)
+        assert outcome == enums.MembershipOutcome.ALREADY_INVITED
+
+        session.refresh(db_team)
+
+        assert db_team.invite_count == 1
+        assert db_team.player_invites == [db_player]
+
+
+def test_remove_invitation__not_invited():
+    db_team = Team(name="team1")
+    db_player = User(username="player1", password="secret")
+
+    with dal.get_session_ctx() as session:
+        session.add_all([db_team, db_player])
+        session.commit()
+
+        assert player_ops.invite_player(session, db_player, db_team) == enums.MembershipOutcome.OK
+
+        assert player_ops.remove_invitation(session, db_team.id, "player1")
+        assert not player_ops.remove_invitation(session, db_team.id, "player1")
+        assert not player_ops.remove_invitation(session, db_team.id, "unknown")
+
+        session.refresh(db_team)
+
+        assert db_team.invite_count == 0
+        assert db_team.player_invites == []
+
+
+@pytest.mark.asyncio
+async def test_remove_invitation__single_statement():
+    db_player = User(username="player1", password="secret")
+
+    with dal.get_session_ctx() as session:
+        session.add(db_player)
+        session.commit()
+
+        db_captain = create_captain(session)
+        db_team = db_captain.team
+        player_ops.invite_player(session, db_player, db_team)
+
+        # Detached from the session, so the route can't lazy load through it
+        db_user = User(
+            username="captain",
+            password="secret",
+            user_type=enums.UserType.PLAYER,
+            team_id=db_team.id,
+        )
+
+        requests = []
+        app.dependency_overrides[auth_ops.get_current_user] = lambda: db_user
+        query_stats_utils.add_request_listener(requests.append)
+
+        try:
+            async with AsyncClient(app=app, base_url=BASE_URL) as client:
+                responses = [
+                    await client.patch(f"/players/delete-invite/{ username }")
+                    for username in ["player1", "player1", "unknown"]
+                ]
+        finally:
+            query_stats_utils.remove_request_listener(requests.append)
+            del app.dependency_overrides[auth_ops.get_current_user]
+
+        assert [response.status_code for response in responses] == [204, 404, 404]
+        assert responses[1].json() == {"detail": "Invitation not found"}
+
+        # The player is looked up inside the DELETE, never on its own
+        assert [stats.statements for stats in requests] == [{}, {}, {}]
+
+        session.refresh(db_team)
+
+        assert db_team.invite_count == 0
+        assert db_team.player_invites == []
+
+
+def test_accept_invite__not_invited():
+    db_team = Team(name="team1")
+    db_player = User(username="player1", password="secret")
+
+    with dal.get_session_ctx() as session:
+        session.add_all([db_team, db_player])
+        session.commit()
+
+        outcome = player_ops.accept_invite(session, db_player, db_team.id)
+
+        assert outcome == enums.MembershipOutcome.NOT_INVITED
+        assert db_player.team_id is None
+
+
+# Batch invite tests
+# -------------------
+@pytest.mark.asyncio
+async def test_invite_players__outcomes():
+    db_players = [User(username=f"player{ i }", password="secret") for i in range(4)]
+
+    with dal.get_session_ctx() as session:
+        session.add_all(db_players)
+        session.commit()
+
+        db_captain = create_captain(session)
+        db_team = db_captain.team
+        app.dependency_overrides[auth_ops.get_current_user] = lambda: db_captain
+
+        # player2 is already invited, player3 is in another team
+        player_ops.invite_player(session, db_players[2], db_team)
+        player_ops.lead_team(session, db_players[3], team_schemas.Create(name="team2"))
+
+        batch_invite = {
+            "ids": [db_players[0].id, db_players[2].id, db_players[3].id, -1],
+            # player0 again by username
+            "usernames": ["player1", "player0", "unknown"],
+        }
+
+        try:
+            async with AsyncClient(app=app, base_url=BASE_URL) as client:
+                response = await client.post("/players/invite-players", json=batch_invite)
+        finally:
+            del app.dependency_overrides[auth_ops.get_current_user]
+
+        assert response.status_code == 200
+        assert [(result["username"], result["outcome"]) for result in response.json()] == [
+            ("player0", enums.MembershipOutcome.OK),
+            ("player2", enums.MembershipOutcome.ALREADY_INVITED),
+            ("player3", enums.MembershipOutcome.ALREADY_IN_TEAM),
+            (None, enums.MembershipOutcome.PLAYER_NOT_FOUND),
+            ("player1", enums.MembershipOutcome.OK),
+            ("player0", enums.MembershipOutcome.ALREADY_INVITED),
+            ("unknown", enums.MembershipOutcome.PLAYER_NOT_FOUND),
+        ]
+
+        session.refresh(db_team)
+
+        assert db_team.invite_count == 3
+        assert {db_player.username for db_player in db_team.player_invites} == {
+            "player0", "player1", "player2"}
+
+
+@pytest.mark.asyncio
+async def test_invite_players__truncated_at_invite_limit():
+    db_players = [
+        User(username=f"player{ i }", password="secret")
+        for i in range(constants.MAX_TEAM_INVITES + 1)
+    ]
+
+    with dal.get_session_ctx() as session:
+        session.add_all(db_players)
+        session.commit()
+
+        db_captain = create_captain(session)
+        db_team = db_captain.team
+        app.dependency_overrides[auth_ops.get_current_user] = lambda: db_captain
+
+        # Leave room for two more invites
+        for db_player in db_players[:constants.MAX_TEAM_INVITES - 2]:
+            player_ops.invite_player(session, db_player, db_team)
+
+        batch_invite = {
+            "usernames": [db_player.username for db_player in db_players[-3:]],
+        }
+
+        try:
+            async with AsyncClient(app=app, base_url=BASE_URL) as client:
+                response = await client.post("/players/invite-players", json=batch_invite)
+        finally:
+            del app.dependency_overrides[auth_ops.get_current_user]
+
+        assert response.status_code == 200
+        assert [result["outcome"] for result in response.json()] == [
+            enums.MembershipOutcome.OK,
+            enums.MembershipOutcome.OK,
+            enums.MembershipOutcome.INVITE_LIMIT,
+        ]
+
+        session.refresh(db_team)
+
+        assert db_team.invite_count == constants.MAX_TEAM_INVITES
+        assert len(db_team.player_invites) == constants.MAX_TEAM_INVITES
+
+
+@pytest.mark.asyncio
+async def test_invite_players__not_in_team():
+    db_player = User(username="player1", password="secret")
+
+    with dal.get_session_ctx() as session:
+        session.add(db_player)
+        session.commit()
+
+    app.dependency_overrides[auth_ops.get_current_user] = lambda: db_player
+
+    try:
+        async with AsyncClient(app=app, base_url=BASE_URL) as client:
+            response = await client.post("/players/invite-players", json={"ids": [db_player.id]})
+    finally:
+        del app.dependency_overrides[auth_ops.get_current_user]
+
+    assert response.status_code == 403
+    assert response.json() == {"detail": "You are not part of a team"}
+
+
+def test_invite_players__rolls_back_when_the_counter_is_full(monkeypatch):
+    db_player = User(username="player1", password="secret")
+
+    with dal.get_session_ctx() as session:
+        session.add(db_player)
+        session.commit()
+
+        db_team = create_captain(session).team
+
+        # A single invite used up the budget after the team was locked
+        monkeypatch.setattr(player_ops, "change_invite_count", lambda *args: False)
+
+        results = player_ops.invite_players(
+            session, db_team, player_schemas.BatchInvite(ids=[db_player.id]))
+
+        assert [result.outcome for result in results] == [enums.MembershipOutcome.INVITE_LIMIT]
+
+        session.refresh(db_team)
+
+        assert db_team.invite_count == 0
+        assert db_team.player_invites == []
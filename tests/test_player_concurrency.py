@@ -0,0 +1,169 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import func
+
+from CTFe.models import (
+    Team,
+    User,
+)
+from CTFe.operations import player_ops
+from CTFe.schemas import team_schemas
+from CTFe.utils import enums
+from CTFe.config import constants
+from . import dal
+
+
+# SQLite has no row locks and runs one writer at a time, there is nothing to race.
+# The threads need to see each other's commits, so these tests clean up themselves
+pytestmark = [
+    pytest.mark.skipif(
+        dal.engine.dialect.name == "sqlite",
+        reason="Needs a DB with concurrent writers",
+    ),
+    pytest.mark.no_rollback,
+]
+
+# Each thread holds a connection at the barrier, so stay below the engine's
+# default pool_size + max_overflow (15)
+THREADS = 12
+
+
+def run_concurrently(*calls):
+    """ Start every call at the same moment, each with its own session and thread """
+
+    barrier = threading.Barrier(len(calls))
+
+    def run(call):
+        operation, *args = call
+
+        with dal.get_session_ctx() as session:
+            args = [
+                session.merge(arg) if isinstance(arg, User) else arg
+                for arg in args
+            ]
+
+            barrier.wait()
+            return operation(session, *args)
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        return list(executor.map(run, calls))
+
+
+def create_players(session, count, prefix):
+    db_players = [
+        User(username=f"{ prefix }{ i }", password="secret")
+        for i in range(count)
+    ]
+
+    session.add_all(db_players)
+    session.commit()
+
+    return db_players
+
+
+def assert_team_invariants(session):
+    for db_team in session.query(Team).all():
+        member_ids = [
+            id for id, in session.query(User.id).filter(User.team_id == db_team.id)
+        ]
+
+        assert db_team.member_count == len(member_ids)
+        assert db_team.member_count <= constants.MAX_TEAM_MEMBERS
+        assert db_team.invite_count == len(db_team.player_invites)
+        assert (
+            db_team.captain_id in member_ids
+            if member_ids else
+            db_team.captain_id is None
+        )
+
+
+def cleanup(session):
+    session.query(User).update({User.team_id: None}, synchronize_session=False)
+    session.query(Team).update({Team.captain_id: None}, synchronize_session=False)
+    session.commit()
+
+    for db_team in session.query(Team).all():
+        session.delete(db_team)
+    session.query(User).delete(synchronize_session=False)
+    session.commit()
+
+
+# Concurrent membership transitions
+# ----------------------------------
+def test_concurrent_accept_invite__never_overfills_team():
+    with dal.get_session_ctx() as session:
+        db_captain, = create_players(session, 1, "captain")
+        db_players = create_players(session, THREADS, "player")
+
+        db_player = player_ops.lead_team(
+            session, db_captain, team_schemas.Create(name="team 1"))
+        team_id = db_player.team_id
+
+        db_team = session.query(Team).get(team_id)
+        db_team.invite_count = len(db_players)
+        db_team.player_invites.extend(db_players)
+        session.commit()
+
+    outcomes = run_concurrently(*(
+        (player_ops.accept_invite, db_player, team_id)
+        for db_player in db_players
+    ))
+
+    with dal.get_session_ctx() as session:
+        assert outcomes.count(enums.MembershipOutcome.OK) == constants.MAX_TEAM_MEMBERS - 1
+        assert_team_invariants(session)
+
+        cleanup(session)
+
+
+def test_concurrent_lead_team__player_leads_one_team():
+    with dal.get_session_ctx() as session:
+        db_player, = create_players(session, 1, "player")
+
+    results = run_concurrently(*(
+        (player_ops.lead_team, db_player, team_schemas.Create(name=f"team { i }"))
+        for i in range(THREADS)
+    ))
+
+    with dal.get_session_ctx() as session:
+        assert len([result for result in results if result is not None]) == 1
+        assert session.query(func.count(Team.id)).scalar() == 1
+        assert_team_invariants(session)
+
+        cleanup(session)
+
+
+def test_concurrent_quit_and_accept__team_stays_consistent():
+    with dal.get_session_ctx() as session:
+        db_captain, = create_players(session, 1, "captain")
+        db_players = create_players(session, THREADS - 1, "player")
+
+        db_player = player_ops.lead_team(
+            session, db_captain, team_schemas.Create(name="team 1"))
+        team_id = db_player.team_id
+
+        db_team = session.query(Team).get(team_id)
+        db_team.invite_count = len(db_players)
+        db_team.player_invites.extend(db_players)
+        session.commit()
+
+    run_concurrently(
+        (player_ops.quit_team, db_captain),
+        *(
+            (player_ops.accept_invite, db_player, team_id)
+            for db_player in db_players
+        ),
+    )
+
+    with dal.get_session_ctx() as session:
+        # Either the team was deleted before anyone joined, or it survived with its members
+        member_count = session.query(func.count(User.id)).filter(
+            User.team_id == team_id).scalar()
+        db_team = session.query(Team).get(team_id)
+
+        assert db_team is not None or member_count == 0
+        assert_team_invariants(session)
+
+        cleanup(session)
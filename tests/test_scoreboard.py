@@ -0,0 +1,266 @@
+from datetime import (
+    datetime,
+    timedelta,
+)
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.exc import IntegrityError
+
+from CTFe.main import app
+from CTFe.models import (
+    Attempt,
+    Challenge,
+    ScoreboardInvalidation,
+    ScoreboardSnapshot,
+    Team,
+    User,
+)
+from CTFe.operations import (
+    attempt_ops,
+    auth_ops,
+    challenge_ops,
+    scoreboard_ops,
+)
+from CTFe.schemas import (
+    attempt_schemas,
+    challenge_schemas,
+)
+from CTFe.utils import enums
+from . import (
+    dal,
+    BASE_URL,
+)
+
+
+def solve(session, db_team, db_challenge):
+    attempt_create = attempt_schemas.Create(
+        flag=db_challenge.flag, team_id=db_team.id, challenge_id=db_challenge.id)
+
+    return attempt_ops.create_attempt(session, attempt_create)
+
+
+def solve_at(session, db_team, db_challenge, at):
+    """ Solve stored as if accepted at <at> """
+
+    db_attempt = Attempt(db_challenge.flag, db_team.id, db_challenge.id, is_correct=True)
+    db_attempt.created_at = at
+
+    session.add(db_attempt)
+    session.commit()
+
+
+# Live scoreboard tests
+# ----------------------
+def test_get_scoreboard__rebuilds_after_another_worker_invalidated():
+    db_team1 = Team(name="team1")
+    db_team2 = Team(name="team2")
+    db_challenge = Challenge(name="challenge1", description="", flag="flag1")
+
+    with dal.get_session_ctx() as session:
+        session.add_all([db_team1, db_team2, db_challenge])
+        session.commit()
+
+        solve(session, db_team1, db_challenge)
+        db_attempt = solve(session, db_team2, db_challenge)
+
+        assert len(scoreboard_ops.get_scoreboard(session).ranking()) == 2
+
+        # Another worker deletes a solve, this worker's scoreboard isn't told
+        session.query(Attempt).filter(Attempt.id == db_attempt.id).delete()
+        session.add(ScoreboardInvalidation())
+        session.commit()
+
+        ranking = scoreboard_ops.get_scoreboard(session).ranking()
+
+        assert ranking == [(db_team1.id, db_challenge.initial_value)]
+
+
+def test_update_challenge__rescores_every_worker():
+    db_team = Team(name="team1")
+    db_challenge = Challenge(name="challenge1", description="", flag="flag1")
+
+    with dal.get_session_ctx() as session:
+        session.add_all([db_team, db_challenge])
+        session.commit()
+
+        solve(session, db_team, db_challenge)
+        scoreboard = scoreboard_ops.get_scoreboard(session)
+        generation = scoreboard_ops.current_generation(session)
+
+        challenge_ops.update_challenge(
+            session, db_challenge, challenge_schemas.Update(initial_value=1000))
+
+        assert scoreboard_ops.current_generation(session) > generation
+        assert scoreboard_ops.get_scoreboard(session).ranking() == [(db_team.id, 1000)]
+
+        # The scoreboard built before the change is no longer served
+        assert scoreboard_ops.get_scoreboard(session) is not scoreboard
+
+
+# Score history tests
+# --------------------
+START = datetime(2026, 1, 1, 12, 0)
+
+
+def minutes(count):
+    return START + timedelta(minutes=count)
+
+
+def create_history(session):
+    """ team2 overtakes team1 in the fourth minute """
+
+    db_teams = [Team(name=f"team{ i }") for i in range(1, 3)]
+    db_challenges = [
+        Challenge(name=f"challenge{ i }", description="", flag=f"flag{ i }")
+        for i in range(1, 3)
+    ]
+    db_challenges[0].initial_value = 100
+    db_challenges[1].initial_value = 200
+
+    session.add_all(db_teams + db_challenges)
+    session.commit()
+
+    solve_at(session, db_teams[0], db_challenges[0], minutes(0))
+    solve_at(session, db_teams[1], db_challenges[1], minutes(3) + timedelta(seconds=20))
+
+    return db_teams
+
+
+def history_scores(response):
+    return {
+        series["name"]: [point["score"] for point in series["points"]]
+        for series in response.json()
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_score_history__buckets():
+    with dal.get_session_ctx() as session:
+        create_history(session)
+
+    async with AsyncClient(app=app, base_url=BASE_URL) as client:
+        response = await client.get("/scoreboard/history")
+
+    assert response.status_code == 200
+
+    # Ranked order, one point per minute from the first solve
+    assert [series["name"] for series in response.json()] == ["team2", "team1"]
+    assert [point["at"] for point in response.json()[0]["points"]] == [
+        minutes(i).isoformat() for i in range(4)]
+    assert history_scores(response) == {
+        "team2": [0, 0, 0, 200],
+        "team1": [100, 100, 100, 100],
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_score_history__top_and_range():
+    with dal.get_session_ctx() as session:
+        create_history(session)
+
+    async with AsyncClient(app=app, base_url=BASE_URL) as client:
+        top_response = await client.get("/scoreboard/history", params={"top": 1})
+        range_response = await client.get("/scoreboard/history", params={
+            "top": 2,
+            "since": minutes(1).isoformat(),
+            "until": minutes(2).isoformat(),
+        })
+
+    assert history_scores(top_response) == {"team2": [0, 0, 0, 200]}
+    assert history_scores(range_response) == {"team2": [0, 0], "team1": [100, 100]}
+
+
+@pytest.mark.asyncio
+async def test_get_score_history__stops_at_the_freeze():
+    with dal.get_session_ctx() as session:
+        db_team1, _ = create_history(session)
+
+        # Dated half way through the third minute
+        db_snapshot = scoreboard_ops.freeze_scoreboard(session)
+        db_snapshot.frozen_at = minutes(2) + timedelta(seconds=30)
+        session.commit()
+
+        # Scores after the freeze stay hidden
+        db_challenge = Challenge(name="challenge3", description="", flag="flag3")
+        session.add(db_challenge)
+        session.commit()
+        solve_at(session, db_team1, db_challenge, minutes(3))
+
+    async with AsyncClient(app=app, base_url=BASE_URL) as client:
+        response = await client.get("/scoreboard/history")
+
+    assert response.status_code == 200
+
+    # Ranked as the snapshot, up to the last full minute before the freeze
+    assert [series["name"] for series in response.json()] == ["team2", "team1"]
+    assert history_scores(response) == {
+        "team2": [0, 0],
+        "team1": [100, 100],
+    }
+
+
+# Freeze tests
+# -------------
+@pytest.mark.asyncio
+async def test_freeze_scoreboard__endpoints():
+    db_team1 = Team(name="team1")
+    db_team2 = Team(name="team2")
+    db_challenge1 = Challenge(name="challenge1", description="", flag="flag1")
+    db_challenge2 = Challenge(name="challenge2", description="", flag="flag2")
+
+    with dal.get_session_ctx() as session:
+        session.add_all([db_team1, db_team2, db_challenge1, db_challenge2])
+        session.commit()
+
+        solve(session, db_team1, db_challenge1)
+
+    app.dependency_overrides[auth_ops.get_current_user] = lambda: User(
+        username="admin", password="secret", user_type=enums.UserType.ADMIN)
+
+    try:
+        async with AsyncClient(app=app, base_url=BASE_URL) as client:
+            freeze_responses = [
+                await client.post("/admin/scoreboard/freeze") for _ in range(2)]
+
+            # Solved after the freeze, only the admins see it
+            with dal.get_session_ctx() as session:
+                solve(session, db_team2, db_challenge2)
+
+            frozen = await client.get("/scoreboard/")
+            live = await client.get("/admin/scoreboard")
+
+            unfreeze_responses = [
+                await client.post("/admin/scoreboard/unfreeze") for _ in range(2)]
+
+            unfrozen = await client.get("/scoreboard/")
+    finally:
+        del app.dependency_overrides[auth_ops.get_current_user]
+
+    assert [response.status_code for response in freeze_responses] == [200, 409]
+    assert freeze_responses[0].json()["unfrozen_at"] is None
+    assert freeze_responses[1].json() == {"detail": "The scoreboard is already frozen"}
+
+    assert [entry["name"] for entry in frozen.json()] == ["team1"]
+    assert [entry["name"] for entry in live.json()] == ["team1", "team2"]
+
+    assert [response.status_code for response in unfreeze_responses] == [204, 409]
+    assert unfreeze_responses[1].json() == {"detail": "The scoreboard is not frozen"}
+
+    assert unfrozen.json() == live.json()
+
+
+def test_scoreboard_snapshots__one_active_freeze():
+    with dal.get_session_ctx() as session:
+        session.add_all([
+            ScoreboardSnapshot(data=b"[]", unfrozen_at=datetime.utcnow()),
+            ScoreboardSnapshot(data=b"[]", unfrozen_at=datetime.utcnow()),
+            ScoreboardSnapshot(data=b"[]"),
+        ])
+        session.commit()
+
+        # Only unfrozen_at IS NULL rows are indexed, past freezes can pile up
+        session.add(ScoreboardSnapshot(data=b"[]"))
+
+        with pytest.raises(IntegrityError):
+            session.commit()
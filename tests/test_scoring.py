@@ -0,0 +1,144 @@
+import random
+from datetime import (
+    datetime,
+    timedelta,
+)
+
+from CTFe.utils import (
+    history_utils,
+    scoring_utils,
+)
+
+
+def reference_totals(params, solves):
+    """ Recompute every team's score from scratch """
+
+    solvers = {}
+    for team_id, challenge_id in solves:
+        solvers.setdefault(challenge_id, [])
+        if team_id not in solvers[challenge_id]:
+            solvers[challenge_id].append(team_id)
+
+    totals = {}
+    for challenge_id, team_ids in solvers.items():
+        value = scoring_utils.decayed_value(*params[challenge_id], len(team_ids))
+
+        for team_id in team_ids:
+            totals[team_id] = totals.get(team_id, 0) + value
+
+    return totals
+
+
+# Decay tests
+# ------------
+def test_decayed_value__bounds():
+    assert scoring_utils.decayed_value(500, 100, 10, 0) == 500
+    assert scoring_utils.decayed_value(500, 100, 10, 1) == 500
+    assert scoring_utils.decayed_value(500, 100, 10, 11) == 100
+    assert scoring_utils.decayed_value(500, 100, 10, 1000) == 100
+
+
+def test_decayed_value__never_increases():
+    values = [scoring_utils.decayed_value(500, 100, 20, n) for n in range(50)]
+
+    assert values == sorted(values, reverse=True)
+
+
+# Incremental scoreboard tests
+# -----------------------------
+def test_scoreboard__matches_full_recompute():
+    rng = random.Random(36)
+
+    for _ in range(20):
+        scoreboard = scoring_utils.Scoreboard()
+        params = {}
+
+        for challenge_id in range(rng.randint(1, 8)):
+            initial_value = rng.randint(100, 1000)
+            params[challenge_id] = (
+                initial_value,
+                rng.randint(0, initial_value),
+                rng.randint(1, 30),
+            )
+            scoreboard.set_challenge(challenge_id, *params[challenge_id])
+
+        solves = []
+        for _ in range(rng.randint(0, 200)):
+            solve = (rng.randint(1, 25), rng.choice(list(params)))
+            solves.append(solve)
+
+            changed = scoreboard.solve(*solve)
+            expected = reference_totals(params, solves)
+
+            assert scoreboard.totals == expected
+            assert all(expected[team_id] == total for team_id, total in changed.items())
+
+        # Re-scoring a challenge re-values its existing solves
+        challenge_id = rng.choice(list(params))
+        params[challenge_id] = (1000, 1, 5)
+        scoreboard.set_challenge(challenge_id, *params[challenge_id])
+
+        assert scoreboard.totals == reference_totals(params, solves)
+
+
+def test_scoreboard__ranking_breaks_ties_by_last_solve():
+    start = datetime(2021, 1, 1)
+
+    scoreboard = scoring_utils.Scoreboard()
+    scoreboard.set_challenge(1, 500, 100, 10)
+    scoreboard.set_challenge(2, 300, 100, 10)
+
+    scoreboard.solve(3, 1, start)
+    scoreboard.solve(2, 2, start + timedelta(minutes=2))
+    scoreboard.solve(1, 2, start + timedelta(minutes=1))
+    scoreboard.solve(4, 2, start + timedelta(minutes=1))
+
+    assert [team_id for team_id, _ in scoreboard.ranking()] == [3, 1, 4, 2]
+
+
+# Score history tests
+# --------------------
+def test_score_history__range_query_matches_replay():
+    rng = random.Random(37)
+    start = datetime(2021, 1, 1)
+
+    history = history_utils.ScoreHistory(bucket_seconds=60)
+    scoreboard = scoring_utils.Scoreboard(history)
+    for challenge_id in range(5):
+        scoreboard.set_challenge(challenge_id, 500, 100, 10)
+
+    # (time, totals) after every solve, used to replay the expected scores
+    snapshots = []
+    at = start
+    for _ in range(300):
+        at += timedelta(seconds=rng.randint(0, 90))
+        scoreboard.solve(rng.randint(1, 10), rng.randint(0, 4), at)
+        snapshots.append((at, dict(scoreboard.totals)))
+
+    first, stop, step = history.window(max_points=40)
+    assert len(range(first, stop, step)) <= 40
+
+    for team_id in range(1, 11):
+        scores = history.query(team_id, first, stop, step)
+
+        for bucket, score in zip(range(first, stop, step), scores):
+            bucket_end = history.bucket_start(bucket + 1)
+            expected = [
+                totals.get(team_id, 0) for at, totals in snapshots if at < bucket_end
+            ]
+
+            assert score == (expected[-1] if expected else 0)
+
+
+def test_score_history__window_clamps_to_recorded_buckets():
+    start = datetime(2021, 1, 1)
+    history = history_utils.ScoreHistory(bucket_seconds=60)
+
+    history.record({1: 100}, start)
+    history.record({2: 50}, start + timedelta(minutes=5))
+
+    first, stop, step = history.window(since=start + timedelta(minutes=2))
+
+    assert (first, stop, step) == (2, 6, 1)
+    assert history.query(1, first, stop) == [100] * 4
+    assert history.query(2, first, stop) == [0, 0, 0, 50]
@@ -6,8 +6,15 @@ from CTFe.models import (
     Team,
     User,
 )
+from CTFe.operations import (
+    auth_ops,
+    team_ops,
+)
 from CTFe.schemas import team_schemas
-from CTFe.utils import enums
+from CTFe.utils import (
+    enums,
+    query_stats_utils,
+)
 from CTFe.config import constants
 from . import (
     dal,
@@ -15,6 +22,10 @@ from . import (
 )
 
 
+# Fail any test whose requests lazy load relationships record by record
+pytestmark = pytest.mark.usefixtures("detect_n_plus_one")
+
+
 # Create team tests
 # ------------------
 @pytest.mark.asyncio
@@ -145,6 +156,79 @@ async def test_get_all_teams__success():
     assert response.json() == []
 
 
+@pytest.mark.asyncio
+async def test_get_all_teams__loads_members_without_n_plus_one():
+    db_teams = [Team(name=f"team{ i }") for i in range(5)]
+
+    with dal.get_session_ctx() as session:
+        for i, db_team in enumerate(db_teams):
+            db_team.players.append(User(username=f"player{ i }", password="secret"))
+            db_team.player_invites.append(User(username=f"invited{ i }", password="secret"))
+
+        session.add_all(db_teams)
+        session.commit()
+
+    requests = []
+    app.dependency_overrides[auth_ops.get_current_user] = lambda: User(
+        username="admin", password="secret", user_type=enums.UserType.ADMIN)
+    query_stats_utils.add_request_listener(requests.append)
+
+    try:
+        async with AsyncClient(app=app, base_url=BASE_URL) as client:
+            response = await client.get("/teams/")
+    finally:
+        query_stats_utils.remove_request_listener(requests.append)
+        del app.dependency_overrides[auth_ops.get_current_user]
+
+    assert response.status_code == 200
+    assert [len(team["players"]) for team in response.json()] == [1] * 5
+    assert [len(team["player_invites"]) for team in response.json()] == [1] * 5
+
+    # The teams, then their members and their invites, one query each
+    [stats] = requests
+    assert sum(stats.statements.values()) == 3
+
+    with dal.get_session_ctx() as session:
+        for db_team in session.query(Team).all():
+            session.delete(db_team)
+        for db_user in session.query(User).all():
+            session.delete(db_user)
+        session.commit()
+
+
+def test_query_teams__captain_without_players():
+    db_teams = [Team(name=f"team{ i }") for i in range(3)]
+
+    with dal.get_session_ctx() as session:
+        for i, db_team in enumerate(db_teams):
+            db_captain = User(username=f"captain{ i }", password="secret")
+            db_team.players.append(db_captain)
+            db_team.captain = db_captain
+
+        session.add_all(db_teams)
+        session.commit()
+        session.expire_all()
+
+        # Statements are only recorded while a request listener is registered
+        requests = []
+        query_stats_utils.add_request_listener(requests.append)
+        stats, token = query_stats_utils.start_request()
+
+        try:
+            db_teams = team_ops.query_teams_by_(session).all()
+            captains = [
+                team_schemas.TeamCaptain.from_orm(db_team.captain).id
+                for db_team in db_teams
+            ]
+        finally:
+            query_stats_utils.end_request(token)
+            query_stats_utils.remove_request_listener(requests.append)
+
+        # The captains are joined to the teams, the members stay unloaded
+        assert captains == [db_team.players[0].id for db_team in db_teams]
+        assert sum(stats.statements.values()) == 1
+
+
 # Update team tests
 # ------------------
 @pytest.mark.asyncio
@@ -4,13 +4,20 @@ from httpx import AsyncClient
 from CTFe.main import app
 from CTFe.models import User
 from CTFe.schemas import user_schemas
-from CTFe.utils import validators
+from CTFe.utils import (
+    validators,
+    pwd_utils,
+)
 from . import (
     dal,
     BASE_URL,
 )
 
 
+# Fail any test whose requests lazy load relationships record by record
+pytestmark = pytest.mark.usefixtures("detect_n_plus_one")
+
+
 # Create user tests
 # ------------------
 @pytest.mark.asyncio
@@ -267,3 +274,31 @@ async def test_delete_user__success():
         session.commit()
 
     app.dependency_overrides = {}
+
+
+# Password hashing guard tests
+# -----------------------------
+def test_load_and_refresh_user__never_hashes_password(monkeypatch):
+    hashed_password = pwd_utils.hash_password("secret")
+
+    def fail_hash(*args, **kwargs):
+        raise AssertionError("The password hasher ran outside credential_ops")
+
+    monkeypatch.setattr(pwd_utils, "hash_password", fail_hash)
+    monkeypatch.setattr(pwd_utils.pwd_ctx, "hash", fail_hash)
+
+    db_user = User(username="user1", password=hashed_password)
+
+    with dal.get_session_ctx() as session:
+        session.add(db_user)
+        session.commit()
+        session.refresh(db_user)
+
+        session.expire_all()
+        db_loaded = session.query(User).filter(User.id == db_user.id).first()
+        session.refresh(db_loaded)
+
+        assert db_loaded.password == hashed_password
+
+        session.delete(db_loaded)
+        session.commit()